@@ -3,23 +3,42 @@ Land Record Digitization Tool - Flask Backend
 A simpler backend implementation using Flask for compatibility
 """
 
-from flask import Flask, jsonify, request
+from flask import Flask, jsonify, request, Response
 from flask_cors import CORS
 import json
 import pandas as pd
 from pathlib import Path
-from rapidfuzz import fuzz, process
 import hashlib
 from datetime import datetime, timedelta
 import jwt
 import os
+import threading
+import atexit
+import time
+
+from services.record_store import RecordStore
+from services.edit_journal import EditJournal, JournalLocked, apply_entries
+from services.spatial_index import SpatialIndex, parse_bbox, parse_points
+from services.tile_service import TileService, valid_tile
+from services.response_cache import CachedResponse
+from services.owner_index import OwnerIndex
+from services.plot_id_index import PlotIdIndex, parse_plot_ids
+from services.batch_update import validate_batch
+from services.village_index import VillageIndex
+from services import duplicate_detector
+from services import report_export
+from services.pagination import PlotOrder
+from services.projection import Projection, project
+from services import reconciliation_engine
 
 app = Flask(__name__)
 CORS(app, origins="*")
 
 # Configuration from environment variables
 SECRET_KEY = os.environ.get("SECRET_KEY", "land-records-secret-key-change-in-production")
-DATA_PATH = Path(__file__).parent.parent / "data"
+DATA_PATH = Path(os.environ.get("DATA_PATH", Path(__file__).parent.parent / "data"))
+# Read-only deployments refuse edits and may run several gunicorn workers
+READ_ONLY = os.environ.get("LRD_READ_ONLY", "0") == "1"
 
 # ========================================
 # Data Loading
@@ -29,21 +48,68 @@ spatial_data = {}
 textual_data = pd.DataFrame()
 parcel_attributes = pd.DataFrame()
 parcels_by_id = {}
-comparison_cache = {}
+textual_store = RecordStore()
+attribute_store = RecordStore()
+owner_index = OwnerIndex()
+plot_id_index = PlotIdIndex()
+village_index = VillageIndex()
+plot_order = PlotOrder()
+spatial_index = SpatialIndex(1.0)
+tile_service = None
+dataset_version = 0
+# Serialized GeoJSON bodies: "" for all parcels, case-folded village otherwise
+geojson_responses = {}
+journal = None
+comparison_cache = reconciliation_engine.ReconciliationTable()
+# Scored duplicate-owner candidates; None until first requested or after an edit
+duplicate_candidates = None
+# Bumped whenever duplicate_candidates is dropped, so a scoring pass that
+# started before the drop does not install stale candidates
+duplicate_version = 0
+edit_lock = threading.Lock()
+data_loaded = False
+# Milliseconds spent in each startup phase, in order
+load_timings = {}
+
+# Upper bound on points accepted by the batch point lookup
+MAX_LOCATE_POINTS = 10000
+
+# Upper bound on plot IDs accepted by the batch fetch
+MAX_BATCH_PLOTS = 1000
+
+STATUS_LABELS = {"match": "Verified Match", "partial": "Partial Match", "mismatch": "Mismatch"}
 
 
 def load_all_data():
     """Load all data files"""
-    global spatial_data, textual_data, parcel_attributes, parcels_by_id
+    global spatial_data, textual_data, parcel_attributes, parcels_by_id, textual_store, attribute_store, journal, spatial_index, tile_service
+    global dataset_version, geojson_responses, owner_index, plot_id_index, village_index, duplicate_candidates, duplicate_version, plot_order
+    global data_loaded, load_timings
+    
+    load_timings = {}
+    started = time.perf_counter()
+    
+    def phase_done(phase):
+        nonlocal started
+        now = time.perf_counter()
+        load_timings[phase] = round((now - started) * 1000, 1)
+        started = now
     
     # Load GeoJSON
     geojson_path = DATA_PATH / "spatial" / "villages.geojson"
     with open(geojson_path, 'r', encoding='utf-8') as f:
         spatial_data = json.load(f)
+    phase_done("spatial")
     
-    # Load CSVs
+    # Load CSVs, replaying edits journaled since the last compaction
     textual_data = pd.read_csv(DATA_PATH / "textual" / "land_records.csv")
+    if journal is None:
+        journal = EditJournal(DATA_PATH / "textual" / "land_records.csv")
+        atexit.register(journal.close)
+    if apply_entries(textual_data, journal.replay()):
+        journal.compact_in_background()
     parcel_attributes = pd.read_csv(DATA_PATH / "spatial" / "parcel_attributes.csv")
+    phase_done("records")
     
     # Index parcels
     for feature in spatial_data.get('features', []):
@@ -51,48 +117,59 @@ def load_all_data():
         if plot_id:
             parcels_by_id[plot_id] = feature
     
+    plot_id_index = PlotIdIndex(parcels_by_id.keys())
+    village_index = VillageIndex(spatial_data.get('features', []))
+    textual_store = RecordStore(textual_data)
+    attribute_store = RecordStore(parcel_attributes)
+    owner_index = OwnerIndex(textual_data['owner_name'].tolist())
+    spatial_index = SpatialIndex.from_features(spatial_data.get('features', []))
+    phase_done("indexes")
+    
     # Pre-compute comparisons
     compute_comparisons()
+    duplicate_candidates = None
+    duplicate_version += 1
+    phase_done("reconciliation")
+    
+    tile_service = TileService(spatial_index, parcels_by_id.__getitem__, tile_properties)
     
-    print(f"[OK] Loaded {len(parcels_by_id)} parcels")
+    # Serialize and compress the GeoJSON responses once
+    dataset_version += 1
+    plot_order = PlotOrder(parcels_by_id.keys(), dataset_version)
+    geojson_responses = {"": CachedResponse(spatial_data, dataset_version)}
+    for key, plot_ids in village_index.plot_ids_by_key.items():
+        features = [parcels_by_id[p] for p in plot_ids]
+        geojson_responses[key] = CachedResponse({"type": "FeatureCollection", "features": features}, dataset_version)
+    phase_done("geojson")
+    
+    data_loaded = True
+    print(f"[OK] Loaded {len(parcels_by_id)} parcels in {sum(load_timings.values()):.0f} ms")
 
 
 def compute_comparisons():
-    """Pre-compute all name comparisons"""
+    """Pre-compute all name comparisons in one batched pass"""
     global comparison_cache
     
-    for _, row in textual_data.iterrows():
-        plot_id = row['plot_id']
-        textual_name = str(row.get('owner_name', ''))
-        
-        # Find spatial name
-        spatial_row = parcel_attributes[parcel_attributes['plot_id'] == plot_id]
-        spatial_name = str(spatial_row['owner_name_spatial'].values[0]) if len(spatial_row) > 0 else ''
-        
-        # Calculate similarity
-        score = fuzz.WRatio(textual_name.lower(), spatial_name.lower()) if textual_name and spatial_name else 0
-        
-        if score >= 85:
-            status = 'match'
-            status_label = 'Verified Match'
-        elif score >= 60:
-            status = 'partial'
-            status_label = 'Partial Match'
-        else:
-            status = 'mismatch'
-            status_label = 'Mismatch'
-        
-        comparison_cache[plot_id] = {
-            'plot_id': plot_id,
-            'village': row.get('village', ''),
-            'name_analysis': {
-                'textual_name': textual_name,
-                'spatial_name': spatial_name,
-                'similarity_score': score,
-                'status': status,
-                'status_label': status_label
-            }
-        }
+    result = reconciliation_engine.reconcile(textual_data, parcel_attributes, how='left')
+    comparisons = reconciliation_engine.build_comparisons(result, STATUS_LABELS, include_area=False)
+    comparison_cache = reconciliation_engine.ReconciliationTable(comparisons)
+
+
+def tile_properties(plot_id):
+    """Reconciliation status baked into tiles so the map can colour them"""
+    comparison = comparison_cache.get(plot_id)
+    return {"status": comparison['name_analysis']['status'] if comparison else None}
+
+
+def recompute_comparison(plot_id):
+    """Rescore a single plot after an edit, updating counters as deltas"""
+    comparison_cache.put(reconciliation_engine.compare_records(
+        plot_id,
+        textual_store.get(plot_id),
+        attribute_store.get(plot_id),
+        STATUS_LABELS,
+        include_area=False
+    ))
 
 
 # ========================================
@@ -140,14 +217,26 @@ def health():
     })
 
 
+@app.route('/api/ready')
+def ready():
+    return jsonify({
+        "ready": data_loaded,
+        "parcels": len(parcels_by_id),
+        "version": dataset_version,
+        "startup_ms": load_timings,
+        "total_ms": round(sum(load_timings.values()), 1)
+    }), 200 if data_loaded else 503
+
+
 @app.route('/api/stats')
 def get_stats():
-    villages = list(set(f['properties'].get('village') for f in spatial_data.get('features', [])))
+    villages = village_index.names
     return jsonify({
         "total_parcels": len(parcels_by_id),
-        "villages": sorted(villages),
+        "villages": villages,
         "village_count": len(villages),
-        "total_area_sqm": int(textual_data['area'].sum()) if not textual_data.empty else 0
+        "total_area_sqm": int(textual_data['area'].sum()) if not textual_data.empty else 0,
+        "extent": list(spatial_index.extent) if spatial_index.extent else None
     })
 
 
@@ -192,27 +281,35 @@ def verify():
 # Routes - Search
 # ========================================
 
+def request_projection():
+    """Parse fields= / exclude=; raises ValueError for unknown fields"""
+    return Projection.parse(request.args.get('fields'), request.args.get('exclude'))
+
+
 @app.route('/api/search/villages')
 def get_villages():
-    villages = list(set(f['properties'].get('village') for f in spatial_data.get('features', [])))
-    return jsonify({"count": len(villages), "villages": sorted(villages)})
+    villages = village_index.names
+    return jsonify({"count": len(villages), "villages": villages})
 
 
 @app.route('/api/search/plot/<plot_id>')
 def search_plot_exact(plot_id):
+    try:
+        projection = request_projection()
+    except ValueError as e:
+        return jsonify({"detail": str(e)}), 400
+    
     parcel = parcels_by_id.get(plot_id.upper())
     if parcel:
-        text_record = textual_data[textual_data['plot_id'] == plot_id.upper()].to_dict('records')
-        spatial_attr = parcel_attributes[parcel_attributes['plot_id'] == plot_id.upper()].to_dict('records')
         return jsonify({
             "found": True,
             "plot_id": plot_id.upper(),
-            "parcel": {
+            "parcel": project({
                 "geometry": parcel['geometry'],
                 "properties": parcel['properties'],
-                "textual_record": text_record[0] if text_record else None,
-                "spatial_attributes": spatial_attr[0] if spatial_attr else None
-            }
+                "textual_record": textual_store.get(plot_id.upper()),
+                "spatial_attributes": attribute_store.get(plot_id.upper())
+            }, projection)
         })
     return jsonify({"found": False, "message": f"No parcel found: {plot_id}"})
 
@@ -221,19 +318,20 @@ def search_plot_exact(plot_id):
 def search_plot():
     query = request.args.get('q', '').upper()
     limit = int(request.args.get('limit', 20))
+    try:
+        projection = request_projection()
+    except ValueError as e:
+        return jsonify({"detail": str(e)}), 400
     
     results = []
-    for plot_id, parcel in parcels_by_id.items():
-        if query in plot_id.upper():
-            text_record = textual_data[textual_data['plot_id'] == plot_id].to_dict('records')
-            results.append({
-                "plot_id": plot_id,
-                "match_score": 100 if plot_id.upper() == query else 80,
-                "properties": parcel['properties'],
-                "textual_record": text_record[0] if text_record else None
-            })
+    for plot_id, score in plot_id_index.search(query, limit):
+        results.append(project({
+            "plot_id": plot_id,
+            "match_score": score,
+            "properties": parcels_by_id[plot_id]['properties'],
+            "textual_record": textual_store.get(plot_id)
+        }, projection))
     
-    results = sorted(results, key=lambda x: x['match_score'], reverse=True)[:limit]
     return jsonify({"query": query, "count": len(results), "results": results})
 
 
@@ -241,47 +339,45 @@ def search_plot():
 def search_owner():
     query = request.args.get('q', '')
     limit = int(request.args.get('limit', 20))
-    
-    if textual_data.empty:
-        return jsonify({"query": query, "count": 0, "results": []})
-    
-    owner_names = textual_data['owner_name'].tolist()
-    matches = process.extract(query, owner_names, scorer=fuzz.WRatio, limit=limit)
+    try:
+        projection = request_projection()
+    except ValueError as e:
+        return jsonify({"detail": str(e)}), 400
     
     results = []
-    for name, score, idx in matches:
-        if score >= 50:
-            record = textual_data.iloc[idx]
-            plot_id = record['plot_id']
-            parcel = parcels_by_id.get(plot_id)
-            if parcel:
-                results.append({
-                    "plot_id": plot_id,
-                    "match_score": score,
-                    "matched_name": name,
-                    "properties": parcel['properties'],
-                    "textual_record": record.to_dict()
-                })
+    for name, score, idx in owner_index.search(query, limit):
+        record = textual_store.record_at(idx)
+        plot_id = record['plot_id']
+        parcel = parcels_by_id.get(plot_id)
+        if parcel:
+            results.append(project({
+                "plot_id": plot_id,
+                "match_score": score,
+                "matched_name": name,
+                "properties": parcel['properties'],
+                "textual_record": record
+            }, projection))
     
     return jsonify({"query": query, "count": len(results), "results": results})
 
 
 @app.route('/api/search/village/<village_name>')
 def search_village(village_name):
+    try:
+        projection = request_projection()
+    except ValueError as e:
+        return jsonify({"detail": str(e)}), 400
+    
     results = []
-    for feature in spatial_data.get('features', []):
-        if feature['properties'].get('village', '').lower() == village_name.lower():
-            plot_id = feature['properties'].get('plot_id')
-            text_record = textual_data[textual_data['plot_id'] == plot_id].to_dict('records')
-            results.append({
-                "plot_id": plot_id,
-                "properties": feature['properties'],
-                "textual_record": text_record[0] if text_record else None
-            })
+    for plot_id in village_index.plot_ids(village_name):
+        results.append(project({
+            "plot_id": plot_id,
+            "properties": parcels_by_id[plot_id]['properties'],
+            "textual_record": textual_store.get(plot_id)
+        }, projection))
     
     if not results:
-        villages = list(set(f['properties'].get('village') for f in spatial_data.get('features', [])))
-        return jsonify({"found": False, "message": f"No parcels in: {village_name}", "available_villages": sorted(villages)})
+        return jsonify({"found": False, "message": f"No parcels in: {village_name}", "available_villages": village_index.names})
     
     return jsonify({"village": village_name, "count": len(results), "parcels": results})
 
@@ -294,69 +390,165 @@ def search_village(village_name):
 def get_all_parcels():
     page = int(request.args.get('page', 1))
     per_page = int(request.args.get('per_page', 50))
+    cursor = request.args.get('cursor')
+    total = len(plot_order)
     
-    all_ids = list(parcels_by_id.keys())
-    total = len(all_ids)
-    
-    start = (page - 1) * per_page
-    end = start + per_page
-    page_ids = all_ids[start:end]
+    try:
+        projection = request_projection()
+        if cursor is not None:
+            page_ids, next_cursor = plot_order.page_after(cursor, per_page)
+        else:
+            page_ids, next_cursor = plot_order.page((page - 1) * per_page, per_page)
+    except ValueError as e:
+        return jsonify({"detail": str(e)}), 400
     
     parcels = []
     for plot_id in page_ids:
         parcel = parcels_by_id[plot_id]
-        text_record = textual_data[textual_data['plot_id'] == plot_id].to_dict('records')
-        parcels.append({
+        parcels.append(project({
             "plot_id": plot_id,
             "properties": parcel['properties'],
-            "textual_record": text_record[0] if text_record else None
-        })
+            "textual_record": textual_store.get(plot_id)
+        }, projection))
+    
+    if cursor is not None:
+        return jsonify({"parcels": parcels, "total": total, "per_page": per_page, "next_cursor": next_cursor})
     
     return jsonify({
         "parcels": parcels,
         "total": total,
         "page": page,
         "per_page": per_page,
-        "total_pages": (total + per_page - 1) // per_page
+        "total_pages": (total + per_page - 1) // per_page,
+        "next_cursor": next_cursor
     })
 
 
+def cached_response(cached):
+    """Serve a pre-serialized body, honouring If-None-Match and Accept-Encoding"""
+    status, body, headers = cached.negotiate(
+        request.headers.get('If-None-Match'),
+        request.headers.get('Accept-Encoding')
+    )
+    return Response(body, status=status, headers=headers)
+
+
 @app.route('/api/parcels/geojson')
 def get_all_geojson():
-    return jsonify(spatial_data)
+    bbox = request.args.get('bbox')
+    if bbox is None:
+        return cached_response(geojson_responses[""])
+    
+    try:
+        bounds = parse_bbox(bbox)
+    except ValueError as e:
+        return jsonify({"detail": str(e)}), 400
+    
+    features = [parcels_by_id[plot_id] for plot_id in spatial_index.query(bounds)]
+    return jsonify({"type": "FeatureCollection", "features": features})
 
 
 @app.route('/api/parcels/geojson/<village>')
 def get_village_geojson(village):
-    features = [f for f in spatial_data.get('features', []) if f['properties'].get('village', '').lower() == village.lower()]
-    return jsonify({"type": "FeatureCollection", "features": features})
+    cached = geojson_responses.get(VillageIndex.key(village))
+    if cached is None:
+        return jsonify({"type": "FeatureCollection", "features": []})
+    return cached_response(cached)
+
+
+def geometry_for(plot_id):
+    return parcels_by_id[plot_id]['geometry']
+
+
+@app.route('/api/parcels/at')
+def get_parcel_at():
+    try:
+        lon = float(request.args['lon'])
+        lat = float(request.args['lat'])
+    except (KeyError, ValueError):
+        return jsonify({"detail": "lon and lat query parameters are required numbers"}), 400
+    
+    plot_ids = spatial_index.locate(lon, lat, geometry_for)
+    return jsonify({
+        "lon": lon,
+        "lat": lat,
+        "found": bool(plot_ids),
+        "plot_id": plot_ids[0] if plot_ids else None,
+        "matches": plot_ids
+    })
+
+
+@app.route('/api/parcels/at', methods=['POST'])
+def locate_points():
+    body = request.get_json(silent=True) or {}
+    try:
+        points = parse_points(body.get('points'), MAX_LOCATE_POINTS)
+    except ValueError as e:
+        return jsonify({"detail": str(e)}), 400
+    
+    matches = spatial_index.locate_points(points, geometry_for)
+    results = [
+        {"lon": lon, "lat": lat, "plot_id": plot_ids[0] if plot_ids else None, "matches": plot_ids}
+        for (lon, lat), plot_ids in zip(points.tolist(), matches)
+    ]
+    return jsonify({"count": len(results), "found": sum(1 for r in results if r['plot_id']), "results": results})
+
+
+@app.route('/api/parcels/batch', methods=['POST'])
+def get_parcels_batch():
+    body = request.get_json(silent=True) or {}
+    try:
+        projection = request_projection()
+        plot_ids = parse_plot_ids(body.get('plot_ids'), MAX_BATCH_PLOTS)
+    except ValueError as e:
+        return jsonify({"detail": str(e)}), 400
+    
+    parcels = []
+    missing = []
+    for plot_id, textual, attributes in zip(plot_ids, textual_store.get_many(plot_ids), attribute_store.get_many(plot_ids)):
+        parcel = parcels_by_id.get(plot_id)
+        if not parcel:
+            missing.append(plot_id)
+            continue
+        parcels.append(project({
+            "plot_id": plot_id,
+            "geometry": parcel['geometry'],
+            "properties": parcel['properties'],
+            "textual_record": textual,
+            "spatial_attributes": attributes
+        }, projection))
+    
+    return jsonify({"count": len(parcels), "parcels": parcels, "not_found": missing})
 
 
 @app.route('/api/parcels/<plot_id>')
 def get_parcel(plot_id):
+    try:
+        projection = request_projection()
+    except ValueError as e:
+        return jsonify({"detail": str(e)}), 400
+    
     parcel = parcels_by_id.get(plot_id.upper())
     if not parcel:
         return jsonify({"detail": f"Parcel not found: {plot_id}"}), 404
     
-    text_record = textual_data[textual_data['plot_id'] == plot_id.upper()].to_dict('records')
-    spatial_attr = parcel_attributes[parcel_attributes['plot_id'] == plot_id.upper()].to_dict('records')
-    
-    return jsonify({
+    return jsonify(project({
         "plot_id": plot_id.upper(),
         "geometry": parcel['geometry'],
         "properties": parcel['properties'],
-        "textual_record": text_record[0] if text_record else None,
-        "spatial_attributes": spatial_attr[0] if spatial_attr else None
-    })
+        "textual_record": textual_store.get(plot_id.upper()),
+        "spatial_attributes": attribute_store.get(plot_id.upper())
+    }, projection))
 
 
 @app.route('/api/parcels/<plot_id>', methods=['PUT'])
 def update_parcel(plot_id):
+    global duplicate_candidates, duplicate_version
     user = get_current_user()
     if not user or user['role'] not in ['editor', 'admin']:
         return jsonify({"detail": "Editor access required"}), 403
-    
-    global textual_data
+    if READ_ONLY:
+        return jsonify({"detail": "This deployment is read-only"}), 503
     
     parcel = parcels_by_id.get(plot_id.upper())
     if not parcel:
@@ -365,62 +557,120 @@ def update_parcel(plot_id):
     updates = request.get_json()
     valid_fields = ['owner_name', 'area', 'father_name', 'land_type']
     
-    idx = textual_data[textual_data['plot_id'] == plot_id.upper()].index
-    if len(idx) == 0:
+    if plot_id.upper() not in textual_store:
         return jsonify({"detail": "Record not found"}), 404
     
-    for key, value in updates.items():
-        if key in valid_fields and value is not None:
-            textual_data.loc[idx[0], key] = value
+    applied = {
+        key: value for key, value in updates.items()
+        if key in valid_fields and value is not None
+    }
+    if not applied:
+        return jsonify({"detail": "No valid updates provided"}), 400
+    
+    with edit_lock:
+        try:
+            journal.claim()
+        except JournalLocked as e:
+            return jsonify({"detail": str(e)}), 503
+        
+        updated = textual_store.update(plot_id.upper(), applied)
+        if 'owner_name' in applied:
+            owner_index.update(textual_store.position(plot_id.upper()), applied['owner_name'])
+        
+        # Durable append; the CSV is rewritten by background compaction
+        ticket = journal.enqueue(plot_id.upper(), applied)
+        
+        # Rescore only the edited plot and drop the tiles showing it
+        recompute_comparison(plot_id.upper())
+        tile_service.invalidate_parcel(plot_id.upper())
+        if any(field in applied for field in duplicate_detector.CANDIDATE_FIELDS):
+            duplicate_candidates = None
+            duplicate_version += 1
+    
+    # Outside the lock, so concurrent edits share one fsync
+    journal.wait_for(ticket)
     
-    # Save to CSV
-    textual_data.to_csv(DATA_PATH / "textual" / "land_records.csv", index=False)
+    return jsonify({
+        "success": True,
+        "message": f"Parcel {plot_id} updated",
+        "updated_by": user["username"],
+        "parcel": updated
+    })
+
+
+@app.route('/api/parcels/batch', methods=['PUT'])
+def update_parcels_batch():
+    global duplicate_candidates, duplicate_version
+    user = get_current_user()
+    if not user or user['role'] not in ['editor', 'admin']:
+        return jsonify({"detail": "Editor access required"}), 403
+    if READ_ONLY:
+        return jsonify({"detail": "This deployment is read-only"}), 503
     
-    # Recompute comparison
-    compute_comparisons()
+    body = request.get_json(silent=True) or {}
+    
+    with edit_lock:
+        try:
+            edits, results = validate_batch(body.get('updates'), lambda plot_id: plot_id in parcels_by_id and plot_id in textual_store)
+        except ValueError as e:
+            return jsonify({"detail": str(e)}), 400
+        
+        failed = sum(1 for result in results if not result['success'])
+        if failed:
+            return jsonify({
+                "detail": f"{failed} of {len(results)} updates are invalid; nothing was applied",
+                "results": results
+            }), 400
+        
+        try:
+            journal.claim()
+        except JournalLocked as e:
+            return jsonify({"detail": str(e)}), 503
+        
+        for result, (plot_id, applied) in zip(results, edits):
+            result['record'] = textual_store.update(plot_id, applied)
+            if 'owner_name' in applied:
+                owner_index.update(textual_store.position(plot_id), applied['owner_name'])
+        
+        # One durable append for the whole batch
+        ticket = journal.enqueue_batch(edits)
+        
+        # Rescore only the edited plots and drop the tiles showing them
+        for plot_id in dict.fromkeys(plot_id for plot_id, _ in edits):
+            recompute_comparison(plot_id)
+            tile_service.invalidate_parcel(plot_id)
+        if any(field in applied for _, applied in edits for field in duplicate_detector.CANDIDATE_FIELDS):
+            duplicate_candidates = None
+            duplicate_version += 1
     
-    updated = textual_data[textual_data['plot_id'] == plot_id.upper()].to_dict('records')
+    journal.wait_for(ticket)
     
     return jsonify({
         "success": True,
-        "message": f"Parcel {plot_id} updated",
+        "updated": len(results),
         "updated_by": user["username"],
-        "parcel": updated[0] if updated else None
+        "results": results
     })
 
 
+# ========================================
+# Routes - Tiles
+# ========================================
+
+@app.route('/api/tiles/<int:z>/<int:x>/<int:y>')
+def get_tile(z, x, y):
+    if not valid_tile(z, x, y, TileService.MAX_ZOOM):
+        return jsonify({"detail": f"Tile out of range: {z}/{x}/{y}"}), 404
+    return jsonify(tile_service.get_tile(z, x, y))
+
+
 # ========================================
 # Routes - Reconciliation
 # ========================================
 
 @app.route('/api/reconciliation/stats')
 def get_recon_stats():
-    matched = sum(1 for c in comparison_cache.values() if c['name_analysis']['status'] == 'match')
-    partial = sum(1 for c in comparison_cache.values() if c['name_analysis']['status'] == 'partial')
-    mismatched = sum(1 for c in comparison_cache.values() if c['name_analysis']['status'] == 'mismatch')
-    total = len(comparison_cache)
-    
-    by_village = {}
-    for c in comparison_cache.values():
-        village = c.get('village', 'Unknown')
-        if village not in by_village:
-            by_village[village] = {"matched": 0, "partial": 0, "mismatch": 0}
-        status = c['name_analysis']['status']
-        if status == 'match':
-            by_village[village]['matched'] += 1
-        elif status == 'partial':
-            by_village[village]['partial'] += 1
-        else:
-            by_village[village]['mismatch'] += 1
-    
-    return jsonify({
-        "total_records": total,
-        "matched": matched,
-        "partial_matches": partial,
-        "mismatches": mismatched,
-        "match_rate": round((matched / total) * 100, 1) if total > 0 else 0,
-        "by_village": by_village
-    })
+    return jsonify(comparison_cache.stats())
 
 
 @app.route('/api/reconciliation/compare')
@@ -476,6 +726,39 @@ def get_report():
     })
 
 
+@app.route('/api/reconciliation/duplicates')
+def get_duplicates():
+    global duplicate_candidates
+    threshold = int(request.args.get('threshold', duplicate_detector.DUPLICATE_THRESHOLD))
+    village_filter = request.args.get('village')
+    
+    with edit_lock:
+        candidates = duplicate_candidates
+        version = duplicate_version
+        if candidates is None:
+            records = list(textual_store)
+    
+    # Score outside the lock so edits are not held up behind it
+    if candidates is None:
+        candidates = duplicate_detector.score_candidates(records)
+        with edit_lock:
+            if duplicate_version == version:
+                duplicate_candidates = candidates
+    
+    clusters = duplicate_detector.build_clusters(textual_store, candidates['pairs'], threshold)
+    if village_filter:
+        clusters = [c for c in clusters if str(c['village']).lower() == village_filter.lower()]
+    
+    return jsonify({
+        "threshold": threshold,
+        "count": len(clusters),
+        "duplicate_records": sum(c['size'] for c in clusters),
+        "compared_pairs": candidates['compared_pairs'],
+        "skipped_blocks": candidates['skipped_blocks'],
+        "clusters": clusters
+    })
+
+
 @app.route('/api/reconciliation/check/<plot_id>')
 def check_parcel(plot_id):
     comparison = comparison_cache.get(plot_id.upper())
@@ -484,24 +767,27 @@ def check_parcel(plot_id):
     return jsonify({"found": False, "message": f"No comparison for: {plot_id}"})
 
 
+EXPORT_COLUMNS = ["plot_id", "village", "textual_owner", "spatial_owner", "similarity_score", "match_status"]
+
+
 @app.route('/api/reconciliation/report/export')
 def export_report():
-    rows = []
-    for c in comparison_cache.values():
-        rows.append({
-            "plot_id": c['plot_id'],
-            "village": c.get('village', ''),
-            "textual_owner": c['name_analysis']['textual_name'],
-            "spatial_owner": c['name_analysis']['spatial_name'],
-            "similarity_score": c['name_analysis']['similarity_score'],
-            "match_status": c['name_analysis']['status']
-        })
+    export_format = request.args.get('format', 'csv')
+    # Snapshot the references so edits during the download don't disturb iteration
+    comparisons = list(comparison_cache.values())
     
-    return jsonify({
-        "format": "csv",
-        "headers": ["plot_id", "village", "textual_owner", "spatial_owner", "similarity_score", "match_status"],
-        "rows": rows
-    })
+    if export_format == 'json':
+        rows = list(report_export.export_rows(comparisons, EXPORT_COLUMNS))
+        return jsonify({"format": "csv", "headers": EXPORT_COLUMNS, "rows": rows})
+    if export_format not in report_export.EXPORT_FORMATS:
+        return jsonify({"detail": "format must be csv, ndjson or json"}), 400
+    
+    filename = f"reconciliation_report_{datetime.now().date().isoformat()}.{export_format}"
+    return Response(
+        report_export.stream_export(comparisons, export_format, EXPORT_COLUMNS),
+        content_type=report_export.EXPORT_FORMATS[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
 
 
 # ========================================
@@ -0,0 +1,58 @@
+"""
+Gunicorn configuration for the Flask API (app:app)
+
+With preload (the default), the dataset is loaded, indexed and reconciled
+once in the master before any worker is forked. Workers then share those
+structures through copy-on-write instead of each building its own copy.
+Set LRD_PRELOAD=0 to have every worker load the data itself.
+
+Edits live in the memory of the worker that made them, so more than one
+worker is refused unless LRD_READ_ONLY=1 turns edits off.
+"""
+
+import gc
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+read_only = os.environ.get("LRD_READ_ONLY", "0") == "1"
+workers = int(os.environ.get("WEB_CONCURRENCY", (os.cpu_count() or 1) if read_only else 1))
+preload_app = os.environ.get("LRD_PRELOAD", "1") != "0"
+
+
+def load_dataset():
+    import app
+
+    app.load_all_data()
+    # A compaction thread must not be mid-write when the master forks
+    if app.journal is not None:
+        app.journal.wait_for_compaction()
+
+
+def on_starting(server):
+    """Refuse to fork workers that would each keep their own edits"""
+    if server.cfg.workers > 1 and not read_only:
+        raise RuntimeError(
+            f"{server.cfg.workers} workers would each keep their own edits; "
+            "run one worker, or set LRD_READ_ONLY=1 to serve without edits"
+        )
+
+
+def when_ready(server):
+    """Runs in the master once the app is imported, before workers fork"""
+    if not preload_app:
+        return
+
+    load_dataset()
+
+    # Move everything loaded so far into the permanent generation. Worker
+    # GC passes then never write to these objects' headers, which would
+    # copy the shared pages into every worker.
+    gc.collect()
+    gc.freeze()
+    server.log.info("Dataset preloaded and frozen; forking workers")
+
+
+def post_worker_init(worker):
+    """Without preload every worker loads its own copy"""
+    if not preload_app:
+        load_dataset()
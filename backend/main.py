@@ -3,22 +3,35 @@ Land Record Digitization Tool - FastAPI Backend
 Main application entry point
 """
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
 
-from routes import search, parcels, reconciliation, auth
-from services.data_service import DataService
-
-# Initialize data service
-data_service = DataService()
+from routes import search, parcels, reconciliation, auth, tiles, admin
+from services.data_service import get_data_service
+from services.matching_service import MatchingService
+from services.edit_journal import JournalLocked
+from services.executor import ExecutorBusy, get_executor
+from services.source_watcher import SourceWatcher
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Load data on startup"""
-    data_service.load_all_data()
+    """Load and warm the shared data service before accepting requests"""
+    data_service = get_data_service()
+    if data_service.data_loaded:
+        # Install the comparison table built at load for the first reconciliation request
+        MatchingService.get_comparison_table()
+    
+    # Swap in new data whenever the feed replaces a source file
+    watcher = SourceWatcher()
+    watcher.start()
     yield
+    watcher.stop()
+    get_executor().shutdown()
+    # A reload may have replaced the service loaded above
+    get_data_service().close()
 
 
 app = FastAPI(
@@ -37,11 +50,25 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.exception_handler(ExecutorBusy)
+async def executor_busy(request: Request, exc: ExecutorBusy):
+    """Shed load once the worker queue is full"""
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
+
+@app.exception_handler(JournalLocked)
+async def journal_locked(request: Request, exc: JournalLocked):
+    """Edits are refused by every process but the one owning the journal"""
+    return JSONResponse(status_code=503, content={"detail": str(exc)})
+
+
 # Include routers
 app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
 app.include_router(search.router, prefix="/api/search", tags=["Search"])
 app.include_router(parcels.router, prefix="/api/parcels", tags=["Parcels"])
 app.include_router(reconciliation.router, prefix="/api/reconciliation", tags=["Reconciliation"])
+app.include_router(tiles.router, prefix="/api/tiles", tags=["Tiles"])
+app.include_router(admin.router, prefix="/api/admin", tags=["Admin"])
 
 
 @app.get("/")
@@ -54,10 +81,24 @@ async def root():
     }
 
 
+@app.get("/api/ready")
+async def ready():
+    """Readiness probe: 200 once data is loaded, indexed and warmed"""
+    data_service = get_data_service()
+    body = {
+        "ready": data_service.data_loaded,
+        "parcels": len(data_service.parcels_by_id),
+        "version": data_service.version,
+        "startup_ms": data_service.load_timings,
+        "total_ms": round(sum(data_service.load_timings.values()), 1)
+    }
+    return JSONResponse(status_code=200 if data_service.data_loaded else 503, content=body)
+
+
 @app.get("/api/stats")
 async def get_stats():
     """Get overall statistics"""
-    return data_service.get_statistics()
+    return await get_executor().run(get_data_service().get_statistics)
 
 
 if __name__ == "__main__":
@@ -1,2 +1,2 @@
 # Routes package
-from routes import auth, search, parcels, reconciliation
+from routes import auth, search, parcels, reconciliation, tiles
@@ -0,0 +1,54 @@
+"""
+Admin Routes - Operational controls for the data service
+"""
+
+from fastapi import APIRouter, HTTPException, Depends
+
+from routes.auth import require_admin
+from services.data_service import ReloadFailed, ReloadInProgress, get_data_service, reload_data_service
+from services.executor import get_executor
+
+router = APIRouter()
+
+
+@router.post("/reload")
+async def reload_data(user: dict = Depends(require_admin)):
+    """
+    Reload the source files now (requires admin role). The new data is
+    built in the background and swapped in; requests keep being served
+    from the old data until then.
+    """
+    try:
+        data_service = await get_executor().run(reload_data_service)
+    except ReloadInProgress as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ReloadFailed as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    return {
+        "success": True,
+        "reloaded_by": user["username"],
+        "version": data_service.version,
+        "parcels": len(data_service.parcels_by_id),
+        "reused": data_service.reused,
+        "changed_villages": data_service.changed_villages,
+        "load_ms": data_service.load_timings,
+        "total_ms": round(sum(data_service.load_timings.values()), 1)
+    }
+
+
+@router.get("/partitions")
+async def get_partition_stats(user: dict = Depends(require_admin)):
+    """
+    Per-village partition metrics (requires admin role): lookups served
+    from a loaded partition (hits) or needing a load (misses), load times,
+    evictions, and the bytes held against the budget.
+    """
+    data_service = get_data_service()
+    if data_service.partitions is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Storage is not partitioned (LRD_STORAGE={data_service.storage})"
+        )
+    
+    return data_service.partitions.stats()
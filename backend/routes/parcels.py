@@ -2,62 +2,194 @@
 Parcel Routes - CRUD operations for parcels
 """
 
-from fastapi import APIRouter, HTTPException, Depends, Query, Body
+from fastapi import APIRouter, HTTPException, Depends, Query, Body, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 from typing import Optional, Dict, Any
 
 from services.data_service import get_data_service
+from services.spatial_index import parse_bbox, parse_points
+from services.response_cache import CachedResponse
+from services.pagination import InvalidCursor
+from services.projection import Projection, project
+from services.plot_id_index import parse_plot_ids
+from services.batch_update import validate_batch
+from services.matching_service import MatchingService
+from services.executor import get_executor
 from routes.auth import get_current_user, require_editor
 
 router = APIRouter()
 
+# Upper bound on points accepted by the batch point lookup
+MAX_LOCATE_POINTS = 10000
+
+# Upper bound on plot IDs accepted by the batch fetch
+MAX_BATCH_PLOTS = 1000
+
+
+def cached_response(request: Request, cached: CachedResponse) -> Response:
+    """Serve a pre-serialized body, honouring If-None-Match and Accept-Encoding"""
+    status, body, headers = cached.negotiate(
+        request.headers.get("if-none-match"),
+        request.headers.get("accept-encoding")
+    )
+    return Response(content=body, status_code=status, headers=headers)
+
+
+def get_projection(
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. plot_id,textual_record.owner_name"),
+    exclude: Optional[str] = Query(None, description="Comma-separated fields to leave out, e.g. geometry")
+) -> Optional[Projection]:
+    """Parse the fields= / exclude= projection shared by parcel-returning endpoints"""
+    try:
+        return Projection.parse(fields, exclude)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 
 @router.get("")
 async def get_all_parcels(
     page: int = Query(1, ge=1),
-    per_page: int = Query(50, ge=1, le=200)
+    per_page: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page; overrides page"),
+    projection: Optional[Projection] = Depends(get_projection)
 ):
     """
     Get all parcels with pagination
     """
     data_service = get_data_service()
-    result = data_service.get_all_parcels(page, per_page)
+    
+    try:
+        result = await get_executor().run(data_service.get_all_parcels, page, per_page, cursor, projection)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     return result
 
 
 @router.get("/geojson")
-async def get_all_geojson():
+async def get_all_geojson(
+    request: Request,
+    bbox: Optional[str] = Query(None, description="Only parcels intersecting minx,miny,maxx,maxy")
+):
     """
-    Get complete GeoJSON for all parcels
+    Get GeoJSON for all parcels, or only those in a bounding box
     """
     data_service = get_data_service()
-    return data_service.get_all_geojson()
+    
+    if bbox is None:
+        if data_service.partitions is not None:
+            # Streamed a village at a time rather than held whole
+            return StreamingResponse(data_service.partitions.iter_geojson(), media_type="application/json")
+        cached = await get_executor().run(data_service.get_geojson_response)
+        return cached_response(request, cached)
+    
+    try:
+        bounds = parse_bbox(bbox)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return await get_executor().run(data_service.get_geojson_in_bbox, bounds)
 
 
 @router.get("/geojson/{village}")
-async def get_village_geojson(village: str):
+async def get_village_geojson(village: str, request: Request):
     """
     Get GeoJSON for a specific village
     """
     data_service = get_data_service()
-    geojson = data_service.get_geojson_for_village(village)
+    cached = await get_executor().run(data_service.get_geojson_response, village)
     
-    if not geojson['features']:
+    if cached is None:
         raise HTTPException(
             status_code=404,
             detail=f"No parcels found for village: {village}"
         )
     
-    return geojson
+    return cached_response(request, cached)
+
+
+@router.get("/at")
+async def get_parcel_at(
+    lon: float = Query(..., ge=-180, le=180),
+    lat: float = Query(..., ge=-90, le=90)
+):
+    """
+    Find the parcel containing a coordinate
+    """
+    data_service = get_data_service()
+    plot_ids = await get_executor().run(data_service.get_plots_at, lon, lat)
+    
+    return {
+        "lon": lon,
+        "lat": lat,
+        "found": bool(plot_ids),
+        "plot_id": plot_ids[0] if plot_ids else None,
+        "matches": plot_ids
+    }
+
+
+@router.post("/batch")
+async def get_parcels_batch(
+    body: Dict[str, Any] = Body(...),
+    projection: Optional[Projection] = Depends(get_projection)
+):
+    """
+    Get many parcels in one request.
+    Body: {"plot_ids": ["RAM-001", ...]}
+    """
+    try:
+        plot_ids = parse_plot_ids(body.get("plot_ids"), MAX_BATCH_PLOTS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    data_service = get_data_service()
+    parcels, missing = await get_executor().run(data_service.get_parcels_by_ids, plot_ids, projection)
+    
+    return {
+        "count": len(parcels),
+        "parcels": parcels,
+        "not_found": missing
+    }
+
+
+@router.post("/at")
+async def locate_points(body: Dict[str, Any] = Body(...)):
+    """
+    Find the parcels containing many coordinates in one request.
+    Body: {"points": [[lon, lat], ...]}
+    """
+    try:
+        points = parse_points(body.get("points"), MAX_LOCATE_POINTS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    data_service = get_data_service()
+    matches = await get_executor().run(data_service.locate_points, points)
+    
+    results = [
+        {
+            "lon": lon,
+            "lat": lat,
+            "plot_id": plot_ids[0] if plot_ids else None,
+            "matches": plot_ids
+        }
+        for (lon, lat), plot_ids in zip(points.tolist(), matches)
+    ]
+    
+    return {
+        "count": len(results),
+        "found": sum(1 for r in results if r["plot_id"]),
+        "results": results
+    }
 
 
 @router.get("/{plot_id}")
-async def get_parcel(plot_id: str):
+async def get_parcel(plot_id: str, projection: Optional[Projection] = Depends(get_projection)):
     """
     Get a single parcel by plot ID
     """
     data_service = get_data_service()
-    parcel = data_service.get_parcel_by_id(plot_id.upper())
+    parcel = await get_executor().run(data_service.get_parcel_by_id, plot_id.upper())
     
     if not parcel:
         raise HTTPException(
@@ -65,9 +197,55 @@ async def get_parcel(plot_id: str):
             detail=f"Parcel not found: {plot_id}"
         )
     
-    return {
+    return project({
         "plot_id": plot_id.upper(),
         **parcel
+    }, projection)
+
+
+@router.put("/batch")
+async def update_parcels_batch(
+    body: Dict[str, Any] = Body(...),
+    user: dict = Depends(require_editor)
+):
+    """
+    Update many textual records at once (requires editor role).
+    Body: {"updates": [{"plot_id": "RAM-001", "owner_name": "..."}, ...]}
+    Every update is validated first; if any is invalid nothing is applied.
+    """
+    data_service = get_data_service()
+    
+    try:
+        edits, results = validate_batch(body.get("updates"), data_service.textual_store.__contains__)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    failed = sum(1 for result in results if not result["success"])
+    if failed:
+        return JSONResponse(status_code=400, content={
+            "detail": f"{failed} of {len(results)} updates are invalid; nothing was applied",
+            "results": results
+        })
+    
+    def apply_edits():
+        applied = data_service.edit_records(edits)
+        if applied is not None:
+            MatchingService.rescore_plots(list(dict.fromkeys(plot_id for plot_id, _ in edits)), applied[0])
+        return applied
+    
+    applied = await get_executor().run(apply_edits)
+    if applied is None:
+        raise HTTPException(status_code=409, detail="Records changed by a reload; nothing was applied")
+    _, records = applied
+    
+    for result, record in zip(results, records):
+        result["record"] = record
+    
+    return {
+        "success": True,
+        "updated": len(results),
+        "updated_by": user["username"],
+        "results": results
     }
 
 
@@ -83,7 +261,7 @@ async def update_parcel(
     data_service = get_data_service()
     
     # Check if parcel exists
-    parcel = data_service.get_parcel_by_id(plot_id.upper())
+    parcel = await get_executor().run(data_service.get_parcel_by_id, plot_id.upper())
     if not parcel:
         raise HTTPException(
             status_code=404,
@@ -100,8 +278,15 @@ async def update_parcel(
             detail="No valid updates provided"
         )
     
-    # Perform update
-    success = data_service.update_textual_record(plot_id.upper(), update_dict)
+    def apply_edit():
+        # Returns once the journal append is on disk
+        applied = data_service.edit_records([(plot_id.upper(), update_dict)], batch=False)
+        if applied is None:
+            return False
+        MatchingService.rescore_plots([plot_id.upper()], applied[0])
+        return True
+    
+    success = await get_executor().run(apply_edit)
     
     if not success:
         raise HTTPException(
@@ -110,7 +295,7 @@ async def update_parcel(
         )
     
     # Get updated parcel
-    updated_parcel = data_service.get_parcel_by_id(plot_id.upper())
+    updated_parcel = await get_executor().run(data_service.get_parcel_by_id, plot_id.upper())
     
     return {
         "success": True,
@@ -3,6 +3,8 @@ Reconciliation Routes - Comparison and mismatch detection
 """
 
 from fastapi import APIRouter, Query
+from fastapi.responses import StreamingResponse
+from datetime import date
 from typing import Optional
 
 from services.matching_service import (
@@ -11,6 +13,8 @@ from services.matching_service import (
     get_mismatches,
     generate_reconciliation_report
 )
+from services import report_export
+from services.executor import get_executor
 
 router = APIRouter()
 
@@ -20,7 +24,7 @@ async def get_stats():
     """
     Get reconciliation statistics summary
     """
-    stats = get_reconciliation_stats()
+    stats = await get_executor().run(get_reconciliation_stats)
     return stats
 
 
@@ -32,11 +36,15 @@ async def get_mismatch_list(
     """
     Get list of records with name mismatches below threshold
     """
-    mismatches = get_mismatches(threshold)
+    def filtered_mismatches():
+        mismatches = get_mismatches(threshold)
+        
+        # Filter by village if specified
+        if village:
+            mismatches = [m for m in mismatches if m.get('village', '').lower() == village.lower()]
+        return mismatches
     
-    # Filter by village if specified
-    if village:
-        mismatches = [m for m in mismatches if m.get('village', '').lower() == village.lower()]
+    mismatches = await get_executor().run(filtered_mismatches)
     
     return {
         "threshold": threshold,
@@ -53,34 +61,37 @@ async def get_all_comparisons(
     """
     Get all record comparisons with filtering
     """
-    comparisons = MatchingService.get_all_comparisons()
-    
-    # Apply filters
-    if status:
-        comparisons = [c for c in comparisons if c['name_analysis']['status'] == status]
-    
-    if village:
-        comparisons = [c for c in comparisons if c.get('village', '').lower() == village.lower()]
-    
-    # Calculate stats for filtered results
-    total = len(comparisons)
-    matched = sum(1 for c in comparisons if c['name_analysis']['status'] == 'match')
-    partial = sum(1 for c in comparisons if c['name_analysis']['status'] == 'partial')
-    mismatched = sum(1 for c in comparisons if c['name_analysis']['status'] == 'mismatch')
+    def filtered_comparisons():
+        comparisons = MatchingService.get_all_comparisons()
+        
+        # Apply filters
+        if status:
+            comparisons = [c for c in comparisons if c['name_analysis']['status'] == status]
+        
+        if village:
+            comparisons = [c for c in comparisons if c.get('village', '').lower() == village.lower()]
+        
+        # Calculate stats for filtered results
+        total = len(comparisons)
+        matched = sum(1 for c in comparisons if c['name_analysis']['status'] == 'match')
+        partial = sum(1 for c in comparisons if c['name_analysis']['status'] == 'partial')
+        mismatched = sum(1 for c in comparisons if c['name_analysis']['status'] == 'mismatch')
+        
+        return {
+            "filters": {
+                "status": status,
+                "village": village
+            },
+            "summary": {
+                "total": total,
+                "matched": matched,
+                "partial": partial,
+                "mismatched": mismatched
+            },
+            "comparisons": comparisons
+        }
     
-    return {
-        "filters": {
-            "status": status,
-            "village": village
-        },
-        "summary": {
-            "total": total,
-            "matched": matched,
-            "partial": partial,
-            "mismatched": mismatched
-        },
-        "comparisons": comparisons
-    }
+    return await get_executor().run(filtered_comparisons)
 
 
 @router.get("/report")
@@ -88,41 +99,43 @@ async def get_full_report():
     """
     Generate comprehensive reconciliation report
     """
-    report = generate_reconciliation_report()
+    report = await get_executor().run(generate_reconciliation_report)
     return report
 
 
 @router.get("/report/export")
-async def export_report_csv():
+async def export_report_csv(
+    format: str = Query("csv", pattern="^(csv|ndjson|json)$", description="csv, ndjson, or json (rows in one object)")
+):
     """
-    Export reconciliation report as CSV format
+    Export reconciliation report, streamed as CSV or NDJSON
     """
-    comparisons = MatchingService.get_all_comparisons()
+    comparisons = await get_executor().run(MatchingService.get_all_comparisons)
     
-    # Format as CSV-compatible data
-    rows = []
-    for c in comparisons:
-        rows.append({
-            "plot_id": c['plot_id'],
-            "village": c.get('village', ''),
-            "textual_owner": c['name_analysis']['textual_name'],
-            "spatial_owner": c['name_analysis']['spatial_name'],
-            "similarity_score": c['name_analysis']['similarity_score'],
-            "match_status": c['name_analysis']['status'],
-            "textual_area": c.get('textual_area', ''),
-            "spatial_area": c.get('spatial_area', ''),
-            "area_match": c.get('area_match', False)
-        })
+    if format == "json":
+        return {
+            "format": "csv",
+            "headers": report_export.EXPORT_COLUMNS,
+            "rows": list(report_export.export_rows(comparisons))
+        }
     
-    return {
-        "format": "csv",
-        "headers": [
-            "plot_id", "village", "textual_owner", "spatial_owner",
-            "similarity_score", "match_status", "textual_area", 
-            "spatial_area", "area_match"
-        ],
-        "rows": rows
-    }
+    filename = f"reconciliation_report_{date.today().isoformat()}.{format}"
+    return StreamingResponse(
+        report_export.stream_export(comparisons, format),
+        media_type=report_export.EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+@router.get("/duplicates")
+async def get_duplicate_owners(
+    threshold: int = Query(80, ge=0, le=100, description="Owner name similarity needed to link two plots"),
+    village: Optional[str] = Query(None, description="Filter by village name")
+):
+    """
+    Find the same owner registered under variant spellings on different plots
+    """
+    return await get_executor().run(MatchingService.get_duplicate_clusters, threshold, village)
 
 
 @router.get("/check/{plot_id}")
@@ -130,12 +143,7 @@ async def check_single_parcel(plot_id: str):
     """
     Check reconciliation status for a single parcel
     """
-    comparisons = MatchingService.get_all_comparisons()
-    
-    parcel_comparison = next(
-        (c for c in comparisons if c['plot_id'].upper() == plot_id.upper()),
-        None
-    )
+    parcel_comparison = await get_executor().run(MatchingService.get_comparison, plot_id)
     
     if not parcel_comparison:
         return {
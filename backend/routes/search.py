@@ -2,21 +2,24 @@
 Search Routes - Plot ID and Owner Name search
 """
 
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Query, Depends
 from typing import Optional
 
 from services.data_service import get_data_service
+from services.projection import Projection
+from services.executor import get_executor
+from routes.parcels import get_projection
 
 router = APIRouter()
 
 
 @router.get("/plot/{plot_id}")
-async def search_by_plot_id(plot_id: str):
+async def search_by_plot_id(plot_id: str, projection: Optional[Projection] = Depends(get_projection)):
     """
     Search for a parcel by exact plot ID
     """
     data_service = get_data_service()
-    parcel = data_service.get_parcel_by_id(plot_id.upper())
+    parcel = await get_executor().run(data_service.get_parcel_by_id, plot_id.upper(), projection)
     
     if not parcel:
         return {
@@ -34,13 +37,14 @@ async def search_by_plot_id(plot_id: str):
 @router.get("/plot")
 async def search_plots(
     q: str = Query(..., min_length=1, description="Plot ID search query"),
-    limit: int = Query(20, ge=1, le=100)
+    limit: int = Query(20, ge=1, le=100),
+    projection: Optional[Projection] = Depends(get_projection)
 ):
     """
     Search for parcels by partial plot ID match
     """
     data_service = get_data_service()
-    results = data_service.search_by_plot_id(q, limit)
+    results = await get_executor().run(data_service.search_by_plot_id, q, limit, projection)
     
     return {
         "query": q,
@@ -52,13 +56,14 @@ async def search_plots(
 @router.get("/owner")
 async def search_by_owner(
     q: str = Query(..., min_length=2, description="Owner name search query"),
-    limit: int = Query(20, ge=1, le=100)
+    limit: int = Query(20, ge=1, le=100),
+    projection: Optional[Projection] = Depends(get_projection)
 ):
     """
     Search for parcels by owner name using fuzzy matching
     """
     data_service = get_data_service()
-    results = data_service.search_by_owner_name(q, limit)
+    results = await get_executor().run(data_service.search_by_owner_name, q, limit, projection)
     
     return {
         "query": q,
@@ -68,12 +73,12 @@ async def search_by_owner(
 
 
 @router.get("/village/{village_name}")
-async def search_by_village(village_name: str):
+async def search_by_village(village_name: str, projection: Optional[Projection] = Depends(get_projection)):
     """
     Get all parcels in a specific village
     """
     data_service = get_data_service()
-    results = data_service.get_parcels_by_village(village_name)
+    results = await get_executor().run(data_service.get_parcels_by_village, village_name, projection)
     
     if not results:
         return {
@@ -0,0 +1,26 @@
+"""
+Tile Routes - Clipped, quantized parcel tiles for the map
+"""
+
+from fastapi import APIRouter, HTTPException
+
+from services.data_service import get_data_service
+from services.tile_service import TileService, valid_tile
+from services.executor import get_executor
+
+router = APIRouter()
+
+
+@router.get("/{z}/{x}/{y}")
+async def get_tile(z: int, x: int, y: int):
+    """
+    Get the parcels in an XYZ tile as GeoJSON in tile coordinates
+    """
+    if not valid_tile(z, x, y, TileService.MAX_ZOOM):
+        raise HTTPException(
+            status_code=404,
+            detail=f"Tile out of range: {z}/{x}/{y}"
+        )
+    
+    data_service = get_data_service()
+    return await get_executor().run(data_service.get_tile, z, x, y)
@@ -1,4 +1,6 @@
 # Services package
+# auth_service is imported directly by the FastAPI routes; it is not re-exported
+# here so the Flask app can use the data services without python-jose installed.
 from services.data_service import DataService, get_data_service
 from services.matching_service import MatchingService
-from services.auth_service import authenticate_user, verify_token, check_permission
+from services.record_store import RecordStore
@@ -0,0 +1,53 @@
+"""
+Batch Update - Validates multi-record edits before any of them are applied
+"""
+
+from typing import Any, Callable, Dict, List, Tuple
+
+# Fields of a textual record that edits may change
+EDITABLE_FIELDS = ['owner_name', 'area', 'father_name', 'land_type']
+
+# Upper bound on records changed by one batch update
+MAX_BATCH_UPDATES = 1000
+
+Edit = Tuple[str, Dict]
+
+
+def validate_batch(items: Any, exists: Callable[[str], bool],
+                   max_items: int = MAX_BATCH_UPDATES) -> Tuple[List[Edit], List[Dict]]:
+    """
+    Check every item of a batch update up front.
+
+    Each item is {"plot_id": ..., <field>: <value>, ...}; fields outside
+    EDITABLE_FIELDS and null values are ignored, as for a single update.
+    Returns (edits, results) with one result per item in request order; the
+    batch may only be applied if every result has "success". Raises
+    ValueError if the batch itself is malformed.
+    """
+    if not isinstance(items, list) or not items:
+        raise ValueError("updates must be a non-empty list")
+    if len(items) > max_items:
+        raise ValueError(f"At most {max_items} updates per request")
+
+    edits = []
+    results = []
+    for item in items:
+        if not isinstance(item, dict) or not isinstance(item.get('plot_id'), str):
+            results.append({"plot_id": None, "success": False, "error": "Each update needs a plot_id"})
+            continue
+
+        plot_id = item['plot_id'].strip().upper()
+        updates = {
+            key: value for key, value in item.items()
+            if key in EDITABLE_FIELDS and value is not None
+        }
+
+        if not exists(plot_id):
+            results.append({"plot_id": plot_id, "success": False, "error": f"Parcel not found: {plot_id}"})
+        elif not updates:
+            results.append({"plot_id": plot_id, "success": False, "error": "No valid updates provided"})
+        else:
+            edits.append((plot_id, updates))
+            results.append({"plot_id": plot_id, "success": True})
+
+    return edits, results
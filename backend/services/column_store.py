@@ -0,0 +1,461 @@
+"""
+Column Store - Records, parcel geometry and GeoJSON responses in read-only memory-mapped files
+"""
+
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+from services.response_cache import CachedResponse
+
+# Bump whenever the on-disk layout changes
+COLUMN_STORE_FORMAT = 2
+
+ENCODINGS = ("identity", "gzip", "br")
+
+# Geometry encodings
+POLYGON = 0
+MULTIPOLYGON = 1
+OTHER = 2
+
+
+# ----------------------------------------
+# Writing
+# ----------------------------------------
+
+def _write_strings(directory: Path, name: str, values: List[Any]):
+    """UTF-8 bytes back to back, with offsets and a null mask"""
+    null = np.array([value is None or (isinstance(value, float) and np.isnan(value)) for value in values], dtype=bool)
+    encoded = [b"" if missing else str(value).encode('utf-8') for value, missing in zip(values, null)]
+
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(chunk) for chunk in encoded], out=offsets[1:])
+
+    with open(directory / f"{name}.bytes", 'wb') as f:
+        f.write(b"".join(encoded))
+    np.save(directory / f"{name}.offsets.npy", offsets)
+    np.save(directory / f"{name}.null.npy", null)
+
+
+def _write_table(directory: Path, frame: pd.DataFrame, key: str) -> Dict:
+    """Write each column of a frame as its own file; returns its manifest entry"""
+    directory.mkdir(parents=True)
+    columns = []
+    for number, column in enumerate(frame.columns):
+        name = f"c{number}"
+        series = frame[column]
+        if pd.api.types.is_datetime64_any_dtype(series):
+            kind = "datetime"
+            np.save(directory / f"{name}.npy", series.to_numpy())
+        elif pd.api.types.is_bool_dtype(series) or pd.api.types.is_numeric_dtype(series):
+            kind = "number"
+            np.save(directory / f"{name}.npy", series.to_numpy())
+        else:
+            kind = "str"
+            _write_strings(directory, name, series.tolist())
+        columns.append({"name": str(column), "file": name, "kind": kind, "dtype": str(series.dtype)})
+
+    # Sorted keys for binary search; a stable sort keeps the first duplicate first
+    keys = np.array([str(value).encode('utf-8') for value in frame[key].tolist()], dtype=bytes)
+    order = np.argsort(keys, kind='stable')
+    np.save(directory / "keys.sorted.npy", keys[order])
+    np.save(directory / "keys.order.npy", order.astype(np.int64))
+
+    return {"rows": len(frame), "key": key, "columns": columns}
+
+
+def _write_features(directory: Path, features: List[Dict]) -> Dict:
+    """
+    Geometry as flat coordinate buffers with offsets; everything else about
+    a feature (properties included) as a JSON string per feature.
+    """
+    types, feature_polygons, polygon_rings, ring_points = [], [0], [0], [0]
+    coordinates: List[List[float]] = []
+    rest, other_geometry = [], []
+
+    for feature in features:
+        geometry = feature.get('geometry') or {}
+        polygons = None
+        if geometry.get('type') == 'Polygon':
+            polygons = [geometry.get('coordinates')]
+        elif geometry.get('type') == 'MultiPolygon':
+            polygons = geometry.get('coordinates')
+
+        flat = polygons is not None and all(
+            len(point) == 2 for polygon in polygons for ring in polygon for point in ring
+        )
+        if flat:
+            types.append(POLYGON if geometry['type'] == 'Polygon' else MULTIPOLYGON)
+            for polygon in polygons:
+                for ring in polygon:
+                    coordinates.extend(ring)
+                    ring_points.append(len(coordinates))
+                polygon_rings.append(len(ring_points) - 1)
+            other_geometry.append(None)
+        else:
+            types.append(OTHER)
+            other_geometry.append(json.dumps(geometry))
+        feature_polygons.append(len(polygon_rings) - 1)
+
+        rest.append(json.dumps({k: v for k, v in feature.items() if k != 'geometry'}))
+
+    frame = pd.DataFrame({
+        "plot_id": [feature['properties']['plot_id'] for feature in features],
+        "feature": rest,
+        "geometry": other_geometry
+    })
+    table = _write_table(directory, frame, "plot_id")
+
+    np.save(directory / "geometry.type.npy", np.array(types, dtype=np.int8))
+    np.save(directory / "geometry.feature_polygons.npy", np.array(feature_polygons, dtype=np.int64))
+    np.save(directory / "geometry.polygon_rings.npy", np.array(polygon_rings, dtype=np.int64))
+    np.save(directory / "geometry.ring_points.npy", np.array(ring_points, dtype=np.int64))
+    np.save(directory / "geometry.coordinates.npy", np.array(coordinates, dtype=np.float64).reshape(-1, 2))
+    return table
+
+
+def _write_responses(directory: Path, responses: Mapping[str, CachedResponse]) -> Dict:
+    """
+    Every variant of every response, one file of bodies back to back per
+    encoding, with offsets; ETags go in the manifest entry
+    """
+    directory.mkdir(parents=True)
+    keys = list(responses)
+    encodings = {}
+    for encoding in ENCODINGS:
+        # Brotli is optional, but the same for every response
+        if not all(encoding in responses[key].encodings for key in keys):
+            continue
+
+        offsets = np.zeros(len(keys) + 1, dtype=np.int64)
+        etags = []
+        with open(directory / f"{encoding}.bytes", 'wb') as f:
+            for number, key in enumerate(keys):
+                body = responses[key].body_for(encoding)
+                f.write(body)
+                offsets[number + 1] = offsets[number] + len(body)
+                etags.append(responses[key].etag_for(encoding))
+        np.save(directory / f"{encoding}.offsets.npy", offsets)
+        encodings[encoding] = etags
+
+    return {"keys": keys, "etags": encodings}
+
+
+def store_path(directory: Path, digest: str) -> Path:
+    return Path(directory) / f"columns-{digest[:16]}"
+
+
+def write_column_store(directory: Path, digest: str, tables: Dict[str, pd.DataFrame],
+                       features: List[Dict], responses: Mapping[str, CachedResponse],
+                       key: str = 'plot_id') -> Path:
+    """
+    Write record tables, parcel features and serialized GeoJSON responses
+    for `digest` once. The store is built in a private directory and renamed
+    into place, so concurrent writers are harmless: the first rename wins
+    and the others are dropped.
+    """
+    directory = Path(directory)
+    final = store_path(directory, digest)
+    if final.exists():
+        return final
+
+    tmp = final.with_name(f"{final.name}.tmp-{os.getpid()}")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    try:
+        manifest = {
+            "format": COLUMN_STORE_FORMAT,
+            "digest": digest,
+            "tables": {name: _write_table(tmp / name, frame, key) for name, frame in tables.items()},
+            "features": _write_features(tmp / "features", features),
+            "responses": _write_responses(tmp / "responses", responses)
+        }
+        with open(tmp / "manifest.json", 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+        os.rename(tmp, final)
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)
+        if not final.exists():
+            raise
+
+    # Processes still mapping an older store keep their open files
+    for stale in directory.glob("columns-*"):
+        if stale != final and not stale.name.startswith(f"{final.name}.tmp-"):
+            shutil.rmtree(stale, ignore_errors=True)
+    return final
+
+
+# ----------------------------------------
+# Reading
+# ----------------------------------------
+
+def _map(path: Path) -> np.ndarray:
+    return np.load(path, mmap_mode='r')
+
+
+class _StringColumn:
+    """A mapped column of strings, decoded one value at a time"""
+
+    def __init__(self, directory: Path, name: str):
+        size = (directory / f"{name}.bytes").stat().st_size
+        self.data = np.memmap(directory / f"{name}.bytes", dtype=np.uint8, mode='r') if size else np.zeros(0, np.uint8)
+        self.offsets = _map(directory / f"{name}.offsets.npy")
+        self.null = _map(directory / f"{name}.null.npy")
+
+    def __getitem__(self, position: int) -> Any:
+        if self.null[position]:
+            return float('nan')
+        return self.data[self.offsets[position]:self.offsets[position + 1]].tobytes().decode('utf-8')
+
+    def tolist(self) -> List[Any]:
+        return [self[position] for position in range(len(self.null))]
+
+
+class MappedTable:
+    """One written table, opened read-only"""
+
+    def __init__(self, directory: Path, manifest: Dict):
+        self.rows = manifest["rows"]
+        self.key = manifest["key"]
+        self.columns: List[str] = [column["name"] for column in manifest["columns"]]
+        self.kinds: Dict[str, str] = {column["name"]: column["kind"] for column in manifest["columns"]}
+        self.dtypes: Dict[str, str] = {column["name"]: column["dtype"] for column in manifest["columns"]}
+        self._data: Dict[str, Any] = {}
+        for column in manifest["columns"]:
+            if column["kind"] == "str":
+                self._data[column["name"]] = _StringColumn(directory, column["file"])
+            else:
+                self._data[column["name"]] = _map(directory / f"{column['file']}.npy")
+
+        self._sorted_keys = _map(directory / "keys.sorted.npy")
+        self._key_order = _map(directory / "keys.order.npy")
+
+    def position(self, key: Any) -> Optional[int]:
+        """Row of the first record with this key, by binary search"""
+        if not isinstance(key, str) or not self.rows:
+            return None
+        encoded = key.encode('utf-8')
+        index = int(np.searchsorted(self._sorted_keys, encoded, side='left'))
+        if index < self.rows and self._sorted_keys[index] == encoded:
+            return int(self._key_order[index])
+        return None
+
+    def value(self, column: str, position: int) -> Any:
+        value = self._data[column][position]
+        kind = self.kinds[column]
+        if kind == "datetime":
+            return pd.Timestamp(value)
+        if kind == "number":
+            return value.item()
+        return value
+
+    def row(self, position: int) -> Dict[str, Any]:
+        """The record at a row, shaped like `DataFrame.to_dict('records')` gives it"""
+        return {column: self.value(column, position) for column in self.columns}
+
+    def column(self, column: str) -> pd.Series:
+        """A whole column as a Series with its original dtype (strings are decoded into memory)"""
+        data = self._data[column]
+        values = data.tolist() if self.kinds[column] == "str" else np.asarray(data)
+        return pd.Series(values, name=column, dtype=self.dtypes[column])
+
+    def keys(self) -> Iterator[str]:
+        """Keys in row order"""
+        return (self.value(self.key, position) for position in range(self.rows))
+
+
+class MappedRecordStore:
+    """
+    The RecordStore interface over a mapped table. The mapping is never
+    written to: edited records are kept in memory and shadow their rows.
+    """
+
+    def __init__(self, table: MappedTable):
+        self.table = table
+        self.key = table.key
+        self._edited: Dict[int, Dict[str, Any]] = {}
+
+    def __len__(self) -> int:
+        return self.table.rows
+
+    def __contains__(self, plot_id: str) -> bool:
+        return self.table.position(plot_id) is not None
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """Iterate over all records in row order"""
+        return (self.record_at(position) for position in range(self.table.rows))
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self.table.columns)
+
+    def column(self, name: str) -> pd.Series:
+        """Get one column of the current records"""
+        series = self.table.column(name)
+        if self._edited:
+            series = series.copy()
+            for position, record in self._edited.items():
+                series.iat[position] = record[name]
+        return series
+
+    def to_frame(self) -> pd.DataFrame:
+        """Get the current records as a new DataFrame"""
+        return pd.DataFrame({name: self.column(name) for name in self.table.columns})
+
+    def position(self, plot_id: str) -> Optional[int]:
+        """Get the row position of a plot ID"""
+        return self.table.position(plot_id)
+
+    def get(self, plot_id: str) -> Optional[Dict]:
+        """Get the record for a plot ID"""
+        position = self.table.position(plot_id)
+        if position is None:
+            return None
+        return self.record_at(position)
+
+    def get_many(self, plot_ids: Iterable[str]) -> List[Optional[Dict]]:
+        """Get records for several plot IDs (None where missing)"""
+        return [self.get(plot_id) for plot_id in plot_ids]
+
+    def record_at(self, position: int) -> Dict:
+        """Get the record at a row position"""
+        record = self._edited.get(position)
+        return record if record is not None else self.table.row(position)
+
+    def update(self, plot_id: str, updates: Dict) -> Optional[Dict]:
+        """
+        Apply updates to a record, in memory only.
+        Returns the refreshed record, or None if the plot ID is unknown.
+        """
+        position = self.table.position(plot_id)
+        if position is None:
+            return None
+
+        record = {**self.record_at(position), **updates}
+        self._edited[position] = record
+        return record
+
+
+class MappedFeatures(Mapping):
+    """
+    plot_id -> GeoJSON feature, rebuilt on access from the mapped buffers.
+    Iterates in the order the features were written.
+    """
+
+    def __init__(self, directory: Path, manifest: Dict):
+        self.table = MappedTable(directory, manifest)
+        self.types = _map(directory / "geometry.type.npy")
+        self.feature_polygons = _map(directory / "geometry.feature_polygons.npy")
+        self.polygon_rings = _map(directory / "geometry.polygon_rings.npy")
+        self.ring_points = _map(directory / "geometry.ring_points.npy")
+        self.coordinates = _map(directory / "geometry.coordinates.npy")
+
+    def __len__(self) -> int:
+        return self.table.rows
+
+    def __iter__(self) -> Iterator[str]:
+        return self.table.keys()
+
+    def __contains__(self, plot_id: object) -> bool:
+        return self.table.position(plot_id) is not None
+
+    def geometry(self, position: int) -> Dict:
+        geometry_type = int(self.types[position])
+        if geometry_type == OTHER:
+            return json.loads(self.table.value("geometry", position))
+
+        polygons = []
+        for polygon in range(self.feature_polygons[position], self.feature_polygons[position + 1]):
+            rings = []
+            for ring in range(self.polygon_rings[polygon], self.polygon_rings[polygon + 1]):
+                rings.append(self.coordinates[self.ring_points[ring]:self.ring_points[ring + 1]].tolist())
+            polygons.append(rings)
+
+        if geometry_type == POLYGON:
+            return {"type": "Polygon", "coordinates": polygons[0]}
+        return {"type": "MultiPolygon", "coordinates": polygons}
+
+    def __getitem__(self, plot_id: str) -> Dict:
+        position = self.table.position(plot_id)
+        if position is None:
+            raise KeyError(plot_id)
+        feature = json.loads(self.table.value("feature", position))
+        feature["geometry"] = self.geometry(position)
+        return feature
+
+
+class MappedResponse(CachedResponse):
+    """A CachedResponse whose bodies stay in the mapping until a request is answered with one"""
+
+    def __init__(self, responses: "MappedResponses", position: int):
+        self.responses = responses
+        self.position = position
+        self.etag = self.etag_for("identity")
+
+    @property
+    def body(self) -> bytes:
+        return self.body_for("identity")
+
+    @property
+    def encodings(self) -> List[str]:
+        return list(self.responses.etags)
+
+    def etag_for(self, encoding: str) -> str:
+        return self.responses.etags[encoding][self.position]
+
+    def body_for(self, encoding: str) -> bytes:
+        return self.responses.body(encoding, self.position)
+
+
+class MappedResponses(Mapping):
+    """Response key ("" or a case-folded village) -> MappedResponse"""
+
+    def __init__(self, directory: Path, manifest: Dict):
+        self.positions = {key: position for position, key in enumerate(manifest["keys"])}
+        self.etags: Dict[str, List[str]] = manifest["etags"]
+        self.bodies: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        for encoding in self.etags:
+            path = directory / f"{encoding}.bytes"
+            data = np.memmap(path, dtype=np.uint8, mode='r') if path.stat().st_size else np.zeros(0, np.uint8)
+            self.bodies[encoding] = (data, _map(directory / f"{encoding}.offsets.npy"))
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.positions)
+
+    def __getitem__(self, key: str) -> MappedResponse:
+        return MappedResponse(self, self.positions[key])
+
+    def body(self, encoding: str, position: int) -> bytes:
+        data, offsets = self.bodies[encoding]
+        return data[offsets[position]:offsets[position + 1]].tobytes()
+
+
+class ColumnStore:
+    """Every table, the features and the GeoJSON responses of one written store"""
+
+    def __init__(self, path: Path, manifest: Dict):
+        self.path = path
+        self.tables = {name: MappedTable(path / name, entry) for name, entry in manifest["tables"].items()}
+        self.features = MappedFeatures(path / "features", manifest["features"])
+        self.responses = MappedResponses(path / "responses", manifest["responses"])
+
+
+def open_column_store(directory: Path, digest: str) -> Optional[ColumnStore]:
+    """Open the store written for `digest`, or None if there is none"""
+    path = store_path(directory, digest)
+    try:
+        with open(path / "manifest.json", 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if manifest.get("format") != COLUMN_STORE_FORMAT or manifest.get("digest") != digest:
+        return None
+    return ColumnStore(path, manifest)
@@ -3,10 +3,86 @@ Data Service - Handles loading and managing spatial and textual data
 """
 
 import json
+import os
+import threading
+import time
 import pandas as pd
+import numpy as np
 from pathlib import Path
-from typing import Dict, List, Optional, Any
-from rapidfuzz import fuzz, process
+from typing import Dict, List, Optional, Any, Set, Tuple
+
+from services.record_store import RecordStore
+from services.edit_journal import EditJournal, apply_entries
+from services.spatial_index import SpatialIndex, BBox
+from services.tile_service import TileService
+from services.response_cache import CachedResponse
+from services.owner_index import OwnerIndex
+from services.plot_id_index import PlotIdIndex
+from services.village_index import VillageIndex
+from services.pagination import PlotOrder
+from services.projection import Projection, project
+from services import reconciliation_engine
+from services import duplicate_detector
+from services.reconciliation_engine import ReconciliationTable
+from services import snapshot
+from services import column_store
+from services.column_store import ColumnStore, MappedRecordStore
+from services import partition_store
+from services.partition_store import (
+    PartitionStore,
+    PartitionedFeatures,
+    PartitionedRecordStore,
+    PartitionedSpatialIndex
+)
+
+
+# Loaded state written to and restored from a binary snapshot. Objects shared
+# between these (the records frame and its store, features and parcels_by_id)
+# stay shared when restored.
+SNAPSHOT_FIELDS = (
+    "spatial_data", "textual_data", "parcel_attributes", "parcels_by_id",
+    "textual_store", "attribute_store", "owner_index", "plot_id_index",
+    "village_index", "spatial_index", "geojson_responses", "reconciled"
+)
+
+# With mmap storage, records, features and GeoJSON responses live in the column store instead
+MAPPED_FIELDS = ("spatial_data", "textual_data", "parcel_attributes", "parcels_by_id",
+                 "textual_store", "attribute_store", "geojson_responses")
+
+# With partitioned storage, everything kept per parcel lives in the partitions
+PARTITIONED_FIELDS = MAPPED_FIELDS + ("spatial_index", "reconciled")
+
+# "memory" keeps everything on the heap; "mmap" keeps records and parcel
+# geometry in memory-mapped files shared by every process on the host;
+# "partitioned" splits the dataset by village and loads villages on demand
+STORAGE_BACKENDS = ("memory", "mmap", "partitioned")
+
+# Source files a reload can reuse the parsed form of, by what they feed
+SOURCE_GROUPS = {
+    "spatial": ("villages.geojson",),
+    "textual": ("land_records.csv", "land_records.csv.journal", "land_records.csv.journal.old"),
+    "attributes": ("parcel_attributes.csv",)
+}
+
+# Files replaced by the upstream feed; the journal is this service's own
+FEED_FILES = ("villages.geojson", "land_records.csv", "parcel_attributes.csv")
+
+
+class ReloadFailed(RuntimeError):
+    """Raised when a reload could not load the sources; the old data stays in service"""
+
+
+class ReloadInProgress(RuntimeError):
+    """Raised when a reload is requested while another is still building"""
+
+
+def file_stat(path: Path) -> Optional[Tuple[int, int]]:
+    """(mtime in ns, size) of a file, or None if it does not exist"""
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
 
 
 class DataService:
@@ -17,18 +93,138 @@ class DataService:
         self.textual_data: pd.DataFrame = pd.DataFrame()
         self.parcel_attributes: pd.DataFrame = pd.DataFrame()
         self.parcels_by_id: Dict[str, Any] = {}
+        self.textual_store: RecordStore = RecordStore()
+        self.attribute_store: RecordStore = RecordStore()
+        self.owner_index: OwnerIndex = OwnerIndex()
+        self.plot_id_index: PlotIdIndex = PlotIdIndex()
+        self.village_index: VillageIndex = VillageIndex()
+        self.plot_order: PlotOrder = PlotOrder()
+        self.journal: Optional[EditJournal] = None
+        self.spatial_index: SpatialIndex = SpatialIndex(1.0)
+        # Village partitions, with partitioned storage
+        self.partitions: Optional[PartitionStore] = None
+        self.tile_service: Optional[TileService] = None
+        # Serialized GeoJSON bodies: "" for all parcels, case-folded village otherwise
+        self.geojson_responses: Dict[str, CachedResponse] = {}
+        # reconcile() output and its comparison table for `reconciled_version`, computed at load
+        self.reconciled: Optional[pd.DataFrame] = None
+        self.comparisons: Optional[ReconciliationTable] = None
+        self.reconciled_version: Optional[int] = None
+        # Plots edited since `reconciled` was computed
+        self.edited_plots: Set[str] = set()
         self.data_loaded = False
         
+        # File name -> (mtime, size) of each source as of the last load
+        self.source_stats: Dict[str, Optional[Tuple[int, int]]] = {}
+        # What the last load took over from the service it replaced
+        self.reused: List[str] = []
+        self.changed_villages: Optional[List[str]] = None
+        
+        # Set once a reload has swapped in a replacement; edits are forwarded to it
+        self.replaced_by: Optional["DataService"] = None
+        # Edits applied while a replacement is being built, for it to carry over
+        self._recorded_edits: Optional[List[Tuple[str, Dict]]] = None
+        self._replayed = 0
+        
+        # Milliseconds spent in each startup phase, in order
+        self.load_timings: Dict[str, float] = {}
+        
+        # Bumped on every load and edit so derived results can detect staleness
+        self.version = 0
+        # Bumped on load and on edits to fields duplicate detection reads
+        self.names_version = 0
+        
+        # Held while records change, so readers can snapshot data and version together
+        self.edit_lock = threading.RLock()
+        
         # Base path for data files
-        self.base_path = Path(__file__).parent.parent.parent / "data"
+        self.base_path = Path(os.environ.get("DATA_PATH", Path(__file__).parent.parent.parent / "data"))
+        
+        # Where binary snapshots are kept; empty disables them
+        snapshot_dir = os.environ.get("LRD_SNAPSHOT_DIR", str(self.base_path / ".snapshots"))
+        self.snapshot_dir: Optional[Path] = Path(snapshot_dir) if snapshot_dir else None
+        
+        # The column store and partitions are written next to the snapshots,
+        # so mmap and partitioned storage need them
+        self.storage = os.environ.get("LRD_STORAGE", "memory")
+        if self.storage not in STORAGE_BACKENDS:
+            raise ValueError(f"LRD_STORAGE must be one of {', '.join(STORAGE_BACKENDS)}")
+        if self.storage != "memory" and self.snapshot_dir is None:
+            print(f"✗ LRD_STORAGE={self.storage} needs LRD_SNAPSHOT_DIR; keeping records in memory")
+            self.storage = "memory"
+        
+        # Partition file bytes kept loaded with partitioned storage
+        self.partition_budget = int(float(os.environ.get("LRD_PARTITION_BUDGET_MB", 512)) * 1024 * 1024)
     
-    def load_all_data(self) -> bool:
-        """Load all data files"""
+    def load_all_data(self, previous: Optional["DataService"] = None) -> bool:
+        """
+        Load all data files, recording how long each phase takes.
+        
+        With `previous`, the service this one is to replace, structures
+        built from unchanged files are taken over as they are, and GeoJSON
+        responses and reconciliation scores are rebuilt only for villages
+        whose parcels or records changed.
+        """
+        self.load_timings = {}
         try:
-            self._load_spatial_data()
-            self._load_textual_data()
-            self._load_parcel_attributes()
-            self._index_parcels()
+            self.source_stats = {path.name: file_stat(path) for path in self._source_paths()}
+            self.reused = self._reusable(previous)
+            self.changed_villages = None
+            
+            digest = None
+            state = None
+            columns = None
+            partitions = None
+            if self.snapshot_dir is not None:
+                digest = self.timed("hash", snapshot.source_hash, self._source_paths(), self.storage)
+                if self.storage == "mmap":
+                    columns = self.timed("columns", column_store.open_column_store, self.snapshot_dir, digest)
+                elif self.storage == "partitioned":
+                    partitions = self.timed(
+                        "partitions", partition_store.open_partition_store,
+                        self.snapshot_dir, digest, self.partition_budget
+                    )
+                # A mmap or partitioned snapshot holds only the global indexes;
+                # it is useless without the store holding everything else
+                if self.storage == "memory" or columns is not None or partitions is not None:
+                    state = self.timed("snapshot", snapshot.read_snapshot, self.snapshot_dir, digest)
+            
+            if state is not None:
+                self.reused = []
+                self._replayed = self._restore(state, columns, partitions)
+            else:
+                self.timed("spatial", self._load_spatial_data, previous)
+                self._replayed = self.timed("textual", self._load_textual_data, previous)
+                self.timed("attributes", self._load_parcel_attributes, previous)
+                self.timed("indexes", self._index_parcels, previous)
+                # Partitions score their own plots when first asked to
+                if self.storage != "partitioned":
+                    self.timed("reconciliation", self._reconcile, previous)
+            
+            self.version += 1
+            self.names_version += 1
+            self.edited_plots = set()
+            self.plot_order = PlotOrder(self.parcels_by_id.keys(), self.version)
+            if state is None and self.storage == "partitioned":
+                self.timed("partitions_write", self._partition, digest)
+            
+            self.reconciled_version = self.version if self.reconciled is not None else None
+            if self.reconciled is not None:
+                self.timed("comparisons", self._build_comparisons)
+            
+            if state is None:
+                if self.storage != "partitioned":
+                    self.timed("geojson", self._precompute_geojson, previous)
+                if digest is not None:
+                    if self.storage == "mmap":
+                        self.timed("columns_write", self._map_columns, digest)
+                    self.timed("snapshot_write", self._write_snapshot, digest)
+            
+            # Fold replayed edits into the CSV once the stores hold them. A
+            # replacement waits until it takes over: until then the service
+            # it replaces is still appending to the same journal.
+            if self._replayed and previous is None:
+                self.journal.compact_in_background()
             self.data_loaded = True
             print(f"✓ Loaded {len(self.parcels_by_id)} parcels from {len(self.get_villages())} villages")
             return True
@@ -36,161 +232,464 @@ class DataService:
             print(f"✗ Error loading data: {e}")
             return False
     
-    def _load_spatial_data(self):
+    def timed(self, phase: str, step, *args):
+        """Run one startup step and record its duration under `phase`"""
+        started = time.perf_counter()
+        result = step(*args)
+        self.load_timings[phase] = round((time.perf_counter() - started) * 1000, 1)
+        return result
+    
+    def _reusable(self, previous: Optional["DataService"]) -> List[str]:
+        """Source groups whose files are unchanged since `previous` loaded them"""
+        if previous is None or not previous.data_loaded:
+            return []
+        # Mapped stores are tied to the column store of their own sources
+        if self.storage != "memory" or previous.storage != "memory":
+            return []
+        return [
+            group for group, names in SOURCE_GROUPS.items()
+            if all(self.source_stats.get(name) == previous.source_stats.get(name) for name in names)
+        ]
+    
+    def feed_stats(self) -> Dict[str, Optional[Tuple[int, int]]]:
+        """Current (mtime, size) of the files the upstream feed replaces"""
+        return {path.name: file_stat(path) for path in self._source_paths() if path.name in FEED_FILES}
+    
+    def _note_compaction(self):
+        """Compaction folded our own journal into the CSV; that is not a change to reload for"""
+        csv_path = self.base_path / "textual" / "land_records.csv"
+        self.source_stats[csv_path.name] = file_stat(csv_path)
+    
+    def _csv_unchanged(self) -> bool:
+        """
+        Compaction may only replace the CSV this service loaded. If the feed
+        has replaced it since, the edits stay journaled and we reload instead.
+        """
+        csv_path = self.base_path / "textual" / "land_records.csv"
+        if file_stat(csv_path) == self.source_stats.get(csv_path.name):
+            return True
+        
+        print("✗ land_records.csv changed since it was loaded; reloading instead of compacting")
+        if _data_service is self:
+            threading.Thread(target=_reload_in_background, name="feed-reload", daemon=True).start()
+        return False
+    
+    def _source_paths(self) -> List[Path]:
+        """Files a load reads, including unfolded journal segments"""
+        csv_path = self.base_path / "textual" / "land_records.csv"
+        journal = EditJournal(csv_path)
+        return [
+            self.base_path / "spatial" / "villages.geojson",
+            csv_path,
+            journal.rotated_path,
+            journal.path,
+            self.base_path / "spatial" / "parcel_attributes.csv"
+        ]
+    
+    def _snapshot_fields(self) -> List[str]:
+        if self.storage == "mmap":
+            return [field for field in SNAPSHOT_FIELDS if field not in MAPPED_FIELDS]
+        if self.storage == "partitioned":
+            return [field for field in SNAPSHOT_FIELDS if field not in PARTITIONED_FIELDS]
+        return list(SNAPSHOT_FIELDS)
+    
+    def _restore(self, state: Dict[str, Any], columns: Optional[ColumnStore] = None,
+                 partitions: Optional[PartitionStore] = None) -> int:
+        """
+        Adopt the state read from a snapshot of the current source files.
+        Returns the number of journal entries found.
+        """
+        for field in self._snapshot_fields():
+            setattr(self, field, state[field])
+        if columns is not None:
+            self._adopt_columns(columns)
+        if partitions is not None:
+            self._adopt_partitions(partitions)
+        
+        # Journaled edits are already applied in the snapshot; only reopen it
+        csv_path = self.base_path / "textual" / "land_records.csv"
+        if self.journal is not None:
+            self.journal.close()
+        self.journal = self._open_journal()
+        replayed = len(self.journal.replay())
+        
+        self._build_tile_service()
+        return replayed
+    
+    def _write_snapshot(self, digest: str):
+        """Save the freshly loaded state for the next start"""
+        try:
+            snapshot.write_snapshot(
+                self.snapshot_dir, digest,
+                {field: getattr(self, field) for field in self._snapshot_fields()}
+            )
+        except OSError as e:
+            print(f"✗ Could not write snapshot: {e}")
+    
+    def _map_columns(self, digest: str):
+        """Write the loaded records, features and responses once, then serve them from the mapping"""
+        try:
+            column_store.write_column_store(
+                self.snapshot_dir, digest,
+                {"textual": self.textual_data, "attributes": self.parcel_attributes},
+                list(self.parcels_by_id.values()),
+                self.geojson_responses
+            )
+        except OSError as e:
+            print(f"✗ Could not write column store: {e}")
+            return
+        
+        self._adopt_columns(column_store.open_column_store(self.snapshot_dir, digest))
+        self._build_tile_service()
+    
+    def _adopt_columns(self, columns: ColumnStore):
+        """Serve records, features and responses from a column store and drop the heap copies"""
+        self.textual_store = MappedRecordStore(columns.tables["textual"])
+        self.attribute_store = MappedRecordStore(columns.tables["attributes"])
+        self.parcels_by_id = columns.features
+        self.geojson_responses = columns.responses
+        self.spatial_data = {}
+        self.textual_data = pd.DataFrame()
+        self.parcel_attributes = pd.DataFrame()
+    
+    def _partition(self, digest: str):
+        """Write the loaded data out as village partitions, then serve it from them"""
+        try:
+            partition_store.write_partition_store(
+                self.snapshot_dir, digest, self.parcels_by_id,
+                {"textual": self.textual_data, "attributes": self.parcel_attributes},
+                self.village_index, self.version
+            )
+            partitions = partition_store.open_partition_store(self.snapshot_dir, digest, self.partition_budget)
+            if partitions is None:
+                raise OSError("the partitions on disk cannot be opened")
+        except OSError as e:
+            print(f"✗ Could not write partitions: {e}; keeping records in memory")
+            self.storage = "memory"
+            self.timed("reconciliation", self._reconcile)
+            return
+        
+        self._adopt_partitions(partitions)
+        self._build_tile_service()
+    
+    def _adopt_partitions(self, partitions: PartitionStore):
+        """Serve everything kept per parcel from the partitions and drop the heap copies"""
+        self.partitions = partitions
+        self.parcels_by_id = PartitionedFeatures(partitions)
+        self.textual_store = PartitionedRecordStore(partitions, "textual")
+        self.attribute_store = PartitionedRecordStore(partitions, "attributes")
+        self.spatial_index = PartitionedSpatialIndex(partitions)
+        self.spatial_data = {}
+        self.textual_data = pd.DataFrame()
+        self.parcel_attributes = pd.DataFrame()
+        self.geojson_responses = {}
+        self.reconciled = None
+    
+    def _reconcile(self, previous: Optional["DataService"] = None):
+        """
+        Score every plot once so the comparison table starts warm. Replacing
+        a service whose scores are still current, only plots in villages
+        whose records changed are scored again.
+        """
+        scored = previous._scored_records() if previous is not None else None
+        if scored is None:
+            self.reconciled = reconciliation_engine.reconcile(self.textual_data, self.parcel_attributes)
+            return
+        
+        old_textual, old_attributes, old_reconciled, edited_plots = scored
+        changed = set()
+        plot_ids = set()
+        for old, new in ((old_textual, self.textual_data), (old_attributes, self.parcel_attributes)):
+            villages = reconciliation_engine.changed_villages(old, new)
+            if villages is None:
+                self.reconciled = reconciliation_engine.reconcile(self.textual_data, self.parcel_attributes)
+                return
+            changed |= villages
+        for frame in (old_textual, self.textual_data, old_attributes, self.parcel_attributes):
+            plot_ids.update(frame.loc[frame['village'].fillna('').isin(changed), 'plot_id'].tolist())
+        
+        self.reconciled = reconciliation_engine.rescore(
+            old_reconciled, self.textual_data, self.parcel_attributes, plot_ids | edited_plots
+        )
+        self.changed_villages = sorted(changed)
+    
+    def _scored_records(self) -> Optional[Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, Set[str]]]:
+        """(records, attributes, reconcile() output, plots edited since it was computed)"""
+        with self.edit_lock:
+            if self.reconciled is None:
+                return None
+            return (self.textual_store.to_frame(), self.attribute_store.to_frame(),
+                    self.reconciled, set(self.edited_plots))
+    
+    def _build_comparisons(self):
+        self.comparisons = ReconciliationTable(
+            reconciliation_engine.build_comparisons(self.reconciled),
+            version=self.reconciled_version
+        )
+    
+    def _load_spatial_data(self, previous: Optional["DataService"] = None):
         """Load GeoJSON spatial data"""
+        if "spatial" in self.reused:
+            self.spatial_data = previous.spatial_data
+            return
+        
         geojson_path = self.base_path / "spatial" / "villages.geojson"
         with open(geojson_path, 'r', encoding='utf-8') as f:
             self.spatial_data = json.load(f)
     
-    def _load_textual_data(self):
-        """Load CSV textual land records"""
+    def _open_journal(self) -> EditJournal:
+        csv_path = self.base_path / "textual" / "land_records.csv"
+        if self.journal is not None:
+            self.journal.close()
+        return EditJournal(
+            csv_path,
+            on_compacted=self._note_compaction,
+            snapshot_unchanged=self._csv_unchanged
+        )
+    
+    def _load_textual_data(self, previous: Optional["DataService"] = None) -> int:
+        """Load CSV textual land records; returns the number of journal entries replayed"""
+        self.journal = self._open_journal()
+        if "textual" in self.reused:
+            # Same CSV and journal: the previous frame already holds every entry
+            self.textual_data = previous.textual_data
+            return len(self.journal.replay())
+        
         csv_path = self.base_path / "textual" / "land_records.csv"
         self.textual_data = pd.read_csv(csv_path)
+        
+        # Replay edits made since the CSV snapshot was last compacted
+        replayed = apply_entries(self.textual_data, self.journal.replay())
+        
         self.textual_data['registration_date'] = pd.to_datetime(
             self.textual_data['registration_date']
         )
+        return replayed
     
-    def _load_parcel_attributes(self):
+    def _load_parcel_attributes(self, previous: Optional["DataService"] = None):
         """Load parcel attributes from spatial data"""
+        if "attributes" in self.reused:
+            self.parcel_attributes = previous.parcel_attributes
+            return
+        
         csv_path = self.base_path / "spatial" / "parcel_attributes.csv"
         self.parcel_attributes = pd.read_csv(csv_path)
     
-    def _index_parcels(self):
-        """Create index of parcels by plot_id"""
-        for feature in self.spatial_data.get('features', []):
-            plot_id = feature['properties'].get('plot_id')
-            if plot_id:
-                self.parcels_by_id[plot_id] = feature
+    def _index_parcels(self, previous: Optional["DataService"] = None):
+        """Create index of parcels and records by plot_id"""
+        if "spatial" in self.reused:
+            self.parcels_by_id = previous.parcels_by_id
+            self.plot_id_index = previous.plot_id_index
+            self.village_index = previous.village_index
+            self.spatial_index = previous.spatial_index
+        else:
+            self.parcels_by_id = {}
+            for feature in self.spatial_data.get('features', []):
+                plot_id = feature['properties'].get('plot_id')
+                if plot_id:
+                    self.parcels_by_id[plot_id] = feature
+            
+            self.plot_id_index = PlotIdIndex(self.parcels_by_id.keys())
+            self.village_index = VillageIndex(self.spatial_data.get('features', []))
+            self.spatial_index = SpatialIndex.from_features(self.spatial_data.get('features', []))
+        
+        if "textual" in self.reused:
+            self.textual_store = previous.textual_store
+            self.owner_index = previous.owner_index
+        else:
+            self.textual_store = RecordStore(self.textual_data)
+            self.owner_index = OwnerIndex(self.textual_data['owner_name'].tolist() if not self.textual_data.empty else [])
+        
+        if "attributes" in self.reused:
+            self.attribute_store = previous.attribute_store
+        else:
+            self.attribute_store = RecordStore(self.parcel_attributes)
+        self._build_tile_service()
+    
+    def _build_tile_service(self):
+        self.tile_service = TileService(
+            self.spatial_index,
+            self.parcels_by_id.__getitem__,
+            self._tile_properties
+        )
+    
+    def _precompute_geojson(self, previous: Optional["DataService"] = None):
+        """
+        Serialize and compress the full and per-village GeoJSON once. A
+        village whose features equal those of `previous` keeps its response.
+        """
+        if "spatial" in self.reused:
+            self.geojson_responses = previous.geojson_responses
+            return
+        
+        responses = {"": CachedResponse(self.spatial_data, self.version)}
+        changed = set()
+        for key, plot_ids in self.village_index.plot_ids_by_key.items():
+            features = [self.parcels_by_id[p] for p in plot_ids]
+            if previous is not None and key in previous.geojson_responses \
+                    and previous.village_index.plot_ids_by_key.get(key) == plot_ids \
+                    and all(previous.parcels_by_id[p] == feature for p, feature in zip(plot_ids, features)):
+                responses[key] = previous.geojson_responses[key]
+                continue
+            responses[key] = CachedResponse({"type": "FeatureCollection", "features": features}, self.version)
+            changed.add(key)
+        self.geojson_responses = responses
+        
+        if previous is not None:
+            changed.update(key for key in previous.village_index.plot_ids_by_key if key not in responses)
+            by_key = {VillageIndex.key(name): name for name in previous.get_villages() + self.get_villages()}
+            self.changed_villages = sorted(set(self.changed_villages or []) | {by_key[key] for key in changed})
+    
+    def get_geojson_response(self, village: Optional[str] = None) -> Optional[CachedResponse]:
+        """
+        Get the pre-serialized GeoJSON for all parcels or one village.
+        Partitioned storage keeps no body for all parcels; stream
+        partitions.iter_geojson() instead.
+        """
+        key = VillageIndex.key(village) if village else ""
+        if self.partitions is not None:
+            return self.partitions.geojson(key) if key else None
+        return self.geojson_responses.get(key)
     
     def get_villages(self) -> List[str]:
         """Get list of all villages"""
-        villages = set()
-        for feature in self.spatial_data.get('features', []):
-            village = feature['properties'].get('village')
-            if village:
-                villages.add(village)
-        return sorted(list(villages))
-    
-    def get_parcel_by_id(self, plot_id: str) -> Optional[Dict]:
+        return list(self.village_index.names)
+    
+    def get_parcel_by_id(self, plot_id: str, projection: Optional[Projection] = None) -> Optional[Dict]:
         """Get a single parcel by plot ID with combined data"""
         parcel = self.parcels_by_id.get(plot_id)
         if not parcel:
             return None
         
-        # Get textual record
-        textual = self.textual_data[
-            self.textual_data['plot_id'] == plot_id
-        ].to_dict('records')
-        
-        # Get spatial attributes
-        spatial = self.parcel_attributes[
-            self.parcel_attributes['plot_id'] == plot_id
-        ].to_dict('records')
-        
-        return {
+        return project({
             "geometry": parcel['geometry'],
             "properties": parcel['properties'],
-            "textual_record": textual[0] if textual else None,
-            "spatial_attributes": spatial[0] if spatial else None
-        }
+            "textual_record": self.textual_store.get(plot_id),
+            "spatial_attributes": self.attribute_store.get(plot_id)
+        }, projection)
     
-    def search_by_plot_id(self, query: str, limit: int = 20) -> List[Dict]:
-        """Search parcels by plot ID (partial match)"""
-        results = []
-        query_upper = query.upper()
+    def get_parcels_by_ids(self, plot_ids: List[str],
+                           projection: Optional[Projection] = None) -> Tuple[List[Dict], List[str]]:
+        """
+        Get many parcels in one pass over the indexes.
+        Returns (parcels in request order, plot IDs not found).
+        """
+        textual_records = self.textual_store.get_many(plot_ids)
+        attribute_records = self.attribute_store.get_many(plot_ids)
         
-        for plot_id, parcel in self.parcels_by_id.items():
-            if query_upper in plot_id.upper():
-                result = self.get_parcel_by_id(plot_id)
-                if result:
-                    results.append({
-                        "plot_id": plot_id,
-                        "match_score": 100 if plot_id.upper() == query_upper else 80,
-                        **result
-                    })
+        parcels = []
+        missing = []
+        for plot_id, textual, attributes in zip(plot_ids, textual_records, attribute_records):
+            parcel = self.parcels_by_id.get(plot_id)
+            if not parcel:
+                missing.append(plot_id)
+                continue
+            parcels.append(project({
+                "plot_id": plot_id,
+                "geometry": parcel['geometry'],
+                "properties": parcel['properties'],
+                "textual_record": textual,
+                "spatial_attributes": attributes
+            }, projection))
         
-        return sorted(results, key=lambda x: x['match_score'], reverse=True)[:limit]
+        return parcels, missing
     
-    def search_by_owner_name(self, query: str, limit: int = 20) -> List[Dict]:
-        """Search parcels by owner name using fuzzy matching"""
-        if self.textual_data.empty:
-            return []
+    def search_by_plot_id(self, query: str, limit: int = 20,
+                          projection: Optional[Projection] = None) -> List[Dict]:
+        """Search parcels by plot ID (exact, prefix, segment, then partial match)"""
+        results = []
         
-        # Get all owner names
-        owner_names = self.textual_data['owner_name'].tolist()
+        # Only the returned page of matches is built into full records
+        for plot_id, score in self.plot_id_index.search(query, limit):
+            result = self.get_parcel_by_id(plot_id)
+            if result:
+                results.append(project({
+                    "plot_id": plot_id,
+                    "match_score": score,
+                    **result
+                }, projection))
         
-        # Fuzzy search
-        matches = process.extract(
-            query, 
-            owner_names, 
-            scorer=fuzz.WRatio,
-            limit=limit
-        )
+        return results
+    
+    def search_by_owner_name(self, query: str, limit: int = 20,
+                             projection: Optional[Projection] = None) -> List[Dict]:
+        """Search parcels by owner name using fuzzy matching"""
+        # Trigram candidates first, WRatio only on those
+        matches = self.owner_index.search(query, limit)
         
         results = []
         for name, score, idx in matches:
-            if score >= 50:  # Minimum threshold
-                record = self.textual_data.iloc[idx]
-                plot_id = record['plot_id']
-                parcel = self.get_parcel_by_id(plot_id)
-                
-                if parcel:
-                    results.append({
-                        "plot_id": plot_id,
-                        "match_score": score,
-                        "matched_name": name,
-                        **parcel
-                    })
+            plot_id = self.textual_store.record_at(idx)['plot_id']
+            parcel = self.get_parcel_by_id(plot_id)
+            
+            if parcel:
+                results.append(project({
+                    "plot_id": plot_id,
+                    "match_score": score,
+                    "matched_name": name,
+                    **parcel
+                }, projection))
         
         return results
     
-    def get_parcels_by_village(self, village: str) -> List[Dict]:
+    def get_parcels_by_village(self, village: str, projection: Optional[Projection] = None) -> List[Dict]:
         """Get all parcels in a village"""
         results = []
         
-        for feature in self.spatial_data.get('features', []):
-            if feature['properties'].get('village', '').lower() == village.lower():
-                plot_id = feature['properties'].get('plot_id')
-                parcel = self.get_parcel_by_id(plot_id)
-                if parcel:
-                    results.append({
-                        "plot_id": plot_id,
-                        **parcel
-                    })
+        for plot_id in self.village_index.plot_ids(village):
+            parcel = self.get_parcel_by_id(plot_id)
+            if parcel:
+                results.append(project({
+                    "plot_id": plot_id,
+                    **parcel
+                }, projection))
         
         return results
     
-    def get_all_parcels(self, page: int = 1, per_page: int = 50) -> Dict:
-        """Get all parcels with pagination"""
-        all_plot_ids = list(self.parcels_by_id.keys())
-        total = len(all_plot_ids)
+    def get_all_parcels(self, page: int = 1, per_page: int = 50, cursor: Optional[str] = None,
+                        projection: Optional[Projection] = None) -> Dict:
+        """
+        Get all parcels with pagination, by page number or by cursor.
+        Raises InvalidCursor for a bad cursor.
+        """
+        total = len(self.plot_order)
         
-        start = (page - 1) * per_page
-        end = start + per_page
-        page_ids = all_plot_ids[start:end]
+        if cursor is not None:
+            page_ids, next_cursor = self.plot_order.page_after(cursor, per_page)
+        else:
+            page_ids, next_cursor = self.plot_order.page((page - 1) * per_page, per_page)
         
         parcels = []
         for plot_id in page_ids:
             parcel = self.get_parcel_by_id(plot_id)
             if parcel:
-                parcels.append({
+                parcels.append(project({
                     "plot_id": plot_id,
                     **parcel
-                })
+                }, projection))
+        
+        if cursor is not None:
+            return {
+                "parcels": parcels,
+                "total": total,
+                "per_page": per_page,
+                "next_cursor": next_cursor
+            }
         
         return {
             "parcels": parcels,
             "total": total,
             "page": page,
             "per_page": per_page,
-            "total_pages": (total + per_page - 1) // per_page
+            "total_pages": (total + per_page - 1) // per_page,
+            "next_cursor": next_cursor
         }
     
     def get_geojson_for_village(self, village: str) -> Dict:
         """Get GeoJSON FeatureCollection for a village"""
         features = [
-            f for f in self.spatial_data.get('features', [])
-            if f['properties'].get('village', '').lower() == village.lower()
+            self.parcels_by_id[plot_id]
+            for plot_id in self.village_index.plot_ids(village)
         ]
         
         return {
@@ -198,46 +697,258 @@ class DataService:
             "features": features
         }
     
+    def get_geojson_in_bbox(self, bbox: BBox) -> Dict:
+        """Get GeoJSON FeatureCollection of parcels intersecting a bounding box"""
+        features = [
+            self.parcels_by_id[plot_id]
+            for plot_id in self.spatial_index.query(bbox)
+        ]
+        
+        return {
+            "type": "FeatureCollection",
+            "features": features
+        }
+    
+    def _geometry_for(self, plot_id: str) -> Dict:
+        return self.parcels_by_id[plot_id]['geometry']
+    
+    def get_plots_at(self, lon: float, lat: float) -> List[str]:
+        """Get plot IDs of parcels containing a point"""
+        return self.spatial_index.locate(lon, lat, self._geometry_for)
+    
+    def locate_points(self, points: np.ndarray) -> List[List[str]]:
+        """Get plot IDs of parcels containing each of many [lon, lat] points"""
+        return self.spatial_index.locate_points(points, self._geometry_for)
+    
+    def _tile_properties(self, plot_id: str) -> Dict:
+        """Reconciliation status baked into tiles so the map can colour them"""
+        if plot_id in self.edited_plots:
+            # The load-time scores predate the edit; rescore just this plot
+            comparison = reconciliation_engine.compare_records(
+                plot_id,
+                self.textual_store.get(plot_id),
+                self.attribute_store.get(plot_id)
+            )
+            return {"status": comparison['name_analysis']['status']}
+        if self.partitions is not None:
+            return {"status": self.partitions.status(plot_id)}
+        
+        comparison = self.comparisons.get(plot_id) if self.comparisons is not None else None
+        return {"status": comparison['name_analysis']['status'] if comparison else None}
+    
+    def get_tile(self, z: int, x: int, y: int) -> Dict:
+        """Get a clipped, quantized parcel tile"""
+        return self.tile_service.get_tile(z, x, y)
+    
     def get_all_geojson(self) -> Dict:
         """Get complete GeoJSON data"""
+        if self.storage != "memory":
+            return {"type": "FeatureCollection", "features": list(self.parcels_by_id.values())}
         return self.spatial_data
     
+    def _apply_update(self, plot_id: str, updates: Dict) -> Tuple[Dict, Optional[Dict]]:
+        """Apply one edit in memory. Returns (the fields applied, the updated record)."""
+        applied = {
+            key: value for key, value in updates.items()
+            if key in self.textual_store.columns and key != 'plot_id'
+        }
+        record = self.textual_store.update(plot_id, applied)
+        if record is not None and 'owner_name' in applied:
+            self.owner_index.update(self.textual_store.position(plot_id), applied['owner_name'])
+        self.tile_service.invalidate_parcel(plot_id)
+        
+        self.edited_plots.add(plot_id)
+        if self._recorded_edits is not None:
+            self._recorded_edits.append((plot_id, applied))
+        return applied, record
+    
     def update_textual_record(self, plot_id: str, updates: Dict) -> bool:
         """Update a textual land record"""
-        idx = self.textual_data[self.textual_data['plot_id'] == plot_id].index
-        
-        if len(idx) == 0:
-            return False
+        return self.edit_records([(plot_id, updates)], batch=False) is not None
+    
+    def update_textual_records(self, edits: List[Tuple[str, Dict]]) -> List[Dict]:
+        """
+        Apply several validated edits together and persist them as one
+        journal entry. Returns the updated record for each edit.
+        """
+        result = self.edit_records(edits)
+        return result[1] if result is not None else [None] * len(edits)
+    
+    def edit_records(self, edits: List[Tuple[str, Dict]],
+                     batch: bool = True) -> Optional[Tuple[int, List[Dict]]]:
+        """
+        Apply edits in memory and persist them as one journal entry, or one
+        per edit without `batch`. Returns the version the edits were applied
+        to and the updated records once the journal is on disk, or None with
+        nothing applied if a plot has no record.
         
-        for key, value in updates.items():
-            if key in self.textual_data.columns and key != 'plot_id':
-                self.textual_data.loc[idx[0], key] = value
+        The edit lock is released before waiting for the fsync, so edits
+        made meanwhile share it.
+        """
+        pending = self._apply_edits(edits, batch)
+        if pending is None:
+            return None
         
-        # Save back to CSV
-        csv_path = self.base_path / "textual" / "land_records.csv"
-        self.textual_data.to_csv(csv_path, index=False)
+        previous_version, records, journal, ticket = pending
+        journal.wait_for(ticket)
+        return previous_version, records
+    
+    def _apply_edits(self, edits: List[Tuple[str, Dict]],
+                     batch: bool) -> Optional[Tuple[int, List[Dict], EditJournal, int]]:
+        with self.edit_lock:
+            if self.replaced_by is not None:
+                return self.replaced_by._apply_edits(edits, batch)
+            if not all(plot_id in self.textual_store for plot_id, _ in edits):
+                return None
+            # Refuse before touching memory if another process owns the journal
+            self.journal.claim()
+            
+            previous_version = self.version
+            applied_edits = []
+            records = []
+            for plot_id, updates in edits:
+                applied, record = self._apply_update(plot_id, updates)
+                records.append(record)
+                applied_edits.append((plot_id, applied))
+            self.version += 1
+            if any(field in applied for _, applied in applied_edits for field in duplicate_detector.CANDIDATE_FIELDS):
+                self.names_version += 1
+            
+            # Persist as a journal append; compaction rewrites the CSV in the background
+            if batch:
+                ticket = self.journal.enqueue_batch(applied_edits)
+            else:
+                ticket = None
+                for plot_id, applied in applied_edits:
+                    ticket = self.journal.enqueue(plot_id, applied)
+            
+            return previous_version, records, self.journal, ticket
+    
+    def _take_over(self, previous: "DataService"):
+        """
+        Carry over the edits `previous` took while this service was being
+        built and move past its version. Called with previous's edit lock held.
+        """
+        edits = previous._recorded_edits or []
+        previous._recorded_edits = None
         
-        return True
+        with self.edit_lock:
+            for plot_id, applied in edits:
+                if plot_id in self.textual_store:
+                    self._apply_update(plot_id, applied)
+            
+            # Results cached by version must never mistake this data for previous's
+            version = max(self.version, previous.version) + 1
+            if not edits and self.reconciled_version == self.version:
+                self.reconciled_version = version
+                self.comparisons.version = version
+            self.version = version
+            self.names_version = max(self.names_version, previous.names_version) + 1
+    
+    def close(self):
+        """Flush pending journal writes"""
+        if self.journal is not None:
+            self.journal.close()
     
     def get_statistics(self) -> Dict:
         """Get overall statistics"""
+        villages = self.get_villages()
+        if self.partitions is not None:
+            # Kept per partition, so the totals need none of them loaded
+            area, land_types = self.partitions.totals()
+        elif len(self.textual_store) > 0:
+            area = self.textual_store.column('area').sum()
+            land_types = self.textual_store.column('land_type').value_counts().to_dict()
+        else:
+            area, land_types = 0, {}
         return {
             "total_parcels": len(self.parcels_by_id),
-            "villages": self.get_villages(),
-            "village_count": len(self.get_villages()),
-            "total_area_sqm": int(self.textual_data['area'].sum()) if not self.textual_data.empty else 0,
-            "land_types": self.textual_data['land_type'].value_counts().to_dict() if not self.textual_data.empty else {}
+            "villages": villages,
+            "village_count": len(villages),
+            "total_area_sqm": int(area),
+            "extent": list(self.spatial_index.extent) if self.spatial_index.extent else None,
+            "land_types": land_types
         }
 
 
-# Singleton instance
+# Singleton instance, shared by the app and every router
 _data_service: Optional[DataService] = None
+_data_service_lock = threading.Lock()
+
+# Held while a replacement is being built, so reloads never overlap
+_reload_lock = threading.Lock()
 
 
 def get_data_service() -> DataService:
-    """Get the singleton data service instance"""
+    """
+    Get the process-wide data service. The API loads it at startup;
+    anything else that calls this first loads it here, exactly once.
+    """
     global _data_service
-    if _data_service is None:
-        _data_service = DataService()
-        _data_service.load_all_data()
-    return _data_service
+    with _data_service_lock:
+        if _data_service is None:
+            data_service = DataService()
+            data_service.load_all_data()
+            _data_service = data_service
+        return _data_service
+
+
+def reload_data_service() -> DataService:
+    """
+    Build a new data service from the current source files in the calling
+    thread and swap it in for the shared one. Requests holding the old
+    service finish on it; edits it takes during the build are carried over
+    and edits that reach it afterwards are forwarded.
+    
+    Raises ReloadInProgress if another reload is building, and ReloadFailed
+    if the sources could not be loaded.
+    """
+    global _data_service
+    if not _reload_lock.acquire(blocking=False):
+        raise ReloadInProgress("A reload is already in progress")
+    try:
+        current = get_data_service()
+        with current.edit_lock:
+            current._recorded_edits = []
+        
+        # A compaction between our CSV read and journal replay would move
+        # edits out of the journal into a CSV we never read
+        if current.journal is not None:
+            current.journal.hold_compaction()
+        try:
+            fresh = DataService()
+            fresh.version = current.version
+            if not fresh.load_all_data(previous=current):
+                with current.edit_lock:
+                    current._recorded_edits = None
+                raise ReloadFailed("Could not load the source files; still serving the previous data")
+            
+            with current.edit_lock:
+                fresh._take_over(current)
+                current.replaced_by = fresh
+                with _data_service_lock:
+                    _data_service = fresh
+        finally:
+            if current.journal is not None:
+                current.journal.release_compaction()
+        
+        current.close()
+        if fresh._replayed:
+            fresh.journal.compact_in_background()
+        if fresh.changed_villages is None:
+            print("✓ Reloaded")
+        else:
+            print(f"✓ Reloaded; changed villages: {', '.join(fresh.changed_villages) or 'none'}")
+        return fresh
+    finally:
+        _reload_lock.release()
+
+
+def _reload_in_background():
+    """Reload after compaction found a new CSV from the feed"""
+    try:
+        reload_data_service()
+    except ReloadInProgress:
+        pass
+    except ReloadFailed as e:
+        print(f"✗ {e}")
@@ -0,0 +1,226 @@
+"""
+Duplicate Detector - Finds owners registered under variant spellings across plots
+"""
+
+import re
+from itertools import combinations
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import numpy as np
+
+from services.reconciliation_engine import score_names
+
+# Owner names must score this well to link two plots. Lower than the
+# reconciliation match threshold because father's names must agree as well;
+# "Rajesh Kumar Singh" / "Rajesh K. Singh" scores about 85
+DUPLICATE_THRESHOLD = 80
+
+# Father's names must agree this well too; different fathers sharing a
+# surname ("Mohan Singh" / "Dinesh Singh") score around 60
+FATHER_NAME_THRESHOLD = 75
+
+# Blocks larger than this are too generic to be useful and are not scored
+MAX_BLOCK_SIZE = 500
+
+# Record fields candidate scoring reads; edits to any other field leave
+# scored candidates valid
+CANDIDATE_FIELDS = ("owner_name", "father_name", "village")
+
+# Prefixes that are not part of the name itself
+HONORIFICS = {"late", "smt", "shri", "sri", "mr", "mrs", "ms", "dr"}
+
+_SOUNDEX_CODES = {
+    letter: digit
+    for letters, digit in (
+        ("bfpv", "1"), ("cgjkqsxz", "2"), ("dt", "3"),
+        ("l", "4"), ("mn", "5"), ("r", "6")
+    )
+    for letter in letters
+}
+
+def soundex(token: str) -> str:
+    """American Soundex code of a single word, e.g. "singh" -> "S520" """
+    letters = ''.join(c for c in token.lower() if 'a' <= c <= 'z')
+    if not letters:
+        return ''
+
+    code = letters[0].upper()
+    last = _SOUNDEX_CODES.get(letters[0], '')
+    for letter in letters[1:]:
+        digit = _SOUNDEX_CODES.get(letter, '')
+        if digit and digit != last:
+            code += digit
+            if len(code) == 4:
+                break
+        # H and W do not separate letters with the same code
+        if letter not in "hw":
+            last = digit
+
+    return code.ljust(4, '0')
+
+
+def name_tokens(name: Optional[str]) -> List[str]:
+    """Lowercase words of a name without punctuation or honorifics"""
+    if not isinstance(name, str):
+        return []
+    return [token for token in re.findall(r'[a-z]+', name.lower()) if token not in HONORIFICS]
+
+
+def blocking_keys(name: Optional[str]) -> Set[str]:
+    """
+    Canonical keys under which variant spellings of a name collide.
+
+    Each key pairs the initial of one outer word with the phonetic code of
+    the other, in both orders, so "Rajesh Kumar Singh", "Rajesh K. Singh",
+    "R. K. Singh" and "Singh Rajesh" all share a key.
+    """
+    tokens = name_tokens(name)
+    if not tokens:
+        return set()
+    if len(tokens) == 1:
+        return {soundex(tokens[0])}
+
+    first, last = tokens[0], tokens[-1]
+    return {
+        f"{first[0]}:{soundex(last)}",
+        f"{last[0]}:{soundex(first)}"
+    }
+
+
+def candidate_pairs(records: List[Dict]) -> Tuple[Set[Tuple[int, int]], int]:
+    """
+    Pairs of record positions that share a blocking key and a village.
+    Returns (pairs, number of oversized blocks skipped).
+    """
+    blocks: Dict[Tuple[str, str], List[int]] = {}
+    for position, record in enumerate(records):
+        village = str(record.get('village') or '').casefold()
+        for key in blocking_keys(record.get('owner_name')):
+            blocks.setdefault((village, key), []).append(position)
+
+    pairs = set()
+    skipped = 0
+    for members in blocks.values():
+        if len(members) > MAX_BLOCK_SIZE:
+            skipped += 1
+            continue
+        pairs.update(combinations(members, 2))
+
+    return pairs, skipped
+
+
+def _normalized(name: Optional[str]) -> str:
+    """The normalization MatchingService.calculate_similarity applies"""
+    return name.lower().strip() if isinstance(name, str) else ''
+
+
+def score_candidates(records: List[Dict]) -> Dict:
+    """
+    Score every blocked pair of distinct plots on owner and father names.
+
+    Scores are the ones MatchingService.calculate_similarity gives (WRatio
+    of lowercased, stripped names), computed for all pairs in one batch.
+    Pairs are sorted by plot ID so results are stable across runs.
+    """
+    pairs, skipped = candidate_pairs(records)
+
+    plot_ids = np.array([str(record['plot_id']) for record in records], dtype=object)
+    owners = np.array([_normalized(record.get('owner_name')) for record in records], dtype=object)
+    fathers = np.array([_normalized(record.get('father_name')) for record in records], dtype=object)
+
+    # Plot IDs as sortable integer codes
+    _, codes = np.unique(plot_ids.astype(str), return_inverse=True)
+    codes = codes.reshape(-1)
+
+    positions = np.array(list(pairs), dtype=np.int64).reshape(-1, 2)
+    first, second = positions[:, 0], positions[:, 1]
+    swap = codes[first] > codes[second]
+    first, second = np.where(swap, second, first), np.where(swap, first, second)
+
+    distinct = codes[first] != codes[second]
+    first, second = first[distinct], second[distinct]
+    order = np.lexsort((codes[second], codes[first]))
+    first, second = first[order], second[order]
+
+    owner_scores = score_names(owners[first].tolist(), owners[second].tolist())
+    father_scores = score_names(fathers[first].tolist(), fathers[second].tolist())
+    has_fathers = (np.array([len(n) for n in fathers]) > 0)
+    has_fathers = has_fathers[first] & has_fathers[second]
+
+    scored = [
+        {
+            "plot_ids": [plot_ids[a], plot_ids[b]],
+            "owner_score": owner,
+            "father_score": father if both else None
+        }
+        for a, b, owner, father, both in zip(
+            first.tolist(), second.tolist(),
+            owner_scores.tolist(), father_scores.tolist(), has_fathers.tolist()
+        )
+    ]
+
+    return {
+        "pairs": scored,
+        "compared_pairs": len(pairs),
+        "skipped_blocks": skipped
+    }
+
+
+def build_clusters(records: Iterable[Dict], scored_pairs: List[Dict],
+                   threshold: float = DUPLICATE_THRESHOLD,
+                   father_threshold: float = FATHER_NAME_THRESHOLD) -> List[Dict]:
+    """
+    Group plots linked by likely-duplicate pairs into clusters.
+
+    A pair links its plots when the owner names score at least `threshold`
+    and, if both records have a father's name, those score at least
+    `father_threshold`. Largest clusters come first.
+    """
+    by_plot = {record['plot_id']: record for record in records}
+    parent: Dict[str, str] = {}
+
+    def find(plot_id: str) -> str:
+        root = plot_id
+        while parent.get(root, root) != root:
+            root = parent[root]
+        parent[plot_id] = root
+        return root
+
+    links: List[Dict] = []
+    for pair in scored_pairs:
+        if pair['owner_score'] < threshold:
+            continue
+        if pair['father_score'] is not None and pair['father_score'] < father_threshold:
+            continue
+        a, b = pair['plot_ids']
+        parent[find(a)] = find(b)
+        links.append(pair)
+
+    members: Dict[str, List[str]] = {}
+    for plot_id in parent:
+        members.setdefault(find(plot_id), []).append(plot_id)
+
+    pairs_by_root: Dict[str, List[Dict]] = {}
+    for pair in links:
+        pairs_by_root.setdefault(find(pair['plot_ids'][0]), []).append(pair)
+
+    clusters = []
+    for root, plot_ids in members.items():
+        plot_ids.sort()
+        records_in_cluster = [by_plot[plot_id] for plot_id in plot_ids]
+        clusters.append({
+            "village": records_in_cluster[0].get('village'),
+            "size": len(plot_ids),
+            "plot_ids": plot_ids,
+            "records": [
+                {
+                    "plot_id": record['plot_id'],
+                    "owner_name": record.get('owner_name'),
+                    "father_name": record.get('father_name')
+                }
+                for record in records_in_cluster
+            ],
+            "pairs": pairs_by_root.get(root, [])
+        })
+
+    clusters.sort(key=lambda c: (-c['size'], str(c['village']), c['plot_ids'][0]))
+    return clusters
@@ -0,0 +1,408 @@
+"""
+Edit Journal - Append-only log of record edits with background compaction
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+JournalEntry = Tuple[str, Dict]
+
+# Journals this process owns: lock file path -> [open lock file, holders]
+_owned: Dict[Path, list] = {}
+_owned_lock = threading.Lock()
+
+
+class JournalLocked(RuntimeError):
+    """Raised when another process already owns the edit journal"""
+
+
+def _acquire(lock_path: Path):
+    """Take the exclusive lock on a journal, shared by every holder in this process"""
+    with _owned_lock:
+        entry = _owned.get(lock_path)
+        if entry is not None:
+            entry[1] += 1
+            return
+
+        lock_file = open(lock_path, 'a')
+        if fcntl is not None:
+            try:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                lock_file.close()
+                raise JournalLocked(
+                    f"{lock_path.name} is held by another process; edits go through that process only"
+                ) from None
+        _owned[lock_path] = [lock_file, 1]
+
+
+def _release(lock_path: Path):
+    with _owned_lock:
+        entry = _owned.get(lock_path)
+        if entry is None:
+            return
+        entry[1] -= 1
+        if entry[1] == 0:
+            # Closing the file drops the lock
+            entry[0].close()
+            del _owned[lock_path]
+
+
+class EditJournal:
+    """
+    Durable edits for a CSV snapshot without rewriting it on every change.
+
+    Each edit is appended to `<snapshot>.journal` as one JSON line; a batch
+    of edits shares a single line, so it is replayed all or nothing. Appends
+    are group-committed: a flusher thread fsyncs everything written in a
+    short window at once and every append returns only after its line is on
+    disk. Callers applying edits under a lock enqueue the line there and
+    wait for the fsync after releasing the lock. Once enough edits
+    accumulate, the journal is rotated and a background thread replays the
+    rotated segment onto the snapshot on disk, writes the result to a temp
+    file and moves it into place with an atomic rename.
+
+    Only one process may own a journal and its snapshot. The first append
+    takes an exclusive lock on `<snapshot>.journal.lock` for the lifetime of
+    the journal; appends from any other process raise JournalLocked, and a
+    compaction the lock is unavailable to is skipped. Journals opened on the
+    same file within one process share the lock.
+    """
+
+    def __init__(self, snapshot_path: Path,
+                 fsync_batch: int = 64,
+                 fsync_interval: float = 0.005,
+                 compact_after: int = 500,
+                 on_compacted: Optional[Callable[[], None]] = None,
+                 snapshot_unchanged: Optional[Callable[[], bool]] = None):
+        self.snapshot_path = Path(snapshot_path)
+        self.path = self.snapshot_path.with_name(self.snapshot_path.name + ".journal")
+        # Segment being folded into the snapshot; replayed first if we crashed mid-compaction
+        self.rotated_path = self.path.with_name(self.path.name + ".old")
+        self.lock_path = self.path.with_name(self.path.name + ".lock")
+
+        self.fsync_batch = fsync_batch
+        self.fsync_interval = fsync_interval
+        self.compact_after = compact_after
+        # Called after compaction has rewritten the snapshot file
+        self.on_compacted = on_compacted
+        # Asked just before the rewrite replaces the snapshot; False abandons
+        # the compaction and leaves the rotated segment to the next load
+        self.snapshot_unchanged = snapshot_unchanged
+
+        self._cond = threading.Condition()
+        self._file = None
+        self._appended = 0
+        self._synced = 0
+        self._entries_since_compaction = 0
+        self._compacting = False
+        self._compaction_holds = 0
+        self._closed = False
+        self._owner = False
+        self._flusher: Optional[threading.Thread] = None
+
+    # ----------------------------------------
+    # Replay
+    # ----------------------------------------
+
+    @staticmethod
+    def _read_segment(path: Path) -> List[JournalEntry]:
+        entries = []
+        if not path.exists():
+            return entries
+
+        with open(path, 'r', encoding='utf-8') as f:
+            lines = f.readlines()
+
+        for number, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # A torn final line means the process died mid-append
+                if number == len(lines):
+                    break
+                raise
+            if 'batch' in entry:
+                entries.extend((edit['plot_id'], edit['updates']) for edit in entry['batch'])
+            else:
+                entries.append((entry['plot_id'], entry['updates']))
+
+        return entries
+
+    def replay(self) -> List[JournalEntry]:
+        """Read every journaled edit in the order it was made"""
+        entries = self._read_segment(self.rotated_path) + self._read_segment(self.path)
+        self._entries_since_compaction = len(entries)
+        return entries
+
+    # ----------------------------------------
+    # Appending
+    # ----------------------------------------
+
+    def claim(self):
+        """Make this process the journal's owner; raises JournalLocked if another process is"""
+        with self._cond:
+            if not self._owner:
+                _acquire(self.lock_path)
+                self._owner = True
+
+    def _open(self):
+        self.claim()
+        if self._file is None:
+            self._file = open(self.path, 'a', encoding='utf-8')
+        if self._flusher is None:
+            self._flusher = threading.Thread(target=self._flush_loop, name="edit-journal-fsync", daemon=True)
+            self._flusher.start()
+
+    def append(self, plot_id: str, updates: Dict):
+        """Append an edit and block until it has been fsynced"""
+        self.wait_for(self.enqueue(plot_id, updates))
+
+    def append_batch(self, entries: List[JournalEntry]):
+        """Append several edits as one line and block until it has been fsynced"""
+        self.wait_for(self.enqueue_batch(entries))
+
+    def enqueue(self, plot_id: str, updates: Dict) -> int:
+        """
+        Write an edit without waiting for the fsync. Returns the ticket to
+        pass to wait_for; callers holding a lock should release it first,
+        so that concurrent edits can share one fsync.
+        """
+        return self._write(json.dumps({
+            "plot_id": plot_id,
+            "updates": updates,
+            "ts": datetime.utcnow().isoformat()
+        }, default=str) + "\n", 1)
+
+    def enqueue_batch(self, entries: List[JournalEntry]) -> int:
+        """Write several edits as one line without waiting for the fsync"""
+        return self._write(json.dumps({
+            "batch": [{"plot_id": plot_id, "updates": updates} for plot_id, updates in entries],
+            "ts": datetime.utcnow().isoformat()
+        }, default=str) + "\n", len(entries))
+
+    def _write(self, line: str, edits: int) -> int:
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Edit journal is closed")
+            self._open()
+            self._file.write(line)
+            self._file.flush()
+            self._appended += 1
+            self._entries_since_compaction += edits
+            self._cond.notify_all()
+            return self._appended
+
+    def wait_for(self, ticket: int):
+        """Block until the line `ticket` was returned for has been fsynced"""
+        with self._cond:
+            while self._synced < ticket:
+                self._cond.wait()
+
+            compact = self._should_compact() and not self._closed
+
+        if compact:
+            self.compact_in_background()
+
+    def _flush_loop(self):
+        """Group commit: fsync all lines appended during a short window together"""
+        while True:
+            with self._cond:
+                while self._synced == self._appended and not self._closed:
+                    self._cond.wait()
+                if self._closed and self._synced == self._appended:
+                    return
+
+                # Give concurrent writers a moment to join this batch
+                if self._appended - self._synced < self.fsync_batch:
+                    self._cond.wait(self.fsync_interval)
+
+                target = self._appended
+                fd = self._file.fileno()
+
+            os.fsync(fd)
+
+            with self._cond:
+                self._synced = max(self._synced, target)
+                self._cond.notify_all()
+
+    # ----------------------------------------
+    # Compaction
+    # ----------------------------------------
+
+    def _should_compact(self) -> bool:
+        return (
+            not self._compacting
+            and not self._compaction_holds
+            and self._entries_since_compaction >= self.compact_after
+        )
+
+    def compact_in_background(self) -> Optional[threading.Thread]:
+        """Start a compaction thread unless one is already running"""
+        with self._cond:
+            if self._compacting or self._compaction_holds:
+                return None
+            self._compacting = True
+
+        thread = threading.Thread(target=self._compact, name="edit-journal-compact", daemon=True)
+        thread.start()
+        return thread
+
+    def compact(self):
+        """Fold the journal into the snapshot in the calling thread"""
+        with self._cond:
+            if self._compacting or self._compaction_holds:
+                return
+            self._compacting = True
+        self._compact()
+
+    def _compact(self):
+        owner = False
+        try:
+            # Another process owning the journal compacts it itself
+            _acquire(self.lock_path)
+            owner = True
+
+            with self._cond:
+                # Every appended line must be on disk before the segment rotates
+                while self._synced < self._appended:
+                    self._cond.wait()
+
+                if self._file is not None:
+                    self._file.close()
+                    self._file = None
+
+                if self.path.exists():
+                    if self.rotated_path.exists():
+                        # A previous compaction died; keep its edits ahead of ours
+                        with open(self.rotated_path, 'a', encoding='utf-8') as old, \
+                                open(self.path, 'r', encoding='utf-8') as current:
+                            old.write(current.read())
+                            old.flush()
+                            os.fsync(old.fileno())
+                        self.path.unlink()
+                    else:
+                        os.replace(self.path, self.rotated_path)
+
+                self._entries_since_compaction = 0
+
+            if self.rotated_path.exists():
+                # Fold the segment into the file on disk, not into whatever
+                # this process holds in memory
+                frame = pd.read_csv(self.snapshot_path)
+                apply_entries(frame, self._read_segment(self.rotated_path))
+                if self._write_snapshot(frame):
+                    self.rotated_path.unlink()
+                    if self.on_compacted is not None:
+                        self.on_compacted()
+        except JournalLocked:
+            pass
+        finally:
+            if owner:
+                _release(self.lock_path)
+            with self._cond:
+                self._compacting = False
+                self._cond.notify_all()
+
+    def wait_for_compaction(self):
+        """Block until no compaction is running"""
+        with self._cond:
+            while self._compacting:
+                self._cond.wait()
+
+    def hold_compaction(self):
+        """Wait out a running compaction and start no other until released"""
+        with self._cond:
+            self._compaction_holds += 1
+            while self._compacting:
+                self._cond.wait()
+
+    def release_compaction(self):
+        """Undo one hold_compaction, compacting now if edits piled up meanwhile"""
+        with self._cond:
+            self._compaction_holds -= 1
+            compact = self._should_compact() and not self._closed
+
+        if compact:
+            self.compact_in_background()
+
+    def _write_snapshot(self, frame: pd.DataFrame) -> bool:
+        """
+        Write the snapshot to a temp file and atomically rename it into place.
+        Returns False, leaving the snapshot alone, if it may no longer be replaced.
+        """
+        tmp_path = self.snapshot_path.with_name(self.snapshot_path.name + ".tmp")
+
+        with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+            frame.to_csv(f, index=False)
+            f.flush()
+            os.fsync(f.fileno())
+
+        if self.snapshot_unchanged is not None and not self.snapshot_unchanged():
+            tmp_path.unlink()
+            return False
+
+        os.replace(tmp_path, self.snapshot_path)
+
+        # Persist the rename itself
+        if hasattr(os, 'O_DIRECTORY'):
+            dir_fd = os.open(self.snapshot_path.parent, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+        return True
+
+    def close(self):
+        """Flush outstanding edits and stop the flusher thread"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+        if self._flusher is not None:
+            self._flusher.join()
+            self._flusher = None
+
+        with self._cond:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            if self._owner:
+                _release(self.lock_path)
+                self._owner = False
+
+
+def apply_entries(frame: pd.DataFrame, entries: Iterable[JournalEntry], key: str = 'plot_id') -> int:
+    """
+    Apply replayed journal entries to a freshly loaded frame in order.
+    Returns the number of entries applied.
+    """
+    positions = {}
+    for position, value in enumerate(frame[key].tolist()):
+        positions.setdefault(value, position)
+
+    applied = 0
+    for plot_id, updates in entries:
+        position = positions.get(plot_id)
+        if position is None:
+            continue
+
+        label = frame.index[position]
+        for column, value in updates.items():
+            if column in frame.columns and column != key:
+                frame.loc[label, column] = value
+        applied += 1
+
+    return applied
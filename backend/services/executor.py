@@ -0,0 +1,112 @@
+"""
+Executor - Runs blocking lookups and CPU-heavy work off the event loop
+"""
+
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional
+
+# Threads for request handlers' lookups; they release the event loop, not the GIL
+THREAD_WORKERS = int(os.environ.get("LRD_THREAD_WORKERS", min(32, (os.cpu_count() or 1) + 4)))
+
+# Processes for reconciliation and duplicate scoring; 0 runs that work on threads too
+PROCESS_WORKERS = int(os.environ.get("LRD_PROCESS_WORKERS", os.cpu_count() or 1))
+
+# Jobs queued or running at once before new requests are turned away
+MAX_PENDING = int(os.environ.get("LRD_MAX_PENDING", 256))
+
+
+class ExecutorBusy(RuntimeError):
+    """Raised when MAX_PENDING jobs are already queued or running"""
+
+
+class WorkExecutor:
+    """
+    Thread and process pools shared by the async route handlers.
+
+    `run` executes a lookup on the thread pool so the event loop keeps
+    serving other clients meanwhile. `heavy` is called from inside such a
+    job to hand CPU-bound work (which must be a picklable module-level
+    function) to the process pool, so it runs outside the GIL. Pools are
+    started on first use.
+    """
+
+    def __init__(self, thread_workers: int = THREAD_WORKERS,
+                 process_workers: int = PROCESS_WORKERS,
+                 max_pending: int = MAX_PENDING):
+        self.thread_workers = max(1, thread_workers)
+        self.process_workers = max(0, process_workers)
+        self.max_pending = max(1, max_pending)
+
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._threads: Optional[ThreadPoolExecutor] = None
+        self._processes: Optional[ProcessPoolExecutor] = None
+
+    def _thread_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._threads is None:
+                self._threads = ThreadPoolExecutor(self.thread_workers, thread_name_prefix="lrd-worker")
+            return self._threads
+
+    def _process_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._processes is None:
+                # Forking a process that already runs threads is unsafe
+                self._processes = ProcessPoolExecutor(
+                    self.process_workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._processes
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """Run a blocking call on the thread pool and await its result"""
+        if not self._slots.acquire(blocking=False):
+            raise ExecutorBusy(f"Server busy: {self.max_pending} requests already in progress")
+
+        try:
+            future: Future = self._thread_pool().submit(partial(fn, *args, **kwargs))
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+
+        return await asyncio.wrap_future(future)
+
+    def heavy(self, fn: Callable, *args) -> Any:
+        """
+        Run CPU-bound work on the process pool and wait for the result.
+        Call this from a worker thread, never from the event loop.
+        """
+        if self.process_workers == 0:
+            return fn(*args)
+        return self._process_pool().submit(fn, *args).result()
+
+    def shutdown(self):
+        """Stop both pools, waiting for running jobs"""
+        with self._lock:
+            threads, self._threads = self._threads, None
+            processes, self._processes = self._processes, None
+
+        if threads is not None:
+            threads.shutdown(wait=True)
+        if processes is not None:
+            processes.shutdown(wait=True)
+
+
+# Singleton instance
+_executor: Optional[WorkExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> WorkExecutor:
+    """Get the shared executor, configured from the environment"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = WorkExecutor()
+        return _executor
@@ -2,19 +2,31 @@
 Matching Service - Handles similarity analysis for owner name matching
 """
 
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 from rapidfuzz import fuzz
-import pandas as pd
+import threading
 
 from services.data_service import get_data_service
+from services import reconciliation_engine
+from services import duplicate_detector
+from services.reconciliation_engine import ReconciliationTable
+from services.executor import get_executor
 
 
 class MatchingService:
     """Service for analyzing name similarity and detecting mismatches"""
     
     # Threshold for considering names as matching (0-100)
-    MATCH_THRESHOLD = 85
-    PARTIAL_MATCH_THRESHOLD = 60
+    MATCH_THRESHOLD = reconciliation_engine.MATCH_THRESHOLD
+    PARTIAL_MATCH_THRESHOLD = reconciliation_engine.PARTIAL_MATCH_THRESHOLD
+    
+    # Materialized comparisons, rebuilt only when the DataService version moves
+    _table: Optional[ReconciliationTable] = None
+    _table_lock = threading.Lock()
+    
+    # Blocked duplicate-owner candidate pairs as (names_version, result)
+    _duplicates: Optional[Tuple[int, Dict]] = None
+    _duplicates_lock = threading.Lock()
     
     @staticmethod
     def calculate_similarity(name1: str, name2: str) -> int:
@@ -44,69 +56,92 @@ class MatchingService:
         
         if score >= MatchingService.MATCH_THRESHOLD:
             status = "match"
-            status_label = "Verified Match"
         elif score >= MatchingService.PARTIAL_MATCH_THRESHOLD:
             status = "partial"
-            status_label = "Partial Match - Review Required"
         else:
             status = "mismatch"
-            status_label = "Mismatch - Verification Needed"
         
         return {
             "textual_name": textual_name,
             "spatial_name": spatial_name,
             "similarity_score": score,
             "status": status,
-            "status_label": status_label
+            "status_label": reconciliation_engine.STATUS_LABELS[status]
         }
     
     @classmethod
-    def get_all_comparisons(cls) -> List[Dict]:
+    def get_comparison_table(cls) -> ReconciliationTable:
         """
-        Compare all records and return comparison results.
+        Get the materialized comparison table for the current dataset version.
+        Names and areas are scored in bulk by the reconciliation engine, and
+        only when the data has changed since the table was last built.
         """
         data_service = get_data_service()
         
-        textual_df = data_service.textual_data
-        spatial_df = data_service.parcel_attributes
-        
-        if textual_df.empty or spatial_df.empty:
-            return []
-        
-        # Merge on plot_id
-        merged = pd.merge(
-            textual_df[['plot_id', 'owner_name', 'area', 'village']],
-            spatial_df[['plot_id', 'owner_name_spatial', 'area_sqm_spatial']],
-            on='plot_id',
-            how='outer'
-        )
-        
-        comparisons = []
-        for _, row in merged.iterrows():
-            textual_name = row.get('owner_name', '')
-            spatial_name = row.get('owner_name_spatial', '')
-            
-            analysis = cls.analyze_name_match(
-                str(textual_name) if pd.notna(textual_name) else '',
-                str(spatial_name) if pd.notna(spatial_name) else ''
-            )
-            
-            # Area comparison
-            textual_area = row.get('area', 0)
-            spatial_area = row.get('area_sqm_spatial', 0)
-            area_match = abs(textual_area - spatial_area) < 10 if pd.notna(textual_area) and pd.notna(spatial_area) else False
-            
-            comparisons.append({
-                "plot_id": row['plot_id'],
-                "village": row.get('village', ''),
-                "name_analysis": analysis,
-                "textual_area": int(textual_area) if pd.notna(textual_area) else None,
-                "spatial_area": int(spatial_area) if pd.notna(spatial_area) else None,
-                "area_match": area_match,
-                "overall_status": analysis['status'] if area_match else "review"
-            })
+        with cls._table_lock:
+            if cls._table is None or cls._table.version != data_service.version:
+                # Snapshot under the edit lock so the frame matches the version
+                with data_service.edit_lock:
+                    version = data_service.version
+                    if data_service.reconciled_version == version:
+                        # Built with the data at load time
+                        cls._table = data_service.comparisons
+                        return cls._table
+                    partitions = data_service.partitions
+                    if partitions is None:
+                        textual_data = data_service.textual_store.to_frame()
+                        parcel_attributes = data_service.attribute_store.to_frame()
+                
+                if partitions is not None:
+                    # Each partition scores its own plots once and keeps them
+                    result = partitions.reconciled()
+                else:
+                    # Scoring every plot is CPU-bound; run it on the process pool
+                    result = get_executor().heavy(
+                        reconciliation_engine.reconcile,
+                        textual_data,
+                        parcel_attributes
+                    )
+                cls._table = ReconciliationTable(
+                    reconciliation_engine.build_comparisons(result),
+                    version=version
+                )
+            return cls._table
+    
+    @classmethod
+    def rescore_plots(cls, plot_ids: List[str], previous_version: int):
+        """
+        Carry the comparison table forward after an edit by rescoring only
+        the edited plots. `previous_version` is the DataService version the
+        edit started from; if the table was not built from it, it is left
+        alone and rebuilt on next use.
+        """
+        data_service = get_data_service()
         
-        return comparisons
+        with cls._table_lock:
+            if cls._table is None or cls._table.version != previous_version:
+                return
+            for plot_id in plot_ids:
+                cls._table.put(reconciliation_engine.compare_records(
+                    plot_id,
+                    data_service.textual_store.get(plot_id),
+                    data_service.attribute_store.get(plot_id)
+                ))
+            cls._table.version = previous_version + 1
+    
+    @classmethod
+    def get_all_comparisons(cls) -> List[Dict]:
+        """
+        Compare all records and return comparison results.
+        """
+        return list(cls.get_comparison_table().values())
+    
+    @classmethod
+    def get_comparison(cls, plot_id: str) -> Optional[Dict]:
+        """
+        Get the comparison for a single plot ID.
+        """
+        return cls.get_comparison_table().get(plot_id.upper())
     
     @classmethod
     def get_mismatches(cls, threshold: int = None) -> List[Dict]:
@@ -128,44 +163,53 @@ class MatchingService:
         """
         Get statistics about record matching.
         """
-        comparisons = cls.get_all_comparisons()
+        return cls.get_comparison_table().stats()
+    
+    @classmethod
+    def get_duplicate_candidates(cls) -> Dict:
+        """
+        Score cross-plot owner pairs that share a blocking key and village.
+        Recomputed only when names change (DataService.names_version), so
+        edits to area or land type keep the scored candidates.
+        """
+        data_service = get_data_service()
         
-        if not comparisons:
-            return {
-                "total_records": 0,
-                "matched": 0,
-                "partial_matches": 0,
-                "mismatches": 0,
-                "match_rate": 0,
-                "by_village": {}
-            }
+        with cls._duplicates_lock:
+            if cls._duplicates is None or cls._duplicates[0] != data_service.names_version:
+                with data_service.edit_lock:
+                    version = data_service.names_version
+                    records = list(data_service.textual_store)
+                
+                result = get_executor().heavy(duplicate_detector.score_candidates, records)
+                cls._duplicates = (version, result)
+            return cls._duplicates[1]
+    
+    @classmethod
+    def get_duplicate_clusters(cls, threshold: int = None, village: Optional[str] = None) -> Dict:
+        """
+        Group plots whose owners are likely the same person.
+        """
+        if threshold is None:
+            threshold = duplicate_detector.DUPLICATE_THRESHOLD
         
-        matched = sum(1 for c in comparisons if c['name_analysis']['status'] == 'match')
-        partial = sum(1 for c in comparisons if c['name_analysis']['status'] == 'partial')
-        mismatched = sum(1 for c in comparisons if c['name_analysis']['status'] == 'mismatch')
+        data_service = get_data_service()
+        candidates = cls.get_duplicate_candidates()
+        clusters = duplicate_detector.build_clusters(
+            data_service.textual_store,
+            candidates['pairs'],
+            threshold
+        )
         
-        # Stats by village
-        by_village = {}
-        for c in comparisons:
-            village = c.get('village', 'Unknown')
-            if village not in by_village:
-                by_village[village] = {"matched": 0, "partial": 0, "mismatch": 0}
-            
-            status = c['name_analysis']['status']
-            if status == 'match':
-                by_village[village]['matched'] += 1
-            elif status == 'partial':
-                by_village[village]['partial'] += 1
-            else:
-                by_village[village]['mismatch'] += 1
+        if village:
+            clusters = [c for c in clusters if str(c['village']).lower() == village.lower()]
         
         return {
-            "total_records": len(comparisons),
-            "matched": matched,
-            "partial_matches": partial,
-            "mismatches": mismatched,
-            "match_rate": round((matched / len(comparisons)) * 100, 1) if comparisons else 0,
-            "by_village": by_village
+            "threshold": threshold,
+            "count": len(clusters),
+            "duplicate_records": sum(c['size'] for c in clusters),
+            "compared_pairs": candidates['compared_pairs'],
+            "skipped_blocks": candidates['skipped_blocks'],
+            "clusters": clusters
         }
     
     @classmethod
@@ -173,17 +217,16 @@ class MatchingService:
         """
         Generate a comprehensive reconciliation report.
         """
-        stats = cls.get_reconciliation_stats()
-        comparisons = cls.get_all_comparisons()
+        table = cls.get_comparison_table()
         
         # Sort by similarity score (lowest first for priority review)
         comparisons_sorted = sorted(
-            comparisons, 
+            table.values(), 
             key=lambda x: x['name_analysis']['similarity_score']
         )
         
         return {
-            "summary": stats,
+            "summary": table.stats(),
             "priority_review": [
                 c for c in comparisons_sorted 
                 if c['name_analysis']['status'] == 'mismatch'
@@ -0,0 +1,120 @@
+"""
+Owner Index - Character trigram inverted index for fuzzy owner-name search
+"""
+
+import heapq
+import re
+import threading
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Set, Tuple
+from rapidfuzz import fuzz, process
+
+# Matches scoring below this are not returned
+MIN_SCORE = 50
+
+OwnerMatch = Tuple[str, float, int]
+
+
+def owner_grams(name: Any) -> Set[str]:
+    """
+    Character trigrams of each word of a case-folded name. Words are padded
+    so short words and word starts still produce grams.
+    """
+    if not isinstance(name, str):
+        return set()
+
+    grams = set()
+    for token in re.findall(r'\w+', name.lower()):
+        padded = f"  {token} "
+        for start in range(len(padded) - 2):
+            grams.add(padded[start:start + 3])
+    return grams
+
+
+class OwnerIndex:
+    """
+    Inverted index from name trigrams to row positions.
+
+    A search ranks rows by how many trigrams they share with the query and
+    runs WRatio only on the best `max_candidates` of them, so its cost
+    follows the size of the matching posting lists rather than the number
+    of records. Rows are addressed by their position in the records frame,
+    the same positions `RecordStore.record_at` takes.
+    """
+
+    def __init__(self, names: Iterable[Any] = (), max_candidates: int = 256):
+        self.max_candidates = max_candidates
+        self._lock = threading.Lock()
+        self._names: List[Any] = list(names)
+        self._postings: Dict[str, Set[int]] = {}
+
+        for position, name in enumerate(self._names):
+            self._add(position, name)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _add(self, position: int, name: Any):
+        for gram in owner_grams(name):
+            self._postings.setdefault(gram, set()).add(position)
+
+    def _remove(self, position: int):
+        for gram in owner_grams(self._names[position]):
+            postings = self._postings.get(gram)
+            if postings is not None:
+                postings.discard(position)
+                if not postings:
+                    del self._postings[gram]
+
+    def update(self, position: int, name: Any):
+        """Re-index the name at a row position after an edit"""
+        with self._lock:
+            self._remove(position)
+            self._names[position] = name
+            self._add(position, name)
+
+    def candidates(self, query: str) -> List[int]:
+        """Row positions sharing the most trigrams with the query, in row order"""
+        counts: Counter = Counter()
+        with self._lock:
+            for gram in owner_grams(query):
+                counts.update(self._postings.get(gram, ()))
+
+        if len(counts) > self.max_candidates:
+            best = heapq.nlargest(
+                self.max_candidates,
+                counts.items(),
+                key=lambda item: (item[1], -item[0])
+            )
+            return sorted(position for position, _ in best)
+
+        return sorted(counts)
+
+    def search(self, query: str, limit: int = 20, score_cutoff: float = MIN_SCORE) -> List[OwnerMatch]:
+        """
+        Best WRatio matches as (name, score, position), highest score first.
+        Ties keep row order, as a full `process.extract` scan would.
+        """
+        positions = self.candidates(query)
+        if not positions:
+            return []
+
+        with self._lock:
+            choices = {position: self._names[position] for position in positions}
+
+        return process.extract(
+            query,
+            choices,
+            scorer=fuzz.WRatio,
+            limit=limit,
+            score_cutoff=score_cutoff
+        )
@@ -0,0 +1,76 @@
+"""
+Pagination - Opaque keyset cursors over a fixed plot ID order
+"""
+
+import base64
+import binascii
+import json
+from typing import Iterable, List, Optional, Tuple
+
+
+class InvalidCursor(ValueError):
+    """Raised for cursors that are malformed or point at a removed parcel"""
+
+
+def encode_cursor(version: int, position: int, plot_id: str) -> str:
+    """Pack the last plot ID served, its position and the order version"""
+    raw = json.dumps([version, position, plot_id], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[int, int, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        version, position, plot_id = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+        raise InvalidCursor("Malformed cursor")
+
+    if not isinstance(version, int) or not isinstance(position, int) or not isinstance(plot_id, str):
+        raise InvalidCursor("Malformed cursor")
+    return version, position, plot_id
+
+
+class PlotOrder:
+    """
+    The order parcels are paged in, fixed when the data is loaded.
+
+    A cursor records the last plot ID a page ended on and its position.
+    If the order is still the one that issued the cursor, the position is
+    used directly; otherwise the plot ID is looked up, so paging carries on
+    after the right parcel even across a reload. Edits never change the
+    order, so pages do not shift while records are being edited.
+    """
+
+    def __init__(self, plot_ids: Iterable[str] = (), version: int = 0):
+        self.ids: List[str] = list(plot_ids)
+        self.positions = {plot_id: position for position, plot_id in enumerate(self.ids)}
+        self.version = version
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _resume_after(self, cursor: str) -> int:
+        version, position, plot_id = decode_cursor(cursor)
+
+        if version == self.version and 0 <= position < len(self.ids) and self.ids[position] == plot_id:
+            return position + 1
+
+        position = self.positions.get(plot_id)
+        if position is None:
+            raise InvalidCursor("Cursor refers to a parcel that no longer exists")
+        return position + 1
+
+    def page(self, start: int, limit: int) -> Tuple[List[str], Optional[str]]:
+        """Plot IDs from a position, plus the cursor for the next page (None at the end)"""
+        page_ids = self.ids[start:start + limit]
+        end = start + len(page_ids)
+
+        next_cursor = None
+        if page_ids and end < len(self.ids):
+            next_cursor = encode_cursor(self.version, end - 1, page_ids[-1])
+        return page_ids, next_cursor
+
+    def page_after(self, cursor: Optional[str], limit: int) -> Tuple[List[str], Optional[str]]:
+        """Plot IDs following a cursor (from the start if None)"""
+        start = self._resume_after(cursor) if cursor else 0
+        return self.page(start, limit)
@@ -0,0 +1,607 @@
+"""
+Partition Store - Per-village partitions of the dataset, loaded on first access and evicted LRU
+"""
+
+import gc
+import os
+import pickle
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+from services.record_store import RecordStore
+from services.spatial_index import SpatialIndex, BBox, bboxes_intersect
+from services.response_cache import CachedResponse, serialize
+from services.village_index import VillageIndex
+from services import reconciliation_engine
+from services import snapshot
+
+# Bump whenever the on-disk layout changes
+PARTITION_STORE_FORMAT = 2
+
+# Tables split across the partitions, by row
+TABLES = ("textual", "attributes")
+
+
+def _read_pickle(path: Path) -> Any:
+    # Pickles: refused unless only this user could have written them
+    with snapshot.open_private(path.parent, path.name) as f:
+        # As for snapshots: unpickling millions of containers would otherwise
+        # keep triggering the cyclic GC
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return pickle.load(f)
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+
+def _write_pickle(path: Path, state: Any):
+    with open(path, 'wb', opener=snapshot.owner_only) as f:
+        pickle.dump(state, f, protocol=5)
+
+
+def _totals(frame: pd.DataFrame) -> Dict[str, Any]:
+    """The record totals /api/stats reports, for one partition"""
+    if frame.empty:
+        return {"area": 0.0, "land_types": {}}
+    return {
+        "area": float(frame['area'].sum()),
+        "land_types": frame['land_type'].value_counts().to_dict()
+    }
+
+
+# ----------------------------------------
+# Writing
+# ----------------------------------------
+
+def _route(parcels_by_id: Mapping[str, Dict], tables: Dict[str, pd.DataFrame]) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """
+    Assign every plot ID to a partition: the village of its parcel, else
+    the village of its first record, else "". Returns (plot ID -> key,
+    key -> display name). All rows of a plot land in the same partition.
+    """
+    plot_partition: Dict[str, str] = {}
+    names: Dict[str, str] = {}
+    canonical: Dict[str, str] = {}
+
+    def assign(plot_id: Any, village: Any):
+        if plot_id in plot_partition:
+            return
+        key = VillageIndex.key(village) if isinstance(village, str) and village else ""
+        if key not in names:
+            names[key] = village if key else ""
+            canonical[key] = key
+        # One string per key, however many plots share it
+        plot_partition[plot_id] = canonical[key]
+
+    for plot_id, feature in parcels_by_id.items():
+        assign(plot_id, feature.get('properties', {}).get('village'))
+    for frame in tables.values():
+        if frame.empty:
+            continue
+        villages = frame['village'].tolist() if 'village' in frame.columns else [None] * len(frame)
+        for plot_id, village in zip(frame['plot_id'].tolist(), villages):
+            assign(plot_id, village)
+
+    return plot_partition, names
+
+
+def store_path(directory: Path, digest: str) -> Path:
+    return Path(directory) / f"partitions-{digest[:16]}"
+
+
+def write_partition_store(directory: Path, digest: str, parcels_by_id: Mapping[str, Dict],
+                          tables: Dict[str, pd.DataFrame], village_index: VillageIndex, version: int) -> Path:
+    """
+    Split the loaded data by village and write one file per partition,
+    holding its features, its rows of each table, its spatial index and
+    its serialized GeoJSON, plus a manifest to route plot IDs with. Built
+    in a private directory and renamed into place, as the column store is.
+    """
+    directory = snapshot.private_directory(directory)
+    final = store_path(directory, digest)
+    if final.exists():
+        return final
+
+    plot_partition, names = _route(parcels_by_id, tables)
+    keys = sorted(names)
+    numbers = {key: number for number, key in enumerate(keys)}
+
+    features: Dict[str, Dict[str, Dict]] = {key: {} for key in keys}
+    for plot_id, feature in parcels_by_id.items():
+        features[plot_partition[plot_id]][plot_id] = feature
+
+    rows: Dict[str, Dict[str, np.ndarray]] = {}
+    routing: Dict[str, Dict[str, Any]] = {}
+    for name, frame in tables.items():
+        row_keys = [plot_partition[plot_id] for plot_id in frame['plot_id'].tolist()] if not frame.empty else []
+        partition_of_row = np.array([numbers[key] for key in row_keys], dtype=np.int64)
+        row_local = np.zeros(len(row_keys), dtype=np.int64)
+        rows[name] = {}
+        for key in keys:
+            members = np.flatnonzero(partition_of_row == numbers[key])
+            row_local[members] = np.arange(len(members))
+            rows[name][key] = members
+
+        positions: Dict[str, int] = {}
+        for position, plot_id in enumerate(frame['plot_id'].tolist() if not frame.empty else []):
+            positions.setdefault(plot_id, position)
+        routing[name] = {
+            "columns": list(frame.columns),
+            "positions": positions,
+            "row_keys": row_keys,
+            "row_local": row_local
+        }
+
+    tmp = final.with_name(f"{final.name}.tmp-{os.getpid()}")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(mode=0o700)
+    try:
+        partitions = []
+        for key in keys:
+            partition_features = features[key]
+            frames = {
+                name: frame.iloc[rows[name][key]].reset_index(drop=True) if not frame.empty else frame
+                for name, frame in tables.items()
+            }
+            spatial_index = SpatialIndex.from_features(partition_features.values())
+
+            # Same body the in-memory service precomputes for this village
+            geojson = None
+            if key in village_index.plot_ids_by_key:
+                geojson = CachedResponse({
+                    "type": "FeatureCollection",
+                    "features": [parcels_by_id[p] for p in village_index.plot_ids_by_key[key]]
+                }, version)
+
+            path = tmp / f"{numbers[key]}.part"
+            _write_pickle(path, {
+                "features": partition_features,
+                "tables": frames,
+                "rows": {name: rows[name][key] for name in tables},
+                "spatial_index": spatial_index,
+                "geojson": geojson
+            })
+            partitions.append({
+                "key": key,
+                "name": names[key],
+                "file": path.name,
+                "bytes": path.stat().st_size,
+                "parcels": len(partition_features),
+                "extent": spatial_index.extent,
+                "totals": _totals(frames.get("textual", pd.DataFrame()))
+            })
+
+        _write_pickle(tmp / "manifest.pkl", {
+            "format": PARTITION_STORE_FORMAT,
+            "digest": digest,
+            "partitions": partitions,
+            "parcel_ids": list(parcels_by_id.keys()),
+            "plot_partition": plot_partition,
+            "tables": routing
+        })
+        os.rename(tmp, final)
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)
+        if not final.exists():
+            raise
+
+    for stale in directory.glob("partitions-*"):
+        if stale != final and not stale.name.startswith(f"{final.name}.tmp-"):
+            shutil.rmtree(stale, ignore_errors=True)
+    return final
+
+
+# ----------------------------------------
+# Reading
+# ----------------------------------------
+
+class Partition:
+    """One village's parcels and records, with the indexes and responses built over them"""
+
+    def __init__(self, key: str, state: Dict[str, Any]):
+        self.key = key
+        self.features: Dict[str, Dict] = state["features"]
+        self.tables: Dict[str, RecordStore] = {name: RecordStore(frame) for name, frame in state["tables"].items()}
+        self.rows: Dict[str, np.ndarray] = state["rows"]
+        self.spatial_index: SpatialIndex = state["spatial_index"]
+        self.geojson: Optional[CachedResponse] = state["geojson"]
+        self._reconciled: Optional[pd.DataFrame] = None
+        self._statuses: Optional[Dict[str, str]] = None
+        self._lock = threading.Lock()
+
+    def _reconcile(self):
+        if self._reconciled is None:
+            self._reconciled = reconciliation_engine.reconcile(
+                self.tables["textual"].frame, self.tables["attributes"].frame
+            )
+            self._statuses = dict(zip(self._reconciled['plot_id'].tolist(), self._reconciled['status'].tolist()))
+
+    def reconciled(self) -> pd.DataFrame:
+        """reconcile() output for this partition's plots, scored on first use"""
+        with self._lock:
+            self._reconcile()
+            return self._reconciled
+
+    def status(self, plot_id: str) -> Optional[str]:
+        """Reconciliation status of one of this partition's plots"""
+        with self._lock:
+            self._reconcile()
+            return self._statuses.get(plot_id)
+
+    def update(self, table: str, plot_id: str, updates: Dict) -> Optional[Dict]:
+        with self._lock:
+            self._reconciled = None
+            self._statuses = None
+        return self.tables[table].update(plot_id, updates)
+
+
+class PartitionMetrics:
+    """Lookup and load counters for one partition"""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.evictions = 0
+        self.last_load_ms = 0.0
+        self.total_load_ms = 0.0
+
+
+class PartitionStore:
+    """
+    Routes plot IDs and villages to partitions and keeps the most recently
+    used ones loaded, within a budget of partition file bytes.
+
+    Edits are applied to the loaded partition and also kept in a small
+    per-partition log, replayed whenever that partition is loaded again,
+    so evicting a partition never loses an edit and never writes to the
+    shared partition files.
+    """
+
+    def __init__(self, path: Path, manifest: Dict, budget: int):
+        self.path = path
+        self.budget = budget
+        self.entries: Dict[str, Dict] = {entry["key"]: entry for entry in manifest["partitions"]}
+        self.parcel_ids: List[str] = manifest["parcel_ids"]
+        self.parcel_order: Dict[str, int] = {plot_id: position for position, plot_id in enumerate(self.parcel_ids)}
+        self.plot_partition: Dict[str, str] = manifest["plot_partition"]
+        self.tables: Dict[str, Dict[str, Any]] = manifest["tables"]
+
+        self._lock = threading.Lock()
+        self._loaded: "OrderedDict[str, Partition]" = OrderedDict()
+        self._loading: Dict[str, threading.Lock] = {key: threading.Lock() for key in self.entries}
+        self._edits: Dict[str, List[Tuple[str, str, Dict]]] = {}
+        self._totals: Dict[str, Dict[str, Any]] = {key: entry["totals"] for key, entry in self.entries.items()}
+        self.metrics: Dict[str, PartitionMetrics] = {key: PartitionMetrics() for key in self.entries}
+        self.resident_bytes = 0
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.entries
+
+    def keys(self) -> List[str]:
+        return list(self.entries)
+
+    def get(self, key: str) -> Partition:
+        """The partition for a key, loading it (and evicting others) if needed"""
+        metrics = self.metrics[key]
+        with self._lock:
+            partition = self._loaded.get(key)
+            if partition is not None:
+                self._loaded.move_to_end(key)
+                metrics.hits += 1
+                return partition
+            metrics.misses += 1
+
+        # Loads of different partitions run in parallel; one partition loads once
+        with self._loading[key]:
+            with self._lock:
+                partition = self._loaded.get(key)
+                if partition is not None:
+                    self._loaded.move_to_end(key)
+                    return partition
+
+            started = time.perf_counter()
+            partition = Partition(key, _read_pickle(self.path / self.entries[key]["file"]))
+
+            with self._lock:
+                for table, plot_id, updates in self._edits.get(key, ()):
+                    partition.update(table, plot_id, updates)
+                elapsed = round((time.perf_counter() - started) * 1000, 1)
+                metrics.loads += 1
+                metrics.last_load_ms = elapsed
+                metrics.total_load_ms = round(metrics.total_load_ms + elapsed, 1)
+
+                self._loaded[key] = partition
+                self.resident_bytes += self.entries[key]["bytes"]
+                self._evict()
+            return partition
+
+    def _evict(self):
+        """Drop least recently used partitions until within budget, always keeping the newest"""
+        while self.resident_bytes > self.budget and len(self._loaded) > 1:
+            key, _ = self._loaded.popitem(last=False)
+            self.resident_bytes -= self.entries[key]["bytes"]
+            self.metrics[key].evictions += 1
+
+    def for_plot(self, plot_id: str) -> Optional[Partition]:
+        key = self.plot_partition.get(plot_id)
+        return self.get(key) if key is not None else None
+
+    def update(self, table: str, plot_id: str, updates: Dict) -> Optional[Dict]:
+        """Apply an edit to the plot's partition and log it for later loads"""
+        key = self.plot_partition.get(plot_id)
+        if key is None:
+            return None
+        partition = self.get(key)
+
+        with self._lock:
+            self._edits.setdefault(key, []).append((table, plot_id, updates))
+            # If it was evicted and loaded again meanwhile, the new copy is the one served
+            partition = self._loaded.get(key, partition)
+            record = partition.update(table, plot_id, updates)
+            if table == "textual":
+                self._totals[key] = _totals(partition.tables[table].frame)
+            return record
+
+    def geojson(self, key: str) -> Optional[CachedResponse]:
+        if key not in self.entries:
+            return None
+        return self.get(key).geojson
+
+    def iter_geojson(self) -> Iterator[bytes]:
+        """
+        A FeatureCollection of every parcel as chunks of JSON, one partition
+        at a time, so the whole dataset is never loaded or serialized at once
+        """
+        yield b'{"type":"FeatureCollection","features":['
+        first = True
+        for key in self.entries:
+            features = list(self.get(key).features.values())
+            if not features:
+                continue
+            if not first:
+                yield b','
+            yield serialize(features)[1:-1]
+            first = False
+        yield b']}'
+
+    def reconciled(self) -> pd.DataFrame:
+        """reconcile() output for every plot, assembled from the partitions in plot ID order"""
+        frames = [self.get(key).reconciled() for key in self.entries]
+        frames = [frame for frame in frames if not frame.empty]
+        if not frames:
+            return reconciliation_engine.reconcile(pd.DataFrame(), pd.DataFrame())
+        return pd.concat(frames, ignore_index=True).sort_values('plot_id', kind='stable', ignore_index=True)
+
+    def status(self, plot_id: str) -> Optional[str]:
+        """Reconciliation status of one plot, loading only its partition"""
+        partition = self.for_plot(plot_id)
+        return partition.status(plot_id) if partition is not None else None
+
+    def totals(self) -> Tuple[float, Dict[str, int]]:
+        """(total area, parcels per land type) over every partition, without loading any"""
+        with self._lock:
+            totals = list(self._totals.values())
+        area = sum(entry["area"] for entry in totals)
+        land_types: Dict[str, int] = {}
+        for entry in totals:
+            for land_type, count in entry["land_types"].items():
+                land_types[land_type] = land_types.get(land_type, 0) + count
+        return area, dict(sorted(land_types.items(), key=lambda item: -item[1]))
+
+    def extent(self) -> Optional[BBox]:
+        extents = [entry["extent"] for entry in self.entries.values() if entry["extent"] is not None]
+        if not extents:
+            return None
+        return (
+            min(e[0] for e in extents), min(e[1] for e in extents),
+            max(e[2] for e in extents), max(e[3] for e in extents)
+        )
+
+    def stats(self) -> Dict:
+        with self._lock:
+            partitions = [
+                {
+                    "village": entry["name"],
+                    "parcels": entry["parcels"],
+                    "bytes": entry["bytes"],
+                    "loaded": key in self._loaded,
+                    "edits": len(self._edits.get(key, ())),
+                    **vars(self.metrics[key])
+                }
+                for key, entry in self.entries.items()
+            ]
+            resident = len(self._loaded)
+            resident_bytes = self.resident_bytes
+
+        return {
+            "budget_bytes": self.budget,
+            "resident_bytes": resident_bytes,
+            "loaded": resident,
+            "partitions": len(partitions),
+            "hits": sum(p["hits"] for p in partitions),
+            "misses": sum(p["misses"] for p in partitions),
+            "evictions": sum(p["evictions"] for p in partitions),
+            "by_partition": partitions
+        }
+
+
+class PartitionedFeatures(Mapping):
+    """plot_id -> GeoJSON feature, from the plot's partition. Iterates in feature order."""
+
+    def __init__(self, store: PartitionStore):
+        self.store = store
+
+    def __len__(self) -> int:
+        return len(self.store.parcel_ids)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.store.parcel_ids)
+
+    def __contains__(self, plot_id: object) -> bool:
+        return plot_id in self.store.parcel_order
+
+    def __getitem__(self, plot_id: str) -> Dict:
+        if plot_id not in self.store.parcel_order:
+            raise KeyError(plot_id)
+        return self.store.for_plot(plot_id).features[plot_id]
+
+
+class PartitionedRecordStore:
+    """
+    The RecordStore interface over one table spread across the partitions.
+    Positions are rows of the source file, as for an unpartitioned store.
+    """
+
+    def __init__(self, store: PartitionStore, table: str):
+        self.store = store
+        self.table = table
+        routing = store.tables[table]
+        self._columns: List[str] = routing["columns"]
+        self._positions: Dict[str, int] = routing["positions"]
+        self._row_keys: List[str] = routing["row_keys"]
+        self._row_local: np.ndarray = routing["row_local"]
+
+    def __len__(self) -> int:
+        return len(self._row_keys)
+
+    def __contains__(self, plot_id: str) -> bool:
+        return plot_id in self._positions
+
+    def _in_row_order(self, collect: Callable[[Partition], Iterable]) -> List:
+        """Gather something per row from each partition once, then put it in row order"""
+        values: List[Any] = [None] * len(self._row_keys)
+        for key in self.store.keys():
+            partition = self.store.get(key)
+            for row, value in zip(partition.rows[self.table].tolist(), collect(partition)):
+                values[row] = value
+        return values
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """Iterate over all records in row order"""
+        return iter(self._in_row_order(lambda partition: partition.tables[self.table]))
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self._columns)
+
+    def column(self, name: str) -> pd.Series:
+        """Get one column of the current records"""
+        return self.to_frame()[name]
+
+    def to_frame(self) -> pd.DataFrame:
+        """Get the current records as a new DataFrame, in row order"""
+        frames = []
+        for key in self.store.keys():
+            partition = self.store.get(key)
+            frame = partition.tables[self.table].frame
+            if not frame.empty:
+                frames.append(frame.set_axis(partition.rows[self.table], axis=0))
+        if not frames:
+            return pd.DataFrame(columns=self._columns)
+        return pd.concat(frames).sort_index().reset_index(drop=True)
+
+    def position(self, plot_id: str) -> Optional[int]:
+        """Get the row position of a plot ID"""
+        return self._positions.get(plot_id)
+
+    def get(self, plot_id: str) -> Optional[Dict]:
+        """Get the record for a plot ID"""
+        if plot_id not in self._positions:
+            return None
+        return self.store.for_plot(plot_id).tables[self.table].get(plot_id)
+
+    def get_many(self, plot_ids: Iterable[str]) -> List[Optional[Dict]]:
+        """Get records for several plot IDs (None where missing)"""
+        return [self.get(plot_id) for plot_id in plot_ids]
+
+    def record_at(self, position: int) -> Dict:
+        """Get the record at a row position"""
+        partition = self.store.get(self._row_keys[position])
+        return partition.tables[self.table].record_at(int(self._row_local[position]))
+
+    def update(self, plot_id: str, updates: Dict) -> Optional[Dict]:
+        """
+        Apply updates to a record in its partition.
+        Returns the refreshed record, or None if the plot ID is unknown.
+        """
+        if plot_id not in self._positions:
+            return None
+        return self.store.update(self.table, plot_id, updates)
+
+
+class PartitionedSpatialIndex:
+    """SpatialIndex queries answered by the partitions whose extent they touch"""
+
+    def __init__(self, store: PartitionStore):
+        self.store = store
+        self.extent: Optional[BBox] = store.extent()
+
+    def __len__(self) -> int:
+        return len(self.store.parcel_ids)
+
+    def __contains__(self, plot_id: str) -> bool:
+        return plot_id in self.store.parcel_order
+
+    def _touching(self, bbox: BBox) -> List[str]:
+        return [
+            key for key, entry in self.store.entries.items()
+            if entry["extent"] is not None and bboxes_intersect(bbox, entry["extent"])
+        ]
+
+    def query(self, bbox: BBox) -> List[str]:
+        """Plot IDs whose bounding boxes intersect bbox, in feature order"""
+        hits = []
+        for key in self._touching(bbox):
+            hits.extend(self.store.get(key).spatial_index.query(bbox))
+        hits.sort(key=self.store.parcel_order.__getitem__)
+        return hits
+
+    def locate(self, x: float, y: float, geometry_for: Callable[[str], Dict]) -> List[str]:
+        """Plot IDs whose geometry contains the point"""
+        return self.locate_points(np.array([[x, y]]), geometry_for)[0]
+
+    def locate_points(self, points: np.ndarray, geometry_for: Callable[[str], Dict]) -> List[List[str]]:
+        """Plot IDs containing each of many points, asking only partitions whose extent holds some"""
+        results: List[List[str]] = [[] for _ in range(len(points))]
+        if len(points) == 0:
+            return results
+
+        xs = points[:, 0]
+        ys = points[:, 1]
+        for key, entry in self.store.entries.items():
+            if entry["extent"] is None:
+                continue
+            minx, miny, maxx, maxy = entry["extent"]
+            members = np.flatnonzero((xs >= minx) & (xs <= maxx) & (ys >= miny) & (ys <= maxy))
+            if len(members) == 0:
+                continue
+            found = self.store.get(key).spatial_index.locate_points(points[members], geometry_for)
+            for member, plot_ids in zip(members.tolist(), found):
+                results[member].extend(plot_ids)
+
+        for plot_ids in results:
+            plot_ids.sort(key=self.store.parcel_order.__getitem__)
+        return results
+
+
+def open_partition_store(directory: Path, digest: str, budget: int) -> Optional[PartitionStore]:
+    """Open the store written for `digest`, or None if there is none"""
+    path = store_path(directory, digest)
+    try:
+        manifest = _read_pickle(path / "manifest.pkl")
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+
+    if not isinstance(manifest, dict) or manifest.get("format") != PARTITION_STORE_FORMAT \
+            or manifest.get("digest") != digest:
+        return None
+    return PartitionStore(path, manifest, budget)
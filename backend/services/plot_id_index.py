@@ -0,0 +1,132 @@
+"""
+Plot ID Index - Sorted plot IDs for prefix and segmented plot ID search
+"""
+
+import re
+from bisect import bisect_left
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+# Plot IDs look like "RAM-001": a village code and a plot number
+SEGMENT_SEPARATORS = re.compile(r'[\s\-_/]+')
+
+PlotIdMatch = Tuple[str, int]
+
+# Score for IDs that only contain the query somewhere inside a segment
+SUBSTRING_SCORE = 60
+
+
+def parse_plot_ids(plot_ids: Any, max_ids: int) -> List[str]:
+    """
+    Validate a request's list of plot IDs into upper-cased IDs, in request
+    order with repeats dropped. Raises ValueError for malformed input or
+    too many IDs.
+    """
+    if not isinstance(plot_ids, list) or not plot_ids:
+        raise ValueError("plot_ids must be a non-empty list of plot IDs")
+    if len(plot_ids) > max_ids:
+        raise ValueError(f"At most {max_ids} plot IDs per request")
+    if not all(isinstance(plot_id, str) and plot_id.strip() for plot_id in plot_ids):
+        raise ValueError("plot_ids must be a non-empty list of plot IDs")
+
+    return list(dict.fromkeys(plot_id.strip().upper() for plot_id in plot_ids))
+
+
+def _from_sorted(keys: List, values: List[str], prefix: str) -> Iterator[str]:
+    """Values whose sort key starts with prefix, in key order"""
+    position = bisect_left(keys, prefix)
+    while position < len(keys) and keys[position].startswith(prefix):
+        yield values[position]
+        position += 1
+
+
+def _prefix_range(keys: List[str], prefix: str) -> Tuple[int, int]:
+    """Positions [start, end) of the sorted keys that start with prefix"""
+    return bisect_left(keys, prefix), bisect_left(keys, prefix + '\U0010ffff')
+
+
+class PlotIdIndex:
+    """
+    Sorted views over plot IDs.
+
+    Matches come out lazily, best first: the exact ID, IDs starting with
+    the query, then IDs where the query matches the village code and plot
+    number ("RAM 7" finds RAM-007) or the start of a later segment ("00"
+    finds every plot numbered 00x). Every other ID containing the query
+    as a substring ("01" finds RAM-001 and RAM-010) follows at a lower
+    score. Those come from a sorted list of the suffixes of every distinct
+    segment, so no search scans every ID.
+    """
+
+    def __init__(self, plot_ids: Iterable[str] = ()):
+        self.ids: Dict[str, str] = {plot_id.upper(): plot_id for plot_id in plot_ids}
+        self.sorted_ids: List[str] = sorted(self.ids)
+
+        segments = []
+        self.by_segment: Dict[str, List[str]] = {}
+        self.by_number: Dict[Tuple[str, int], List[str]] = {}
+        for key in self.sorted_ids:
+            parts = SEGMENT_SEPARATORS.split(key)
+            for part in parts[1:]:
+                segments.append((part, key))
+            for part in parts:
+                if part:
+                    self.by_segment.setdefault(part, []).append(key)
+            if len(parts) > 1 and parts[-1].isdigit():
+                code = '-'.join(parts[:-1])
+                self.by_number.setdefault((code, int(parts[-1])), []).append(key)
+
+        segments.sort()
+        self.segment_keys: List[str] = [segment for segment, _ in segments]
+        self.segment_ids: List[str] = [key for _, key in segments]
+
+        # Plot IDs share few distinct segments ("RAM", "001", ...), so this stays small
+        suffixes = sorted(
+            (segment[start:], segment)
+            for segment in self.by_segment
+            for start in range(len(segment))
+        )
+        self.suffix_keys: List[str] = [suffix for suffix, _ in suffixes]
+        self.suffix_segments: List[str] = [segment for _, segment in suffixes]
+
+    def __len__(self) -> int:
+        return len(self.sorted_ids)
+
+    def _candidates(self, query: str) -> Iterator[PlotIdMatch]:
+        if query in self.ids:
+            yield query, 100
+
+        for key in _from_sorted(self.sorted_ids, self.sorted_ids, query):
+            yield key, 80
+
+        parts = [part for part in SEGMENT_SEPARATORS.split(query) if part]
+        if len(parts) > 1 and parts[-1].isdigit():
+            for key in self.by_number.get(('-'.join(parts[:-1]), int(parts[-1])), ()):
+                yield key, 80
+        elif len(parts) == 1:
+            for key in _from_sorted(self.segment_keys, self.segment_ids, parts[0]):
+                yield key, 80
+
+        if not parts:
+            return
+        # Every part of a substring match lies inside one segment, so it
+        # starts one of that segment's suffixes; check the IDs of the rarest
+        start, end = min((_prefix_range(self.suffix_keys, part) for part in parts),
+                         key=lambda span: span[1] - span[0])
+        for segment in self.suffix_segments[start:end]:
+            for key in self.by_segment[segment]:
+                if query in key:
+                    yield key, SUBSTRING_SCORE
+
+    def search(self, query: str, limit: int = 20) -> List[PlotIdMatch]:
+        """Up to `limit` (plot_id, match_score) pairs, best first"""
+        query = query.strip().upper()
+
+        def unique() -> Iterator[PlotIdMatch]:
+            seen = set()
+            for key, score in self._candidates(query):
+                if key not in seen:
+                    seen.add(key)
+                    yield self.ids[key], score
+
+        return list(islice(unique(), limit))
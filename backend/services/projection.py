@@ -0,0 +1,100 @@
+"""
+Projection - `fields=` / `exclude=` selection of parcel response fields
+"""
+
+from typing import Any, Dict, Optional, Set
+
+# Top-level fields parcel-returning endpoints may include
+PARCEL_FIELDS = {
+    "plot_id", "match_score", "matched_name",
+    "geometry", "properties", "textual_record", "spatial_attributes"
+}
+
+# Always returned so results stay identifiable
+ALWAYS_INCLUDED = {"plot_id"}
+
+# field -> None for the whole value, or the set of nested keys
+FieldSpec = Dict[str, Optional[Set[str]]]
+
+
+def _parse_spec(text: Optional[str]) -> Optional[FieldSpec]:
+    """Parse "a,b.c,b.d" into {"a": None, "b": {"c", "d"}}"""
+    if text is None:
+        return None
+
+    spec: FieldSpec = {}
+    for item in text.split(','):
+        item = item.strip()
+        if not item:
+            continue
+
+        field, _, nested = item.partition('.')
+        if field not in PARCEL_FIELDS:
+            raise ValueError(
+                f"Unknown field '{field}'. Valid fields: {', '.join(sorted(PARCEL_FIELDS))}"
+            )
+
+        if not nested:
+            spec[field] = None
+        elif field not in spec or spec[field] is not None:
+            spec.setdefault(field, set()).add(nested)
+
+    return spec
+
+
+class Projection:
+    """
+    Which fields of a parcel result to return.
+
+    `fields` keeps only the listed fields, `exclude` drops fields; both take
+    comma-separated names where "textual_record.owner_name" selects a single
+    key of a nested record. Unselected parts are never copied into the
+    response, so they cost nothing to serialize.
+    """
+
+    def __init__(self, include: Optional[FieldSpec] = None, exclude: Optional[FieldSpec] = None):
+        self.include = include
+        self.exclude = exclude or {}
+
+    @classmethod
+    def parse(cls, fields: Optional[str] = None, exclude: Optional[str] = None) -> Optional['Projection']:
+        """
+        Build a projection from query parameters, or None if neither is set.
+        Raises ValueError for unknown top-level fields.
+        """
+        if fields is None and exclude is None:
+            return None
+        return cls(_parse_spec(fields), _parse_spec(exclude))
+
+    def wants(self, field: str) -> bool:
+        """Whether any part of a top-level field is returned"""
+        if field in ALWAYS_INCLUDED:
+            return True
+        if field in self.exclude and self.exclude[field] is None:
+            return False
+        return self.include is None or field in self.include
+
+    def apply(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Project one result dict"""
+        projected = {}
+        for field, value in result.items():
+            if not self.wants(field):
+                continue
+
+            if isinstance(value, dict):
+                keep = self.include.get(field) if self.include is not None else None
+                drop = self.exclude.get(field)
+                if keep is not None:
+                    value = {key: value[key] for key in keep if key in value}
+                if drop:
+                    value = {key: item for key, item in value.items() if key not in drop}
+
+            projected[field] = value
+        return projected
+
+
+def project(result: Optional[Dict[str, Any]], projection: Optional[Projection]) -> Optional[Dict[str, Any]]:
+    """Apply a projection if there is one"""
+    if result is None or projection is None:
+        return result
+    return projection.apply(result)
@@ -0,0 +1,333 @@
+"""
+Reconciliation Engine - Batched comparison of textual and spatial records
+"""
+
+from typing import Dict, Iterable, List, Optional, Sequence, Set
+import numpy as np
+import pandas as pd
+from rapidfuzz import fuzz, process
+
+# Threshold for considering names as matching (0-100)
+MATCH_THRESHOLD = 85
+PARTIAL_MATCH_THRESHOLD = 60
+
+# Areas within this many square metres are considered equal
+AREA_TOLERANCE_SQM = 10
+
+# rapidfuzz worker threads for bulk scoring (-1 uses every core)
+SCORING_WORKERS = -1
+
+STATUS_LABELS = {
+    "match": "Verified Match",
+    "partial": "Partial Match - Review Required",
+    "mismatch": "Mismatch - Verification Needed"
+}
+
+
+def normalize_names(names: pd.Series) -> List[str]:
+    """Lowercase and strip a column of names, treating missing values as empty"""
+    return names.fillna('').astype(str).str.lower().str.strip().tolist()
+
+
+def score_names(textual_names: Sequence[str], spatial_names: Sequence[str],
+                workers: int = SCORING_WORKERS) -> np.ndarray:
+    """
+    Score aligned pairs of normalized names with WRatio in one batched call.
+    Pairs where either name is empty score 0.
+    """
+    if len(textual_names) == 0:
+        return np.zeros(0)
+
+    scores = process.cpdist(
+        textual_names,
+        spatial_names,
+        scorer=fuzz.WRatio,
+        dtype=np.float64,
+        workers=workers
+    )
+
+    empty = (np.array([len(n) for n in textual_names]) == 0) | \
+        (np.array([len(n) for n in spatial_names]) == 0)
+    scores[empty] = 0
+
+    return scores
+
+
+def classify_score(score: float) -> str:
+    """Map a single similarity score to match / partial / mismatch"""
+    if score >= MATCH_THRESHOLD:
+        return "match"
+    if score >= PARTIAL_MATCH_THRESHOLD:
+        return "partial"
+    return "mismatch"
+
+
+def classify_scores(scores: np.ndarray) -> np.ndarray:
+    """Map similarity scores to match / partial / mismatch"""
+    return np.select(
+        [scores >= MATCH_THRESHOLD, scores >= PARTIAL_MATCH_THRESHOLD],
+        ["match", "partial"],
+        default="mismatch"
+    )
+
+
+def reconcile(textual_df: pd.DataFrame, spatial_df: pd.DataFrame,
+              how: str = 'outer', workers: int = SCORING_WORKERS) -> pd.DataFrame:
+    """
+    Align textual records with spatial attributes on plot_id once and score
+    every pair in bulk. Returns one row per plot with the columns
+    plot_id, village, textual_name, spatial_name, similarity_score, status,
+    textual_area, spatial_area and area_match.
+    """
+    columns = [
+        'plot_id', 'village', 'textual_name', 'spatial_name', 'similarity_score',
+        'status', 'textual_area', 'spatial_area', 'area_match'
+    ]
+    if textual_df.empty or spatial_df.empty:
+        return pd.DataFrame(columns=columns)
+
+    spatial_columns = ['plot_id', 'owner_name_spatial', 'area_sqm_spatial']
+    if 'village' in spatial_df.columns:
+        spatial_columns.append('village')
+
+    # The first spatial row wins for a duplicated plot_id
+    aligned = pd.merge(
+        textual_df[['plot_id', 'owner_name', 'area', 'village']],
+        spatial_df[spatial_columns].drop_duplicates('plot_id'),
+        on='plot_id',
+        how=how,
+        suffixes=('', '_spatial')
+    )
+
+    village = aligned['village']
+    if 'village_spatial' in aligned.columns:
+        village = village.fillna(aligned['village_spatial'])
+
+    scores = score_names(
+        normalize_names(aligned['owner_name']),
+        normalize_names(aligned['owner_name_spatial']),
+        workers=workers
+    )
+
+    textual_area = pd.to_numeric(aligned['area'], errors='coerce').to_numpy(dtype=float)
+    spatial_area = pd.to_numeric(aligned['area_sqm_spatial'], errors='coerce').to_numpy(dtype=float)
+    area_match = np.abs(textual_area - spatial_area) < AREA_TOLERANCE_SQM
+
+    return pd.DataFrame({
+        'plot_id': aligned['plot_id'].to_numpy(),
+        'village': village.fillna('').to_numpy(),
+        'textual_name': aligned['owner_name'].fillna('').astype(str).to_numpy(),
+        'spatial_name': aligned['owner_name_spatial'].fillna('').astype(str).to_numpy(),
+        'similarity_score': scores,
+        'status': classify_scores(scores),
+        'textual_area': textual_area,
+        'spatial_area': spatial_area,
+        'area_match': area_match
+    }, columns=columns)
+
+
+def changed_villages(old: pd.DataFrame, new: pd.DataFrame) -> Optional[Set[str]]:
+    """
+    Villages whose rows differ between two versions of a frame, compared
+    by row hashes in order. None if the frames are not comparable by
+    village (different columns or dtypes, or no village column).
+    """
+    if list(old.columns) != list(new.columns) or not old.dtypes.equals(new.dtypes) \
+            or 'village' not in new.columns:
+        return None
+
+    def rows_by_village(frame: pd.DataFrame) -> Dict[str, bytes]:
+        if frame.empty:
+            return {}
+        hashes = pd.util.hash_pandas_object(frame, index=False).to_numpy()
+        groups = frame.groupby(frame['village'].fillna('').to_numpy(), sort=False).indices
+        return {village: hashes[positions].tobytes() for village, positions in groups.items()}
+
+    before = rows_by_village(old)
+    after = rows_by_village(new)
+    return {village for village in before.keys() | after.keys() if before.get(village) != after.get(village)}
+
+
+def rescore(previous: pd.DataFrame, textual_df: pd.DataFrame, spatial_df: pd.DataFrame,
+            plot_ids: Set[str]) -> pd.DataFrame:
+    """
+    reconcile() for data that differs from what `previous` was computed
+    from only in `plot_ids`: rows for other plots are carried over and only
+    these plots are scored again. Rows come out in reconcile()'s order.
+    """
+    textual_rows = textual_df[textual_df['plot_id'].isin(plot_ids)]
+    spatial_rows = spatial_df[spatial_df['plot_id'].isin(plot_ids)]
+    if textual_rows.empty != spatial_rows.empty:
+        # reconcile() returns nothing when one side is empty; an outer join would not
+        return reconcile(textual_df, spatial_df)
+
+    kept = previous[~previous['plot_id'].isin(plot_ids)]
+    if textual_rows.empty:
+        return kept.reset_index(drop=True)
+
+    rescored = reconcile(textual_rows, spatial_rows)
+    merged = pd.concat([kept, rescored], ignore_index=True)
+    return merged.sort_values('plot_id', kind='stable', ignore_index=True)
+
+
+def _optional_int(value: float):
+    return None if np.isnan(value) else int(value)
+
+
+def _optional_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float('nan')
+
+
+def _text(value) -> str:
+    return '' if value is None or pd.isna(value) else str(value)
+
+
+def make_comparison(plot_id: str, village: str, textual_name: str, spatial_name: str,
+                    score: float, status: str, textual_area: float, spatial_area: float,
+                    area_match: bool, status_labels: Dict[str, str],
+                    include_area: bool = True) -> Dict:
+    """Build one comparison dict in the shape the API returns"""
+    comparison = {
+        "plot_id": plot_id,
+        "village": village,
+        "name_analysis": {
+            "textual_name": textual_name,
+            "spatial_name": spatial_name,
+            "similarity_score": score,
+            "status": status,
+            "status_label": status_labels[status]
+        }
+    }
+
+    if include_area:
+        comparison.update({
+            "textual_area": _optional_int(textual_area),
+            "spatial_area": _optional_int(spatial_area),
+            "area_match": area_match,
+            "overall_status": status if area_match else "review"
+        })
+
+    return comparison
+
+
+def compare_records(plot_id: str, textual_record: Optional[Dict], spatial_record: Optional[Dict],
+                    status_labels: Dict[str, str] = None, include_area: bool = True) -> Dict:
+    """
+    Score a single plot from its textual record and spatial attributes.
+    Gives the same result as the row reconcile() would produce for it.
+    """
+    if status_labels is None:
+        status_labels = STATUS_LABELS
+
+    textual_record = textual_record or {}
+    spatial_record = spatial_record or {}
+
+    textual_name = _text(textual_record.get('owner_name'))
+    spatial_name = _text(spatial_record.get('owner_name_spatial'))
+    village = _text(textual_record.get('village')) or _text(spatial_record.get('village'))
+
+    score = float(score_names(
+        [textual_name.lower().strip()],
+        [spatial_name.lower().strip()],
+        workers=1
+    )[0])
+
+    textual_area = _optional_float(textual_record.get('area'))
+    spatial_area = _optional_float(spatial_record.get('area_sqm_spatial'))
+    area_match = bool(abs(textual_area - spatial_area) < AREA_TOLERANCE_SQM)
+
+    return make_comparison(
+        plot_id, village, textual_name, spatial_name, score, classify_score(score),
+        textual_area, spatial_area, area_match, status_labels, include_area
+    )
+
+
+def build_comparisons(result: pd.DataFrame, status_labels: Dict[str, str] = None,
+                      include_area: bool = True) -> List[Dict]:
+    """
+    Turn a reconcile() frame into the comparison dicts the API returns.
+    Columns are converted to Python lists once rather than per row.
+    """
+    if status_labels is None:
+        status_labels = STATUS_LABELS
+
+    columns = [result[name].tolist() for name in (
+        'plot_id', 'village', 'textual_name', 'spatial_name', 'similarity_score',
+        'status', 'textual_area', 'spatial_area', 'area_match'
+    )]
+
+    return [
+        make_comparison(*row, status_labels, include_area)
+        for row in zip(*columns)
+    ]
+
+
+class ReconciliationTable:
+    """
+    Comparisons keyed by plot_id, with per-status and per-village counters
+    maintained as deltas so a single rescored plot never triggers a recount.
+    """
+
+    # Status -> counter key used in the by_village breakdown
+    VILLAGE_COUNTER_KEYS = {"match": "matched", "partial": "partial", "mismatch": "mismatch"}
+
+    def __init__(self, comparisons: Iterable[Dict] = (), version: Optional[int] = None):
+        # Dataset version the comparisons were computed from
+        self.version = version
+        self.comparisons: Dict[str, Dict] = {}
+        self.status_counts: Dict[str, int] = {"match": 0, "partial": 0, "mismatch": 0}
+        self.village_counts: Dict[str, Dict[str, int]] = {}
+
+        for comparison in comparisons:
+            self.put(comparison)
+
+    def __len__(self) -> int:
+        return len(self.comparisons)
+
+    def __contains__(self, plot_id: str) -> bool:
+        return plot_id in self.comparisons
+
+    def get(self, plot_id: str) -> Optional[Dict]:
+        """Get the comparison for a plot ID"""
+        return self.comparisons.get(plot_id)
+
+    def values(self):
+        """All comparisons in insertion order"""
+        return self.comparisons.values()
+
+    def _count(self, comparison: Dict, delta: int):
+        status = comparison['name_analysis']['status']
+        self.status_counts[status] += delta
+
+        village = comparison.get('village', 'Unknown')
+        counts = self.village_counts.setdefault(village, {"matched": 0, "partial": 0, "mismatch": 0})
+        counts[self.VILLAGE_COUNTER_KEYS[status]] += delta
+
+        if delta < 0 and not any(counts.values()):
+            del self.village_counts[village]
+
+    def put(self, comparison: Dict):
+        """Insert or replace a comparison, adjusting counters by the difference"""
+        previous = self.comparisons.get(comparison['plot_id'])
+        if previous is not None:
+            self._count(previous, -1)
+
+        self.comparisons[comparison['plot_id']] = comparison
+        self._count(comparison, 1)
+
+    def stats(self) -> Dict:
+        """Reconciliation summary read straight from the counters"""
+        total = len(self.comparisons)
+        matched = self.status_counts["match"]
+
+        return {
+            "total_records": total,
+            "matched": matched,
+            "partial_matches": self.status_counts["partial"],
+            "mismatches": self.status_counts["mismatch"],
+            "match_rate": round((matched / total) * 100, 1) if total > 0 else 0,
+            "by_village": {village: dict(counts) for village, counts in self.village_counts.items()}
+        }
@@ -0,0 +1,86 @@
+"""
+Record Store - Hash index over tabular land records keyed by plot ID
+"""
+
+from typing import Dict, Iterable, Iterator, List, Optional, Any
+import pandas as pd
+
+
+class RecordStore:
+    """
+    Indexes a DataFrame by plot ID and keeps a prebuilt record dict per row,
+    so single-record lookups are O(1) instead of a full column scan.
+    """
+
+    def __init__(self, frame: Optional[pd.DataFrame] = None, key: str = 'plot_id'):
+        self.frame: pd.DataFrame = frame if frame is not None else pd.DataFrame()
+        self.key = key
+        self._records: List[Dict[str, Any]] = []
+        self._positions: Dict[str, int] = {}
+        self._build()
+
+    def _build(self):
+        """Convert the frame to records once and map plot_id -> row position"""
+        self._records = self.frame.to_dict('records') if not self.frame.empty else []
+        self._positions = {}
+        for position, record in enumerate(self._records):
+            # First occurrence wins, matching the old `.to_dict('records')[0]`
+            self._positions.setdefault(record.get(self.key), position)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, plot_id: str) -> bool:
+        return plot_id in self._positions
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """Iterate over all records in row order"""
+        return iter(self._records)
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self.frame.columns)
+
+    def column(self, name: str) -> pd.Series:
+        """Get one column of the current records"""
+        return self.frame[name]
+
+    def to_frame(self) -> pd.DataFrame:
+        """Get a copy of the current records as a DataFrame"""
+        return self.frame.copy()
+
+    def position(self, plot_id: str) -> Optional[int]:
+        """Get the row position of a plot ID"""
+        return self._positions.get(plot_id)
+
+    def get(self, plot_id: str) -> Optional[Dict]:
+        """Get the record for a plot ID"""
+        position = self._positions.get(plot_id)
+        if position is None:
+            return None
+        return self._records[position]
+
+    def get_many(self, plot_ids: Iterable[str]) -> List[Optional[Dict]]:
+        """Get records for several plot IDs (None where missing)"""
+        return [self.get(plot_id) for plot_id in plot_ids]
+
+    def record_at(self, position: int) -> Dict:
+        """Get the record at a row position"""
+        return self._records[position]
+
+    def update(self, plot_id: str, updates: Dict) -> Optional[Dict]:
+        """
+        Apply updates to a record in both the frame and the prebuilt record.
+        Returns the refreshed record, or None if the plot ID is unknown.
+        """
+        position = self._positions.get(plot_id)
+        if position is None:
+            return None
+
+        label = self.frame.index[position]
+        for key, value in updates.items():
+            self.frame.loc[label, key] = value
+
+        # Rebuild only this row so values carry the frame's dtypes
+        self._records[position] = self.frame.iloc[[position]].to_dict('records')[0]
+        return self._records[position]
@@ -0,0 +1,88 @@
+"""
+Report Export - Streams reconciliation rows as CSV or NDJSON
+"""
+
+import csv
+import io
+import json
+from typing import Dict, Iterable, Iterator, List
+
+EXPORT_COLUMNS = [
+    "plot_id", "village", "textual_owner", "spatial_owner",
+    "similarity_score", "match_status", "textual_area",
+    "spatial_area", "area_match"
+]
+
+EXPORT_FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson"
+}
+
+# Rows are buffered into chunks of about this many characters before sending
+CHUNK_SIZE = 64 * 1024
+
+
+def export_row(comparison: Dict) -> Dict:
+    """Flatten a comparison into an export row"""
+    return {
+        "plot_id": comparison['plot_id'],
+        "village": comparison.get('village', ''),
+        "textual_owner": comparison['name_analysis']['textual_name'],
+        "spatial_owner": comparison['name_analysis']['spatial_name'],
+        "similarity_score": comparison['name_analysis']['similarity_score'],
+        "match_status": comparison['name_analysis']['status'],
+        "textual_area": comparison.get('textual_area', ''),
+        "spatial_area": comparison.get('spatial_area', ''),
+        "area_match": comparison.get('area_match', False)
+    }
+
+
+def export_rows(comparisons: Iterable[Dict], columns: List[str] = EXPORT_COLUMNS) -> Iterator[Dict]:
+    """Yield export rows one at a time, restricted to `columns`"""
+    for comparison in comparisons:
+        row = export_row(comparison)
+        yield {column: row[column] for column in columns}
+
+
+def stream_csv(rows: Iterable[Dict], columns: List[str] = EXPORT_COLUMNS) -> Iterator[str]:
+    """Yield CSV text in chunks, header first"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, lineterminator='\n')
+    writer.writeheader()
+
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def stream_ndjson(rows: Iterable[Dict]) -> Iterator[str]:
+    """Yield newline-delimited JSON, one object per row, in chunks"""
+    chunk: List[str] = []
+    size = 0
+
+    for row in rows:
+        line = json.dumps(row, default=str) + "\n"
+        chunk.append(line)
+        size += len(line)
+        if size >= CHUNK_SIZE:
+            yield ''.join(chunk)
+            chunk = []
+            size = 0
+
+    if chunk:
+        yield ''.join(chunk)
+
+
+def stream_export(comparisons: Iterable[Dict], export_format: str,
+                  columns: List[str] = EXPORT_COLUMNS) -> Iterator[str]:
+    """Stream comparisons in one of EXPORT_FORMATS"""
+    rows = export_rows(comparisons, columns)
+    if export_format == "ndjson":
+        return stream_ndjson(rows)
+    return stream_csv(rows, columns)
@@ -0,0 +1,112 @@
+"""
+Response Cache - Pre-serialized, pre-compressed JSON bodies with ETags
+"""
+
+import gzip
+import hashlib
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional; gzip is always available
+    brotli = None
+
+
+def serialize(payload: Any) -> bytes:
+    """Compact UTF-8 JSON encoding"""
+    return json.dumps(payload, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def _accepted_encodings(accept_encoding: Optional[str]) -> Dict[str, float]:
+    """Parse an Accept-Encoding header into {coding: q}"""
+    accepted = {}
+    for part in (accept_encoding or '').split(','):
+        coding, _, params = part.strip().partition(';')
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding.strip().lower()] = q
+    return accepted
+
+
+def _compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=6)
+    return brotli.compress(body, quality=5)
+
+
+class CachedResponse:
+    """
+    A JSON body serialized once, with gzip and (if available) brotli
+    variants and a strong ETag per variant.
+    """
+
+    def __init__(self, payload: Any, version: int):
+        self.body = serialize(payload)
+        digest = hashlib.sha256(self.body).hexdigest()[:20]
+        self.etag = f'"{version}-{digest}"'
+
+        self.etags: Dict[str, str] = {"identity": self.etag, "gzip": f'"{version}-{digest}-gz"'}
+        if brotli is not None:
+            self.etags["br"] = f'"{version}-{digest}-br"'
+
+        self.variants: Dict[str, Tuple[bytes, str]] = {
+            encoding: (self.body if encoding == "identity" else _compress(self.body, encoding), etag)
+            for encoding, etag in self.etags.items()
+        }
+
+    @property
+    def encodings(self) -> List[str]:
+        return list(self.etags)
+
+    def etag_for(self, encoding: str) -> str:
+        return self.etags[encoding]
+
+    def body_for(self, encoding: str) -> bytes:
+        return self.variants[encoding][0]
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        """Whether an If-None-Match header names any variant of this body"""
+        if not if_none_match:
+            return False
+        tags = {tag.strip() for tag in if_none_match.split(',')}
+        if '*' in tags:
+            return True
+        # Weak comparison is allowed for If-None-Match
+        tags |= {tag[2:] for tag in tags if tag.startswith('W/')}
+        return any(self.etag_for(encoding) in tags for encoding in self.encodings)
+
+    def negotiate(self, if_none_match: Optional[str] = None,
+                  accept_encoding: Optional[str] = None) -> Tuple[int, bytes, Dict[str, str]]:
+        """
+        Pick the response for a request's conditional and encoding headers.
+        Returns (status, body, headers); status is 304 with an empty body
+        when the client already has the current representation.
+        """
+        accepted = _accepted_encodings(accept_encoding)
+        encoding = "identity"
+        for candidate in ("br", "gzip"):
+            if candidate in self.encodings and accepted.get(candidate, accepted.get('*', 0)) > 0:
+                encoding = candidate
+                break
+
+        headers = {
+            "ETag": self.etag_for(encoding),
+            "Vary": "Accept-Encoding",
+            "Cache-Control": "no-cache"
+        }
+
+        if self.matches(if_none_match):
+            return 304, b"", headers
+
+        headers["Content-Type"] = "application/json"
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return 200, self.body_for(encoding), headers
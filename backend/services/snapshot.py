@@ -0,0 +1,178 @@
+"""
+Snapshot - Versioned binary dump of a loaded dataset, keyed by its source files
+"""
+
+import gc
+import hashlib
+import mmap
+import os
+import pickle
+import stat
+import struct
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterable, Optional
+
+# Bump whenever the shape of the stored state changes
+SNAPSHOT_FORMAT = 4
+
+_MAGIC = b"LRDSNAP"
+# magic, format, source hash, SHA-256 of the pickled body
+_HEADER = struct.Struct("<7sH64s32s")
+
+
+class _HashingWriter:
+    """File wrapper hashing everything written through it"""
+
+    def __init__(self, f):
+        self.f = f
+        self.digest = hashlib.sha256()
+
+    def write(self, data) -> int:
+        self.digest.update(data)
+        return self.f.write(data)
+
+
+def _check_private(status: os.stat_result, path: Path):
+    """Refuse a file or directory another user could have written"""
+    if status.st_uid != os.geteuid():
+        raise PermissionError(f"{path} is not owned by this user; not loading it")
+    if status.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+        raise PermissionError(f"{path} is writable by other users; not loading it")
+
+
+def owner_only(path: str, flags: int) -> int:
+    """open() opener creating files only this user can read or write"""
+    return os.open(path, flags, 0o600)
+
+
+def private_directory(directory: Path) -> Path:
+    """
+    Create `directory` for this user only, or check that an existing one
+    is this user's and take write access away from everyone else.
+
+    Snapshots and partitions are pickles, and loading a pickle runs
+    whatever code its writer put in it, so they are only ever read from
+    a directory and files no other user can write.
+    """
+    directory = Path(directory)
+    directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        status = os.fstat(fd)
+        if status.st_uid != os.geteuid():
+            raise PermissionError(f"{directory} is not owned by this user; not writing to it")
+        if status.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+            os.fchmod(fd, stat.S_IMODE(status.st_mode) & ~(stat.S_IWGRP | stat.S_IWOTH))
+    finally:
+        os.close(fd)
+    return directory
+
+
+def open_private(directory: Path, name: str) -> BinaryIO:
+    """
+    Open directory/name for reading. Raises PermissionError unless both
+    are owned by this user and writable by no one else; they are checked
+    as opened, so neither can be swapped in between.
+    """
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        _check_private(os.fstat(fd), Path(directory))
+        file_fd = os.open(name, os.O_RDONLY, dir_fd=fd)
+    finally:
+        os.close(fd)
+
+    try:
+        _check_private(os.fstat(file_fd), Path(directory) / name)
+    except PermissionError:
+        os.close(file_fd)
+        raise
+    return os.fdopen(file_fd, 'rb')
+
+
+def source_hash(paths: Iterable[Path], layout: str = "memory") -> str:
+    """
+    SHA-256 over the snapshot format, the storage layout the snapshot is
+    for, and the name and content of each file
+    """
+    digest = hashlib.sha256(f"format:{SNAPSHOT_FORMAT}".encode())
+    if layout != "memory":
+        digest.update(f"layout:{layout}".encode())
+    for path in paths:
+        path = Path(path)
+        digest.update(b"\0" + path.name.encode('utf-8') + b"\0")
+        if not path.exists():
+            digest.update(b"missing")
+            continue
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def snapshot_path(directory: Path, digest: str) -> Path:
+    return Path(directory) / f"dataset-{digest[:16]}.snap"
+
+
+def write_snapshot(directory: Path, digest: str, state: Dict[str, Any]) -> Path:
+    """
+    Write `state` under its source hash, atomically, and remove snapshots
+    of older sources. Objects shared within `state` stay shared on load.
+    """
+    directory = private_directory(directory)
+    path = snapshot_path(directory, digest)
+    # Workers starting together may each write the same snapshot
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+
+    try:
+        with open(tmp_path, 'wb', opener=owner_only) as f:
+            f.write(bytes(_HEADER.size))
+            writer = _HashingWriter(f)
+            pickle.dump(state, writer, protocol=5)
+            f.seek(0)
+            f.write(_HEADER.pack(_MAGIC, SNAPSHOT_FORMAT, digest.encode('ascii'), writer.digest.digest()))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+    for stale in directory.glob("dataset-*.snap"):
+        if stale != path:
+            stale.unlink(missing_ok=True)
+    return path
+
+
+def read_snapshot(directory: Path, digest: str) -> Optional[Dict[str, Any]]:
+    """
+    Load the state written for `digest`, or None if there is no snapshot
+    for these sources, it was written by another format version, or it
+    cannot be read back intact, or another user could have written it.
+    A snapshot is only a cache: any failure means a full load.
+    """
+    path = snapshot_path(directory, digest)
+    if not path.exists():
+        return None
+
+    # Unpickling allocates millions of containers, each of which would
+    # otherwise trigger the cyclic GC to rescan everything loaded so far
+    gc_enabled = gc.isenabled()
+    try:
+        with open_private(directory, path.name) as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if len(mapped) < _HEADER.size:
+                return None
+            magic, version, stored_digest, checksum = _HEADER.unpack_from(mapped)
+            if magic != _MAGIC or version != SNAPSHOT_FORMAT or stored_digest != digest.encode('ascii'):
+                return None
+
+            with memoryview(mapped) as view, view[_HEADER.size:] as body:
+                if hashlib.sha256(body).digest() != checksum:
+                    print(f"✗ Snapshot {path.name} is damaged; ignoring it")
+                    return None
+                gc.disable()
+                return pickle.loads(body)
+    except Exception as e:
+        print(f"✗ Could not read snapshot {path.name}: {e}")
+        return None
+    finally:
+        if gc_enabled:
+            gc.enable()
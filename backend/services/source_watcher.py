@@ -0,0 +1,76 @@
+"""
+Source Watcher - Reloads the data service when the upstream feed replaces its files
+"""
+
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+from services.data_service import (
+    ReloadFailed,
+    ReloadInProgress,
+    get_data_service,
+    reload_data_service
+)
+
+# Seconds between checks of the source files; 0 disables watching
+WATCH_INTERVAL = float(os.environ.get("LRD_WATCH_INTERVAL", 5))
+
+Stats = Dict[str, Optional[Tuple[int, int]]]
+
+
+class SourceWatcher:
+    """
+    Polls the modification time and size of the feed files. A change is
+    acted on only once it has stayed the same for a whole interval, so a
+    file still being copied into place is never loaded half-written.
+    """
+
+    def __init__(self, interval: float = WATCH_INTERVAL):
+        self.interval = interval
+        self._settling: Optional[Stats] = None
+        # Stats of sources a reload already failed on; retried only once they change again
+        self._failed: Optional[Stats] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self.interval <= 0 or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="source-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def check(self) -> bool:
+        """Reload if the feed files changed and have settled. Returns whether it reloaded."""
+        data_service = get_data_service()
+        stats = data_service.feed_stats()
+        loaded = {name: data_service.source_stats.get(name) for name in stats}
+
+        if stats == loaded or stats == self._failed:
+            self._settling = None
+            return False
+        if stats != self._settling:
+            self._settling = stats
+            return False
+
+        self._settling = None
+        try:
+            reload_data_service()
+        except ReloadInProgress:
+            return False
+        except ReloadFailed as e:
+            print(f"✗ {e}")
+            self._failed = stats
+            return False
+        self._failed = None
+        return True
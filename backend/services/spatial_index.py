@@ -0,0 +1,316 @@
+"""
+Spatial Index - Uniform grid over parcel bounding boxes
+"""
+
+import math
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Any
+import numpy as np
+
+BBox = Tuple[float, float, float, float]
+
+
+def parse_bbox(text: str) -> BBox:
+    """
+    Parse a "minx,miny,maxx,maxy" query string value.
+    Raises ValueError for malformed or inverted boxes.
+    """
+    parts = text.split(',')
+    if len(parts) != 4:
+        raise ValueError("bbox must be minx,miny,maxx,maxy")
+
+    try:
+        minx, miny, maxx, maxy = (float(p) for p in parts)
+    except ValueError:
+        raise ValueError("bbox values must be numbers")
+
+    if not all(math.isfinite(v) for v in (minx, miny, maxx, maxy)):
+        raise ValueError("bbox values must be finite")
+    if minx > maxx or miny > maxy:
+        raise ValueError("bbox min values must not exceed max values")
+
+    return minx, miny, maxx, maxy
+
+
+def _iter_positions(coordinates: Any) -> Iterable[Tuple[float, float]]:
+    """Yield every (x, y) position from nested GeoJSON coordinates"""
+    if not coordinates:
+        return
+    if isinstance(coordinates[0], (int, float)):
+        yield coordinates[0], coordinates[1]
+        return
+    for part in coordinates:
+        yield from _iter_positions(part)
+
+
+def geometry_bounds(geometry: Optional[Dict]) -> Optional[BBox]:
+    """Bounding box of a GeoJSON geometry, or None if it has no coordinates"""
+    if not geometry:
+        return None
+
+    if geometry.get('type') == 'GeometryCollection':
+        boxes = [b for b in (geometry_bounds(g) for g in geometry.get('geometries', [])) if b]
+    else:
+        positions = list(_iter_positions(geometry.get('coordinates')))
+        if not positions:
+            return None
+        xs = [p[0] for p in positions]
+        ys = [p[1] for p in positions]
+        boxes = [(min(xs), min(ys), max(xs), max(ys))]
+
+    if not boxes:
+        return None
+
+    return (
+        min(b[0] for b in boxes),
+        min(b[1] for b in boxes),
+        max(b[2] for b in boxes),
+        max(b[3] for b in boxes)
+    )
+
+
+def bboxes_intersect(a: BBox, b: BBox) -> bool:
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
+def parse_points(points: Any, max_points: int) -> np.ndarray:
+    """
+    Validate a list of [lon, lat] pairs into an (n, 2) float array.
+    Raises ValueError for malformed input or too many points.
+    """
+    if not isinstance(points, list) or not points:
+        raise ValueError("points must be a non-empty list of [lon, lat] pairs")
+    if len(points) > max_points:
+        raise ValueError(f"At most {max_points} points per request")
+
+    try:
+        array = np.asarray(points, dtype=float)
+    except (TypeError, ValueError):
+        raise ValueError("points must be a non-empty list of [lon, lat] pairs")
+
+    if array.ndim != 2 or array.shape[1] != 2:
+        raise ValueError("points must be a non-empty list of [lon, lat] pairs")
+    if not np.isfinite(array).all():
+        raise ValueError("point coordinates must be finite")
+
+    return array
+
+
+def _polygons(geometry: Dict) -> List[List]:
+    """Rings of each polygon in a Polygon / MultiPolygon geometry"""
+    if geometry.get('type') == 'Polygon':
+        return [geometry.get('coordinates', [])]
+    if geometry.get('type') == 'MultiPolygon':
+        return geometry.get('coordinates', [])
+    return []
+
+
+def points_in_polygon(xs: np.ndarray, ys: np.ndarray, geometry: Dict) -> np.ndarray:
+    """
+    Even-odd ray casting for many points against one (Multi)Polygon at once.
+    Holes are handled by the parity rule; edges are half-open so a point on
+    an edge shared by two parcels falls in exactly one of them.
+    """
+    inside_any = np.zeros(len(xs), dtype=bool)
+
+    for rings in _polygons(geometry):
+        inside = np.zeros(len(xs), dtype=bool)
+        for ring in rings:
+            coords = np.asarray(ring, dtype=float)
+            if len(coords) < 3:
+                continue
+            x1, y1 = coords[:, 0], coords[:, 1]
+            x2, y2 = np.roll(x1, -1), np.roll(y1, -1)
+
+            # (points, edges) crossing test
+            crosses = (y1[None, :] > ys[:, None]) != (y2[None, :] > ys[:, None])
+            with np.errstate(divide='ignore', invalid='ignore'):
+                x_cross = x1[None, :] + (ys[:, None] - y1[None, :]) * (x2 - x1)[None, :] / (y2 - y1)[None, :]
+            hits = crosses & (xs[:, None] < x_cross)
+            inside ^= (hits.sum(axis=1) % 2).astype(bool)
+        inside_any |= inside
+
+    return inside_any
+
+
+class SpatialIndex:
+    """
+    Uniform grid index of parcel bounding boxes.
+
+    Each parcel is registered in every grid cell its bounding box touches.
+    A query visits only the cells overlapping the (extent-clipped) query box,
+    so its cost is proportional to those cells plus the parcels found.
+    """
+
+    # Target number of parcels per cell when the cell size is derived
+    PARCELS_PER_CELL = 4
+
+    def __init__(self, cell_size: float):
+        if cell_size <= 0:
+            raise ValueError("cell_size must be positive")
+
+        self.cell_size = cell_size
+        self.bounds: Dict[str, BBox] = {}
+        self.order: Dict[str, int] = {}
+        self.cells: Dict[Tuple[int, int], List[str]] = {}
+        self.extent: Optional[BBox] = None
+        self._next_order = 0
+
+    @classmethod
+    def from_features(cls, features: Iterable[Dict], cell_size: Optional[float] = None) -> 'SpatialIndex':
+        """Build an index from GeoJSON features keyed by properties.plot_id"""
+        entries = []
+        for feature in features:
+            plot_id = feature.get('properties', {}).get('plot_id')
+            bounds = geometry_bounds(feature.get('geometry'))
+            if plot_id and bounds:
+                entries.append((plot_id, bounds))
+
+        if cell_size is None:
+            cell_size = cls._derive_cell_size([b for _, b in entries])
+
+        index = cls(cell_size)
+        for plot_id, bounds in entries:
+            index.insert(plot_id, bounds)
+        return index
+
+    @classmethod
+    def _derive_cell_size(cls, boxes: List[BBox]) -> float:
+        """Pick a cell a few parcels wide, based on the median parcel size"""
+        if not boxes:
+            return 1.0
+
+        sizes = sorted(max(b[2] - b[0], b[3] - b[1]) for b in boxes)
+        median = sizes[len(sizes) // 2]
+        if median <= 0:
+            median = 1e-6
+
+        return median * math.sqrt(cls.PARCELS_PER_CELL)
+
+    def __len__(self) -> int:
+        return len(self.bounds)
+
+    def __contains__(self, plot_id: str) -> bool:
+        return plot_id in self.bounds
+
+    def _cell_range(self, bbox: BBox) -> Tuple[range, range]:
+        size = self.cell_size
+        return (
+            range(math.floor(bbox[0] / size), math.floor(bbox[2] / size) + 1),
+            range(math.floor(bbox[1] / size), math.floor(bbox[3] / size) + 1)
+        )
+
+    def insert(self, plot_id: str, bounds: BBox):
+        """Add or move a parcel"""
+        if plot_id in self.bounds:
+            self.remove(plot_id)
+
+        self.bounds[plot_id] = bounds
+        self.order[plot_id] = self._next_order
+        self._next_order += 1
+
+        xs, ys = self._cell_range(bounds)
+        for cx in xs:
+            for cy in ys:
+                self.cells.setdefault((cx, cy), []).append(plot_id)
+
+        if self.extent is None:
+            self.extent = bounds
+        else:
+            self.extent = (
+                min(self.extent[0], bounds[0]),
+                min(self.extent[1], bounds[1]),
+                max(self.extent[2], bounds[2]),
+                max(self.extent[3], bounds[3])
+            )
+
+    def remove(self, plot_id: str):
+        """Drop a parcel (the extent is left as is)"""
+        bounds = self.bounds.pop(plot_id, None)
+        if bounds is None:
+            return
+        self.order.pop(plot_id, None)
+
+        xs, ys = self._cell_range(bounds)
+        for cx in xs:
+            for cy in ys:
+                cell = self.cells.get((cx, cy))
+                if cell is None:
+                    continue
+                cell.remove(plot_id)
+                if not cell:
+                    del self.cells[(cx, cy)]
+
+    def query(self, bbox: BBox) -> List[str]:
+        """Plot IDs whose bounding boxes intersect bbox, in insertion order"""
+        if self.extent is None or not bboxes_intersect(bbox, self.extent):
+            return []
+
+        # Clip to the data extent so a world-sized box doesn't walk empty cells
+        clipped = (
+            max(bbox[0], self.extent[0]),
+            max(bbox[1], self.extent[1]),
+            min(bbox[2], self.extent[2]),
+            min(bbox[3], self.extent[3])
+        )
+
+        seen = set()
+        hits = []
+        xs, ys = self._cell_range(clipped)
+        for cx in xs:
+            for cy in ys:
+                for plot_id in self.cells.get((cx, cy), ()):
+                    if plot_id in seen:
+                        continue
+                    seen.add(plot_id)
+                    if bboxes_intersect(bbox, self.bounds[plot_id]):
+                        hits.append(plot_id)
+
+        hits.sort(key=self.order.__getitem__)
+        return hits
+
+    def locate(self, x: float, y: float, geometry_for: Callable[[str], Dict]) -> List[str]:
+        """Plot IDs whose geometry contains the point"""
+        return self.locate_points(np.array([[x, y]]), geometry_for)[0]
+
+    def locate_points(self, points: np.ndarray, geometry_for: Callable[[str], Dict]) -> List[List[str]]:
+        """
+        Plot IDs containing each of many points.
+
+        Points are grouped by grid cell, so each candidate parcel's polygon is
+        tested once against all the points in its cell in a single vectorized
+        call rather than once per point.
+        """
+        results: List[List[str]] = [[] for _ in range(len(points))]
+        if len(points) == 0 or self.extent is None:
+            return results
+
+        xs = points[:, 0]
+        ys = points[:, 1]
+        cell_keys = np.floor(points / self.cell_size).astype(np.int64)
+        unique_cells, inverse = np.unique(cell_keys, axis=0, return_inverse=True)
+        inverse = inverse.reshape(-1)
+
+        order = np.argsort(inverse, kind='stable')
+        boundaries = np.searchsorted(inverse[order], np.arange(len(unique_cells) + 1))
+
+        for cell_number, (cx, cy) in enumerate(unique_cells.tolist()):
+            candidates = self.cells.get((cx, cy))
+            if not candidates:
+                continue
+
+            members = order[boundaries[cell_number]:boundaries[cell_number + 1]]
+            cell_xs = xs[members]
+            cell_ys = ys[members]
+
+            for plot_id in sorted(candidates, key=self.order.__getitem__):
+                minx, miny, maxx, maxy = self.bounds[plot_id]
+                in_box = (cell_xs >= minx) & (cell_xs <= maxx) & (cell_ys >= miny) & (cell_ys <= maxy)
+                if not in_box.any():
+                    continue
+
+                boxed = np.flatnonzero(in_box)
+                contained = points_in_polygon(cell_xs[boxed], cell_ys[boxed], geometry_for(plot_id))
+                for member in members[boxed[contained]].tolist():
+                    results[member].append(plot_id)
+
+        return results
@@ -0,0 +1,260 @@
+"""
+Tile Service - Lazily cut, quantized parcel tiles with an LRU cache
+"""
+
+import math
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Set, Tuple
+import numpy as np
+
+from services.spatial_index import SpatialIndex, BBox
+
+TileKey = Tuple[int, int, int]
+Ring = List[Tuple[float, float]]
+
+
+def tile_bounds(z: int, x: int, y: int) -> BBox:
+    """Longitude/latitude bounds of an XYZ (Web Mercator) tile"""
+    n = 2 ** z
+
+    def lat(row: int) -> float:
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * row / n))))
+
+    return x / n * 360.0 - 180.0, lat(y + 1), (x + 1) / n * 360.0 - 180.0, lat(y)
+
+
+def valid_tile(z: int, x: int, y: int, max_zoom: int) -> bool:
+    return 0 <= z <= max_zoom and 0 <= x < 2 ** z and 0 <= y < 2 ** z
+
+
+def _clip_ring(ring: Ring, low: float, high: float) -> Ring:
+    """Sutherland-Hodgman clip of a closed ring against the square [low, high]"""
+    def clip(points: Ring, inside, intersect) -> Ring:
+        if not points:
+            return points
+        output = []
+        previous = points[-1]
+        for current in points:
+            if inside(current):
+                if not inside(previous):
+                    output.append(intersect(previous, current))
+                output.append(current)
+            elif inside(previous):
+                output.append(intersect(previous, current))
+            previous = current
+        return output
+
+    def at_x(edge):
+        def intersect(a, b):
+            t = (edge - a[0]) / (b[0] - a[0])
+            return edge, a[1] + t * (b[1] - a[1])
+        return intersect
+
+    def at_y(edge):
+        def intersect(a, b):
+            t = (edge - a[1]) / (b[1] - a[1])
+            return a[0] + t * (b[0] - a[0]), edge
+        return intersect
+
+    # Drop the closing point while clipping; it is re-added afterwards
+    points = ring[:-1] if len(ring) > 1 and ring[0] == ring[-1] else ring
+    points = clip(points, lambda p: p[0] >= low, at_x(low))
+    points = clip(points, lambda p: p[0] <= high, at_x(high))
+    points = clip(points, lambda p: p[1] >= low, at_y(low))
+    points = clip(points, lambda p: p[1] <= high, at_y(high))
+    return points
+
+
+def _quantize_ring(points: Ring) -> Optional[List[List[int]]]:
+    """Snap to the integer tile grid and drop points that collapse together"""
+    quantized = []
+    for x, y in points:
+        point = [int(round(x)), int(round(y))]
+        if not quantized or quantized[-1] != point:
+            quantized.append(point)
+    if len(quantized) > 1 and quantized[0] == quantized[-1]:
+        quantized.pop()
+
+    # Rings smaller than a tile unit vanish at this zoom
+    if len(quantized) < 3:
+        return None
+
+    quantized.append(quantized[0])
+    return quantized
+
+
+class TileService:
+    """
+    Serves parcels cut into XYZ tiles as clipped, quantized GeoJSON.
+
+    Tile coordinates are integers in [0, extent] relative to the tile's
+    top-left corner (the geojson-vt / MVT convention), so payloads stay
+    small and clients can draw them straight onto a tile canvas.
+    Tiles are built on first request from the spatial index and kept in a
+    bounded LRU cache. Each cached tile remembers which parcels it holds,
+    so a parcel change drops only the tiles that contain it.
+    """
+
+    EXTENT = 4096
+    BUFFER = 64
+    # Below this zoom parcels are sub-pixel; tiles come back empty
+    MIN_ZOOM = 10
+    MAX_ZOOM = 22
+
+    def __init__(self, spatial_index: SpatialIndex,
+                 feature_for: Callable[[str], Dict],
+                 properties_for: Optional[Callable[[str], Dict]] = None,
+                 max_tiles: int = 1024):
+        self.spatial_index = spatial_index
+        self.feature_for = feature_for
+        self.properties_for = properties_for
+        self.max_tiles = max_tiles
+
+        self._lock = threading.Lock()
+        self._tiles: "OrderedDict[TileKey, Tuple[Dict, List[str]]]" = OrderedDict()
+        self._tiles_by_plot: Dict[str, Set[TileKey]] = {}
+        # Bumped on every invalidation so a tile built concurrently is not cached stale
+        self._generation = 0
+
+        self.hits = 0
+        self.misses = 0
+
+    def get_tile(self, z: int, x: int, y: int) -> Dict:
+        """Get a tile, building and caching it on first request"""
+        key = (z, x, y)
+
+        with self._lock:
+            cached = self._tiles.get(key)
+            if cached is not None:
+                self._tiles.move_to_end(key)
+                self.hits += 1
+                return cached[0]
+            self.misses += 1
+            generation = self._generation
+
+        tile, plot_ids = self._build_tile(z, x, y)
+
+        with self._lock:
+            if generation == self._generation:
+                self._store(key, tile, plot_ids)
+
+        return tile
+
+    def _store(self, key: TileKey, tile: Dict, plot_ids: List[str]):
+        self._tiles[key] = (tile, plot_ids)
+        self._tiles.move_to_end(key)
+        for plot_id in plot_ids:
+            self._tiles_by_plot.setdefault(plot_id, set()).add(key)
+
+        while len(self._tiles) > self.max_tiles:
+            old_key, (_, old_plot_ids) = self._tiles.popitem(last=False)
+            self._forget(old_key, old_plot_ids)
+
+    def _forget(self, key: TileKey, tile_plot_ids: Optional[List[str]] = None):
+        for plot_id in tile_plot_ids or ():
+            keys = self._tiles_by_plot.get(plot_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tiles_by_plot[plot_id]
+
+    def invalidate_parcel(self, plot_id: str) -> int:
+        """Drop every cached tile containing a parcel; returns how many"""
+        with self._lock:
+            self._generation += 1
+            keys = self._tiles_by_plot.pop(plot_id, set())
+            for key in keys:
+                entry = self._tiles.pop(key, None)
+                if entry is not None:
+                    self._forget(key, entry[1])
+            return len(keys)
+
+    def clear(self):
+        """Drop all cached tiles"""
+        with self._lock:
+            self._generation += 1
+            self._tiles.clear()
+            self._tiles_by_plot.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "cached_tiles": len(self._tiles),
+                "max_tiles": self.max_tiles,
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+    def _build_tile(self, z: int, x: int, y: int) -> Tuple[Dict, List[str]]:
+        features = []
+        plot_ids = []
+
+        if z >= self.MIN_ZOOM:
+            # Query a slightly larger box so the buffer zone is populated
+            minx, miny, maxx, maxy = tile_bounds(z, x, y)
+            pad_x = (maxx - minx) * self.BUFFER / self.EXTENT
+            pad_y = (maxy - miny) * self.BUFFER / self.EXTENT
+            candidates = self.spatial_index.query((minx - pad_x, miny - pad_y, maxx + pad_x, maxy + pad_y))
+
+            for plot_id in candidates:
+                feature = self.feature_for(plot_id)
+                geometry = self._cut_geometry(feature.get('geometry') or {}, z, x, y)
+                if geometry is None:
+                    continue
+
+                properties = dict(feature.get('properties', {}))
+                if self.properties_for is not None:
+                    properties.update(self.properties_for(plot_id))
+
+                features.append({"type": "Feature", "properties": properties, "geometry": geometry})
+                plot_ids.append(plot_id)
+
+        return {
+            "type": "FeatureCollection",
+            "z": z,
+            "x": x,
+            "y": y,
+            "extent": self.EXTENT,
+            "features": features
+        }, plot_ids
+
+    def _project(self, ring: List, z: int, x: int, y: int) -> Ring:
+        """Longitude/latitude ring -> tile-local coordinates in [0, EXTENT]"""
+        coords = np.asarray(ring, dtype=float)
+        n = 2 ** z
+        lat = np.radians(np.clip(coords[:, 1], -85.05112878, 85.05112878))
+        px = (coords[:, 0] + 180.0) / 360.0 * n
+        py = (1.0 - np.log(np.tan(lat) + 1.0 / np.cos(lat)) / math.pi) / 2.0 * n
+        return list(zip(((px - x) * self.EXTENT).tolist(), ((py - y) * self.EXTENT).tolist()))
+
+    def _cut_geometry(self, geometry: Dict, z: int, x: int, y: int) -> Optional[Dict]:
+        if geometry.get('type') == 'Polygon':
+            polygons = [geometry.get('coordinates', [])]
+        elif geometry.get('type') == 'MultiPolygon':
+            polygons = geometry.get('coordinates', [])
+        else:
+            return None
+
+        low, high = -self.BUFFER, self.EXTENT + self.BUFFER
+        cut = []
+        for rings in polygons:
+            cut_rings = []
+            for index, ring in enumerate(rings):
+                if len(ring) < 3:
+                    continue
+                quantized = _quantize_ring(_clip_ring(self._project(ring, z, x, y), low, high))
+                if quantized is None:
+                    if index == 0:
+                        # Exterior vanished, so its holes go too
+                        break
+                    continue
+                cut_rings.append(quantized)
+            if cut_rings:
+                cut.append(cut_rings)
+
+        if not cut:
+            return None
+        if len(cut) == 1:
+            return {"type": "Polygon", "coordinates": cut[0]}
+        return {"type": "MultiPolygon", "coordinates": cut}
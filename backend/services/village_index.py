@@ -0,0 +1,45 @@
+"""
+Village Index - Case-folded village name to plot ID index
+"""
+
+from typing import Dict, Iterable, List
+
+
+class VillageIndex:
+    """
+    Plot IDs grouped by case-folded village name, in feature order, plus the
+    sorted list of village names. Built once from the GeoJSON features so
+    village listings cost O(villages) and village lookups O(parcels in it).
+    """
+
+    def __init__(self, features: Iterable[Dict] = ()):
+        self.plot_ids_by_key: Dict[str, List[str]] = {}
+        display_names: Dict[str, str] = {}
+
+        for feature in features:
+            properties = feature.get('properties', {})
+            village = properties.get('village')
+            plot_id = properties.get('plot_id')
+            if not village or not plot_id:
+                continue
+
+            key = self.key(village)
+            # The first spelling seen is the one listed
+            display_names.setdefault(key, village)
+            self.plot_ids_by_key.setdefault(key, []).append(plot_id)
+
+        self.names: List[str] = sorted(display_names.values())
+
+    @staticmethod
+    def key(village: str) -> str:
+        return village.casefold()
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, village: str) -> bool:
+        return self.key(village) in self.plot_ids_by_key
+
+    def plot_ids(self, village: str) -> List[str]:
+        """Plot IDs in a village, matched case-insensitively"""
+        return self.plot_ids_by_key.get(self.key(village), [])
@@ -0,0 +1,55 @@
+"""
+Shared fixtures: a private copy of the sample data for every test, and
+the FastAPI app serving it
+"""
+
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+
+SAMPLE_DATA = Path(__file__).resolve().parent.parent.parent / "data"
+
+# Read when the services are imported
+os.environ.setdefault("LRD_PROCESS_WORKERS", "0")
+os.environ["LRD_WATCH_INTERVAL"] = "0"
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch) -> Path:
+    """The sample data copied into a temporary DATA_PATH, with snapshots beside it"""
+    data = tmp_path / "data"
+    for name in ("spatial", "textual"):
+        shutil.copytree(SAMPLE_DATA / name, data / name, ignore=shutil.ignore_patterns("*.journal*", "*.tmp"))
+    monkeypatch.setenv("DATA_PATH", str(data))
+    monkeypatch.setenv("LRD_SNAPSHOT_DIR", str(tmp_path / "snapshots"))
+    monkeypatch.setenv("LRD_STORAGE", "memory")
+    return data
+
+
+def _reset_shared_state():
+    from services import data_service
+    from services.matching_service import MatchingService
+
+    data_service._data_service = None
+    MatchingService._table = None
+    MatchingService._duplicates = None
+
+
+@pytest.fixture
+def api(data_dir):
+    """A FastAPI test client over a freshly loaded copy of the sample data"""
+    from fastapi.testclient import TestClient
+    from main import app
+
+    _reset_shared_state()
+    with TestClient(app) as client:
+        yield client
+    _reset_shared_state()
+
+
+@pytest.fixture
+def editor_headers(api) -> dict:
+    response = api.post("/api/auth/login", json={"username": "editor1", "password": "editor123"})
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
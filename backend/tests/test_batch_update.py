@@ -0,0 +1,91 @@
+"""
+Batch updates: every entry is validated up front, and one invalid entry
+leaves every record and the journal untouched
+"""
+
+import pytest
+
+from services.batch_update import validate_batch
+from services.edit_journal import EditJournal
+
+KNOWN = {"RAM-001", "RAM-002"}
+
+
+def test_validate_batch_normalizes_plot_ids_and_filters_fields():
+    edits, results = validate_batch(
+        [{"plot_id": " ram-001 ", "owner_name": "New", "village": "Elsewhere", "area": None}],
+        KNOWN.__contains__
+    )
+
+    assert edits == [("RAM-001", {"owner_name": "New"})]
+    assert results == [{"plot_id": "RAM-001", "success": True}]
+
+
+def test_validate_batch_reports_each_invalid_entry():
+    edits, results = validate_batch([
+        {"plot_id": "RAM-001", "area": 10},
+        {"plot_id": "RAM-999", "area": 10},
+        {"plot_id": "RAM-002", "village": "Elsewhere"},
+        {"area": 10}
+    ], KNOWN.__contains__)
+
+    assert edits == [("RAM-001", {"area": 10})]
+    assert [result["success"] for result in results] == [True, False, False, False]
+    assert results[1]["error"] == "Parcel not found: RAM-999"
+    assert results[2]["error"] == "No valid updates provided"
+    assert results[3]["error"] == "Each update needs a plot_id"
+
+
+@pytest.mark.parametrize("items", [None, [], {"plot_id": "RAM-001"}])
+def test_validate_batch_rejects_a_malformed_batch(items):
+    with pytest.raises(ValueError):
+        validate_batch(items, KNOWN.__contains__)
+
+
+def test_validate_batch_enforces_the_limit():
+    with pytest.raises(ValueError, match="At most 2"):
+        validate_batch([{"plot_id": "RAM-001", "area": 1}] * 3, KNOWN.__contains__, max_items=2)
+
+
+def records(api, *plot_ids) -> list:
+    return [api.get(f"/api/parcels/{plot_id}").json()["textual_record"] for plot_id in plot_ids]
+
+
+def test_an_invalid_entry_rolls_back_the_whole_batch(api, editor_headers, data_dir):
+    before = records(api, "RAM-001", "RAM-002")
+
+    response = api.put("/api/parcels/batch", headers=editor_headers, json={"updates": [
+        {"plot_id": "RAM-001", "owner_name": "Should Not Stick"},
+        {"plot_id": "RAM-999", "owner_name": "Nobody"},
+        {"plot_id": "RAM-002", "area": 1}
+    ]})
+
+    assert response.status_code == 400
+    body = response.json()
+    assert body["detail"] == "1 of 3 updates are invalid; nothing was applied"
+    assert [result["success"] for result in body["results"]] == [True, False, True]
+    assert records(api, "RAM-001", "RAM-002") == before
+    assert EditJournal(data_dir / "textual" / "land_records.csv").replay() == []
+
+
+def test_a_valid_batch_is_applied_and_journaled_together(api, editor_headers, data_dir):
+    response = api.put("/api/parcels/batch", headers=editor_headers, json={"updates": [
+        {"plot_id": "RAM-001", "owner_name": "Batch Owner"},
+        {"plot_id": "ram-002", "area": 4321}
+    ]})
+
+    assert response.status_code == 200
+    assert response.json()["updated"] == 2
+    first, second = records(api, "RAM-001", "RAM-002")
+    assert first["owner_name"] == "Batch Owner"
+    assert second["area"] == 4321
+    assert EditJournal(data_dir / "textual" / "land_records.csv").replay() == [
+        ("RAM-001", {"owner_name": "Batch Owner"}),
+        ("RAM-002", {"area": 4321})
+    ]
+
+
+def test_batch_updates_need_an_editor(api):
+    response = api.put("/api/parcels/batch", json={"updates": [{"plot_id": "RAM-001", "area": 1}]})
+
+    assert response.status_code == 401
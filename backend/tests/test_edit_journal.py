@@ -0,0 +1,154 @@
+"""
+EditJournal: append and replay, compaction into the CSV, and the
+single-owner lock
+"""
+
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from services.edit_journal import EditJournal, apply_entries
+
+BACKEND = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture
+def csv_path(tmp_path) -> Path:
+    path = tmp_path / "land_records.csv"
+    pd.DataFrame({
+        "plot_id": ["RAM-001", "RAM-002", "RAM-003"],
+        "owner_name": ["Rajesh Kumar", "Suresh Yadav", "Mohan Lal"],
+        "area": [2500, 3200, 1800]
+    }).to_csv(path, index=False)
+    return path
+
+
+def test_replay_returns_edits_in_order(csv_path):
+    journal = EditJournal(csv_path)
+    journal.append("RAM-001", {"owner_name": "First"})
+    journal.append_batch([("RAM-002", {"area": 10}), ("RAM-003", {"area": 20})])
+    journal.append("RAM-001", {"owner_name": "Second"})
+    journal.close()
+
+    assert EditJournal(csv_path).replay() == [
+        ("RAM-001", {"owner_name": "First"}),
+        ("RAM-002", {"area": 10}),
+        ("RAM-003", {"area": 20}),
+        ("RAM-001", {"owner_name": "Second"})
+    ]
+
+
+def test_replay_skips_a_torn_final_line(csv_path):
+    journal = EditJournal(csv_path)
+    journal.append("RAM-001", {"owner_name": "Kept"})
+    journal.close()
+    with open(journal.path, 'a', encoding='utf-8') as f:
+        f.write('{"plot_id": "RAM-002", "upd')
+
+    assert EditJournal(csv_path).replay() == [("RAM-001", {"owner_name": "Kept"})]
+
+
+def test_enqueued_edits_are_on_disk_after_wait_for(csv_path):
+    journal = EditJournal(csv_path)
+    tickets = [journal.enqueue("RAM-001", {"area": area}) for area in (1, 2, 3)]
+    journal.wait_for(tickets[-1])
+
+    assert [updates for _, updates in EditJournal(csv_path).replay()] == [{"area": 1}, {"area": 2}, {"area": 3}]
+    journal.close()
+
+
+def test_compaction_folds_the_journal_into_the_csv(csv_path):
+    compacted = []
+    journal = EditJournal(csv_path, on_compacted=lambda: compacted.append(True))
+    journal.append("RAM-001", {"owner_name": "New Owner"})
+    journal.append_batch([("RAM-002", {"area": 999}), ("UNKNOWN", {"area": 1})])
+    journal.compact()
+
+    frame = pd.read_csv(csv_path)
+    assert frame.loc[0, "owner_name"] == "New Owner"
+    assert frame.loc[1, "area"] == 999
+    assert len(frame) == 3
+    assert compacted == [True]
+    assert not journal.path.exists() and not journal.rotated_path.exists()
+    assert EditJournal(csv_path).replay() == []
+
+    # Appends after a compaction start a new segment
+    journal.append("RAM-003", {"area": 5})
+    journal.close()
+    assert EditJournal(csv_path).replay() == [("RAM-003", {"area": 5})]
+
+
+def test_compaction_starts_in_background_after_enough_edits(csv_path):
+    journal = EditJournal(csv_path, compact_after=3)
+    for area in (1, 2, 3):
+        journal.append("RAM-001", {"area": area})
+    journal.wait_for_compaction()
+    journal.close()
+
+    assert pd.read_csv(csv_path).loc[0, "area"] == 3
+    assert EditJournal(csv_path).replay() == []
+
+
+def test_compaction_leaves_a_replaced_csv_alone(csv_path):
+    journal = EditJournal(csv_path, snapshot_unchanged=lambda: False)
+    journal.append("RAM-001", {"owner_name": "Edited"})
+    journal.compact()
+    journal.close()
+
+    assert pd.read_csv(csv_path).loc[0, "owner_name"] == "Rajesh Kumar"
+    # The edit survives in the rotated segment for the next load
+    assert EditJournal(csv_path).replay() == [("RAM-001", {"owner_name": "Edited"})]
+
+
+def test_held_compaction_waits_for_release(csv_path):
+    journal = EditJournal(csv_path, compact_after=1)
+    journal.hold_compaction()
+    journal.append("RAM-001", {"area": 7})
+    journal.wait_for_compaction()
+    assert journal.path.exists()
+
+    journal.release_compaction()
+    journal.wait_for_compaction()
+    journal.close()
+    assert pd.read_csv(csv_path).loc[0, "area"] == 7
+
+
+def test_apply_entries_updates_known_plots_only():
+    frame = pd.DataFrame({"plot_id": ["A", "B"], "owner_name": ["x", "y"]})
+    applied = apply_entries(frame, [("B", {"owner_name": "z", "plot_id": "C", "other": 1}), ("Q", {"owner_name": "q"})])
+
+    assert applied == 1
+    assert frame["owner_name"].tolist() == ["x", "z"]
+    assert frame["plot_id"].tolist() == ["A", "B"]
+
+
+def _claim_in_subprocess(csv_path: Path) -> str:
+    script = textwrap.dedent(f"""
+        from services.edit_journal import EditJournal, JournalLocked
+        try:
+            EditJournal({str(csv_path)!r}).claim()
+            print("claimed")
+        except JournalLocked:
+            print("locked")
+    """)
+    result = subprocess.run([sys.executable, "-c", script], cwd=BACKEND, capture_output=True, text=True, check=True)
+    return result.stdout.strip()
+
+
+def test_only_one_process_owns_the_journal(csv_path):
+    journal = EditJournal(csv_path)
+    journal.append("RAM-001", {"area": 1})
+    # A second journal on the same file in this process shares ownership
+    other = EditJournal(csv_path)
+    other.claim()
+
+    assert _claim_in_subprocess(csv_path) == "locked"
+
+    journal.close()
+    assert _claim_in_subprocess(csv_path) == "locked"
+    other.close()
+    assert _claim_in_subprocess(csv_path) == "claimed"
@@ -0,0 +1,117 @@
+"""
+Hot reload: a replacement service built from the current source files
+keeps every journaled edit, including edits taken while it was building
+"""
+
+import pytest
+
+from services import data_service as data_service_module
+from services.data_service import DataService, ReloadInProgress, get_data_service, reload_data_service
+
+
+@pytest.fixture
+def admin_headers(api) -> dict:
+    response = api.post("/api/auth/login", json={"username": "admin1", "password": "admin123"})
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def owner(api, plot_id: str) -> str:
+    return api.get(f"/api/parcels/{plot_id}").json()["textual_record"]["owner_name"]
+
+
+def edit(api, headers, plot_id: str, **updates):
+    response = api.put(f"/api/parcels/{plot_id}", json=updates, headers=headers)
+    assert response.status_code == 200
+
+
+def test_reload_keeps_journaled_edits(api, editor_headers, admin_headers):
+    edit(api, editor_headers, "RAM-001", owner_name="Edited Before Reload")
+    version = get_data_service().version
+
+    response = api.post("/api/admin/reload", headers=admin_headers)
+
+    assert response.status_code == 200
+    assert response.json()["version"] > version
+    assert owner(api, "RAM-001") == "Edited Before Reload"
+
+
+def test_reload_merges_feed_changes_with_journaled_edits(api, editor_headers, admin_headers, data_dir):
+    edit(api, editor_headers, "RAM-001", owner_name="Journaled Owner")
+    csv_path = data_dir / "textual" / "land_records.csv"
+    csv_path.write_text(csv_path.read_text().replace("Suresh Prasad Yadav", "Feed Owner"))
+
+    assert api.post("/api/admin/reload", headers=admin_headers).status_code == 200
+
+    assert owner(api, "RAM-001") == "Journaled Owner"
+    assert owner(api, "RAM-002") == "Feed Owner"
+
+
+def test_edits_taken_during_the_build_are_carried_over(api, monkeypatch):
+    # Build the replacement from the files, so the edit lands after its journal replay
+    monkeypatch.setenv("LRD_SNAPSHOT_DIR", "")
+    current = get_data_service()
+    load_textual = DataService._load_textual_data
+
+    def load_then_edit(self, previous=None):
+        replayed = load_textual(self, previous)
+        current.edit_records([("RAM-003", {"owner_name": "Edited Mid Reload"})])
+        return replayed
+
+    monkeypatch.setattr(DataService, "_load_textual_data", load_then_edit)
+    fresh = reload_data_service()
+
+    assert fresh is not current
+    assert fresh.get_parcel_by_id("RAM-003")["textual_record"]["owner_name"] == "Edited Mid Reload"
+
+
+def test_edits_reaching_the_replaced_service_are_forwarded(api):
+    current = get_data_service()
+    fresh = reload_data_service()
+
+    current.edit_records([("RAM-004", {"owner_name": "Forwarded Owner"})])
+
+    assert fresh.get_parcel_by_id("RAM-004")["textual_record"]["owner_name"] == "Forwarded Owner"
+    assert owner(api, "RAM-004") == "Forwarded Owner"
+
+
+def test_edits_survive_a_restart_after_reload(api, editor_headers, admin_headers):
+    edit(api, editor_headers, "RAM-005", owner_name="Durable Owner")
+    api.post("/api/admin/reload", headers=admin_headers)
+    get_data_service().close()
+
+    restarted = DataService()
+    assert restarted.load_all_data()
+    try:
+        assert restarted.get_parcel_by_id("RAM-005")["textual_record"]["owner_name"] == "Durable Owner"
+    finally:
+        restarted.close()
+
+
+def test_failed_reload_keeps_serving_the_previous_data(api, editor_headers, admin_headers, data_dir):
+    edit(api, editor_headers, "RAM-001", owner_name="Still Served")
+    current = get_data_service()
+    (data_dir / "spatial" / "villages.geojson").write_text("{not json")
+
+    response = api.post("/api/admin/reload", headers=admin_headers)
+
+    assert response.status_code == 500
+    assert get_data_service() is current
+    assert owner(api, "RAM-001") == "Still Served"
+    # Edits go on being journaled as before
+    edit(api, editor_headers, "RAM-001", owner_name="Edited After Failure")
+    assert owner(api, "RAM-001") == "Edited After Failure"
+
+
+def test_overlapping_reloads_are_refused(api, admin_headers):
+    lock = data_service_module._reload_lock
+    assert lock.acquire(blocking=False)
+    try:
+        with pytest.raises(ReloadInProgress):
+            reload_data_service()
+        assert api.post("/api/admin/reload", headers=admin_headers).status_code == 409
+    finally:
+        lock.release()
+
+
+def test_reloads_need_an_admin(api, editor_headers):
+    assert api.post("/api/admin/reload", headers=editor_headers).status_code == 403
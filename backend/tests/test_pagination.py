@@ -0,0 +1,118 @@
+"""
+Keyset pagination: stable cursors over the plot order, and the
+/api/parcels cursor parameter
+"""
+
+import base64
+
+import pytest
+
+from services.pagination import InvalidCursor, PlotOrder, decode_cursor, encode_cursor
+
+PLOT_IDS = [f"RAM-{number:03d}" for number in range(1, 12)]
+
+
+def walk(order: PlotOrder, limit: int) -> list:
+    pages = []
+    cursor = None
+    while True:
+        page_ids, cursor = order.page_after(cursor, limit)
+        pages.append(page_ids)
+        if cursor is None:
+            return pages
+
+
+def test_cursors_visit_every_plot_once_in_order():
+    pages = walk(PlotOrder(PLOT_IDS, version=3), 4)
+
+    assert [len(page) for page in pages] == [4, 4, 3]
+    assert [plot_id for page in pages for plot_id in page] == PLOT_IDS
+
+
+def test_an_exact_final_page_has_no_next_cursor():
+    assert walk(PlotOrder(PLOT_IDS[:8]), 4)[-1] == PLOT_IDS[4:8]
+
+
+def test_page_numbers_hand_over_to_cursors():
+    order = PlotOrder(PLOT_IDS)
+    _, cursor = order.page(0, 5)
+    second, _ = order.page_after(cursor, 5)
+
+    assert second == order.page(5, 5)[0]
+
+
+def test_cursor_from_another_order_resumes_after_its_plot():
+    _, cursor = PlotOrder(PLOT_IDS, version=1).page(0, 3)
+    # A reload dropped two plots before the cursor's
+    reloaded = PlotOrder(PLOT_IDS[2:], version=2)
+
+    page_ids, _ = reloaded.page_after(cursor, 2)
+    assert page_ids == ["RAM-004", "RAM-005"]
+
+
+def test_cursor_for_a_removed_plot_is_rejected():
+    _, cursor = PlotOrder(PLOT_IDS, version=1).page(0, 3)
+    reloaded = PlotOrder([plot_id for plot_id in PLOT_IDS if plot_id != "RAM-003"], version=2)
+
+    with pytest.raises(InvalidCursor):
+        reloaded.page_after(cursor, 2)
+
+
+@pytest.mark.parametrize("cursor", [
+    "not a cursor!",
+    base64.urlsafe_b64encode(b"[1, 2]").decode(),
+    base64.urlsafe_b64encode(b'["1", 2, "RAM-001"]').decode(),
+    base64.urlsafe_b64encode(b"\xff\xfe").decode()
+])
+def test_malformed_cursors_are_rejected(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor)
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor(7, 12, "LAK-004")) == (7, 12, "LAK-004")
+
+
+def walk_api(api, per_page: int, **params) -> list:
+    plot_ids = []
+    response = api.get("/api/parcels", params={"per_page": per_page, **params})
+    while True:
+        assert response.status_code == 200
+        body = response.json()
+        plot_ids.extend(parcel["plot_id"] for parcel in body["parcels"])
+        if body["next_cursor"] is None:
+            return plot_ids
+        response = api.get("/api/parcels", params={"per_page": per_page, "cursor": body["next_cursor"]})
+
+
+def test_api_pages_through_every_parcel(api):
+    total = api.get("/api/parcels").json()["total"]
+    plot_ids = walk_api(api, 7)
+
+    assert len(plot_ids) == total
+    assert len(set(plot_ids)) == total
+
+
+def test_api_pages_do_not_shift_across_edits(api, editor_headers):
+    first = api.get("/api/parcels", params={"per_page": 10}).json()
+    edited = first["parcels"][3]["plot_id"]
+    response = api.put(f"/api/parcels/{edited}", json={"owner_name": "Moved Owner"}, headers=editor_headers)
+    assert response.status_code == 200
+
+    second = api.get("/api/parcels", params={"per_page": 10, "cursor": first["next_cursor"]}).json()
+    numbered = api.get("/api/parcels", params={"page": 2, "per_page": 10}).json()
+    assert [parcel["plot_id"] for parcel in second["parcels"]] == [parcel["plot_id"] for parcel in numbered["parcels"]]
+    assert "page" not in second
+
+
+def test_api_rejects_a_bad_cursor(api):
+    response = api.get("/api/parcels", params={"cursor": "garbage"})
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Malformed cursor"
+
+
+def test_api_rejects_a_cursor_for_an_unknown_parcel(api):
+    response = api.get("/api/parcels", params={"cursor": encode_cursor(1, 0, "NOWHERE-999")})
+
+    assert response.status_code == 400
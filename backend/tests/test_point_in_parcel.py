@@ -0,0 +1,104 @@
+"""
+Point-in-parcel: even-odd containment with holes and multipolygons, and
+lookups through the spatial index
+"""
+
+import numpy as np
+import pytest
+
+from services.spatial_index import SpatialIndex, parse_points, points_in_polygon
+
+
+def square(x: float, y: float, size: float) -> list:
+    return [[x, y], [x + size, y], [x + size, y + size], [x, y + size], [x, y]]
+
+
+def contains(geometry: dict, *points) -> list:
+    array = np.asarray(points, dtype=float)
+    return points_in_polygon(array[:, 0], array[:, 1], geometry).tolist()
+
+
+def feature(plot_id: str, geometry: dict) -> dict:
+    return {"type": "Feature", "properties": {"plot_id": plot_id}, "geometry": geometry}
+
+
+POLYGON_WITH_HOLE = {"type": "Polygon", "coordinates": [square(0, 0, 10), square(4, 4, 2)]}
+
+MULTIPOLYGON = {"type": "MultiPolygon", "coordinates": [
+    [square(0, 0, 2)],
+    [square(5, 5, 4), square(6, 6, 2)]
+]}
+
+
+def test_polygon_contains_points_inside_its_outer_ring():
+    assert contains(POLYGON_WITH_HOLE, (1, 1), (9, 9), (2, 8)) == [True, True, True]
+
+
+def test_polygon_excludes_points_outside():
+    assert contains(POLYGON_WITH_HOLE, (-1, 5), (11, 5), (5, 12)) == [False, False, False]
+
+
+def test_polygon_excludes_points_in_its_hole():
+    assert contains(POLYGON_WITH_HOLE, (5, 5), (4.5, 5.5)) == [False, False]
+
+
+def test_multipolygon_contains_points_in_any_part():
+    assert contains(MULTIPOLYGON, (1, 1), (5.5, 5.5), (8.5, 8.5)) == [True, True, True]
+
+
+def test_multipolygon_excludes_gaps_and_holes():
+    assert contains(MULTIPOLYGON, (3.5, 3.5), (7, 7), (20, 20)) == [False, False, False]
+
+
+def test_other_geometry_types_contain_nothing():
+    assert contains({"type": "Point", "coordinates": [1, 1]}, (1, 1)) == [False]
+
+
+def test_point_on_a_shared_edge_falls_in_one_parcel():
+    geometries = {
+        "LEFT": {"type": "Polygon", "coordinates": [square(0, 0, 1)]},
+        "RIGHT": {"type": "Polygon", "coordinates": [square(1, 0, 1)]}
+    }
+    index = SpatialIndex.from_features(feature(plot_id, geometry) for plot_id, geometry in geometries.items())
+
+    assert len(index.locate(1.0, 0.5, geometries.__getitem__)) == 1
+
+
+@pytest.fixture
+def index_and_geometries():
+    geometries = {
+        "HOLED": POLYGON_WITH_HOLE,
+        "MULTI": {"type": "MultiPolygon", "coordinates": [[square(20, 0, 2)], [square(30, 0, 2)]]},
+        "INNER": {"type": "Polygon", "coordinates": [square(4, 4, 2)]}
+    }
+    index = SpatialIndex.from_features(feature(plot_id, geometry) for plot_id, geometry in geometries.items())
+    return index, geometries
+
+
+def test_locate_finds_the_parcel_filling_a_hole(index_and_geometries):
+    index, geometries = index_and_geometries
+
+    assert index.locate(5, 5, geometries.__getitem__) == ["INNER"]
+    assert index.locate(1, 1, geometries.__getitem__) == ["HOLED"]
+    assert index.locate(31, 1, geometries.__getitem__) == ["MULTI"]
+    assert index.locate(25, 1, geometries.__getitem__) == []
+
+
+def test_locate_points_matches_single_lookups(index_and_geometries):
+    index, geometries = index_and_geometries
+    points = np.array([[5, 5], [1, 1], [21, 1], [31, 1], [25, 1], [100, 100]], dtype=float)
+
+    assert index.locate_points(points, geometries.__getitem__) == [
+        index.locate(x, y, geometries.__getitem__) for x, y in points.tolist()
+    ]
+
+
+@pytest.mark.parametrize("points", [[], "1,2", [[1, 2, 3]], [[1, "x"]], [[float("nan"), 0]]])
+def test_parse_points_rejects_malformed_input(points):
+    with pytest.raises(ValueError):
+        parse_points(points, 10)
+
+
+def test_parse_points_enforces_the_limit():
+    with pytest.raises(ValueError):
+        parse_points([[0, 0]] * 3, 2)
@@ -0,0 +1,97 @@
+"""
+Projection: fields= / exclude= selection of parcel response fields
+"""
+
+import pytest
+
+from services.projection import Projection, project
+
+RESULT = {
+    "plot_id": "RAM-001",
+    "geometry": {"type": "Polygon", "coordinates": []},
+    "properties": {"plot_id": "RAM-001", "village": "Rampur"},
+    "textual_record": {"owner_name": "Rajesh Kumar Singh", "area": 2500, "village": "Rampur"},
+    "spatial_attributes": {"computed_area": 2480.5}
+}
+
+
+def test_no_parameters_means_no_projection():
+    assert Projection.parse() is None
+    assert project(RESULT, None) is RESULT
+
+
+def test_fields_keeps_listed_fields_and_the_plot_id():
+    projected = Projection.parse(fields="spatial_attributes").apply(RESULT)
+
+    assert projected == {"plot_id": "RAM-001", "spatial_attributes": {"computed_area": 2480.5}}
+
+
+def test_fields_selects_nested_keys():
+    projected = Projection.parse(fields="textual_record.owner_name,textual_record.area").apply(RESULT)
+
+    assert projected == {"plot_id": "RAM-001", "textual_record": {"owner_name": "Rajesh Kumar Singh", "area": 2500}}
+
+
+def test_whole_field_wins_over_nested_keys():
+    projection = Projection.parse(fields="textual_record.owner_name,textual_record")
+
+    assert projection.apply(RESULT)["textual_record"] == RESULT["textual_record"]
+
+
+def test_exclude_drops_fields_and_nested_keys():
+    projected = Projection.parse(exclude="geometry,properties,textual_record.village").apply(RESULT)
+
+    assert set(projected) == {"plot_id", "textual_record", "spatial_attributes"}
+    assert projected["textual_record"] == {"owner_name": "Rajesh Kumar Singh", "area": 2500}
+
+
+def test_fields_and_exclude_combine():
+    projected = Projection.parse(fields="textual_record", exclude="textual_record.area").apply(RESULT)
+
+    assert projected == {"plot_id": "RAM-001", "textual_record": {"owner_name": "Rajesh Kumar Singh", "village": "Rampur"}}
+
+
+def test_plot_id_cannot_be_excluded():
+    assert Projection.parse(exclude="plot_id").apply(RESULT)["plot_id"] == "RAM-001"
+
+
+def test_blank_items_are_ignored():
+    assert Projection.parse(fields=" , geometry ,").apply(RESULT) == {"plot_id": "RAM-001", "geometry": RESULT["geometry"]}
+
+
+@pytest.mark.parametrize("params", [{"fields": "owner_name"}, {"exclude": "geometry,nothing.here"}])
+def test_unknown_fields_are_rejected(params):
+    with pytest.raises(ValueError, match="Unknown field"):
+        Projection.parse(**params)
+
+
+def test_api_projects_a_single_parcel(api):
+    response = api.get("/api/parcels/RAM-001", params={"fields": "textual_record.owner_name"})
+
+    assert response.status_code == 200
+    assert response.json() == {"plot_id": "RAM-001", "textual_record": {"owner_name": "Rajesh Kumar Singh"}}
+
+
+def test_api_projects_every_listed_parcel(api):
+    response = api.get("/api/parcels", params={"per_page": 5, "exclude": "geometry,properties"})
+    parcels = response.json()["parcels"]
+
+    assert response.status_code == 200
+    assert len(parcels) == 5
+    assert all("geometry" not in parcel and "properties" not in parcel for parcel in parcels)
+    assert all(parcel["textual_record"] for parcel in parcels)
+
+
+def test_api_projects_search_results(api):
+    response = api.get("/api/search/plot", params={"q": "RAM-00", "fields": "plot_id"})
+
+    assert response.status_code == 200
+    assert response.json()["results"]
+    assert all(set(result) == {"plot_id"} for result in response.json()["results"])
+
+
+def test_api_rejects_unknown_fields(api):
+    response = api.get("/api/parcels/RAM-001", params={"fields": "owner_name"})
+
+    assert response.status_code == 400
+    assert "Unknown field 'owner_name'" in response.json()["detail"]
@@ -0,0 +1,160 @@
+"""
+Snapshots: digest-checked reads, refusing files other users could write,
+and falling back to a full load whenever a snapshot cannot be used
+"""
+
+import os
+import stat
+
+import pytest
+
+from services import snapshot
+from services.data_service import DataService
+
+DIGEST = "ab" * 32
+STATE = {"records": {"RAM-001": {"owner_name": "Rajesh Kumar Singh"}}, "version": 3}
+
+
+def mode(path) -> int:
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+def corrupt(path):
+    """Flip the last byte of a snapshot body"""
+    with open(path, 'r+b') as f:
+        f.seek(-1, os.SEEK_END)
+        last = f.read(1)
+        f.seek(-1, os.SEEK_END)
+        f.write(bytes([last[0] ^ 0xFF]))
+
+
+def test_snapshot_round_trip(tmp_path):
+    path = snapshot.write_snapshot(tmp_path / "snapshots", DIGEST, STATE)
+
+    assert snapshot.read_snapshot(tmp_path / "snapshots", DIGEST) == STATE
+    assert mode(path) == 0o600
+    assert mode(path.parent) == 0o700
+
+
+def test_writing_removes_snapshots_of_older_sources(tmp_path):
+    old = snapshot.write_snapshot(tmp_path, "cd" * 32, STATE)
+    snapshot.write_snapshot(tmp_path, DIGEST, STATE)
+
+    assert not old.exists()
+
+
+def test_snapshot_for_other_sources_is_ignored(tmp_path):
+    snapshot.write_snapshot(tmp_path, DIGEST, STATE)
+    # Same file name, different digest in the header
+    other = DIGEST[:16] + "0" * 48
+
+    assert snapshot.read_snapshot(tmp_path, other) is None
+
+
+def test_damaged_snapshot_is_ignored(tmp_path):
+    path = snapshot.write_snapshot(tmp_path, DIGEST, STATE)
+    corrupt(path)
+
+    assert snapshot.read_snapshot(tmp_path, DIGEST) is None
+
+
+def test_truncated_snapshot_is_ignored(tmp_path):
+    path = snapshot.write_snapshot(tmp_path, DIGEST, STATE)
+    with open(path, 'r+b') as f:
+        f.truncate(10)
+
+    assert snapshot.read_snapshot(tmp_path, DIGEST) is None
+
+
+@pytest.mark.parametrize("target", ["file", "directory"])
+def test_snapshot_others_could_write_is_refused(tmp_path, target):
+    path = snapshot.write_snapshot(tmp_path / "snapshots", DIGEST, STATE)
+    writable = path if target == "file" else path.parent
+    os.chmod(writable, mode(writable) | stat.S_IWGRP)
+
+    with pytest.raises(PermissionError):
+        snapshot.open_private(path.parent, path.name)
+    assert snapshot.read_snapshot(path.parent, DIGEST) is None
+
+
+def test_private_directory_takes_away_write_access(tmp_path):
+    directory = tmp_path / "shared"
+    directory.mkdir()
+    os.chmod(directory, 0o777)
+
+    snapshot.private_directory(directory)
+    assert mode(directory) == 0o755
+
+
+def test_source_hash_follows_content_and_layout(tmp_path):
+    source = tmp_path / "land_records.csv"
+    source.write_text("plot_id\nRAM-001\n")
+    first = snapshot.source_hash([source])
+
+    assert snapshot.source_hash([source]) == first
+    assert snapshot.source_hash([source], "mmap") != first
+    source.write_text("plot_id\nRAM-002\n")
+    assert snapshot.source_hash([source]) != first
+    assert snapshot.source_hash([tmp_path / "missing.csv"]) != first
+
+
+@pytest.fixture
+def load(data_dir):
+    """Load a fresh DataService over the test data, closing each afterwards"""
+    services = []
+
+    def load() -> DataService:
+        service = DataService()
+        assert service.load_all_data()
+        services.append(service)
+        return service
+
+    yield load
+    for service in services:
+        service.close()
+
+
+def snapshot_file(service: DataService):
+    [path] = service.snapshot_dir.glob("dataset-*.snap")
+    return path
+
+
+def test_second_load_is_served_from_the_snapshot(load):
+    first = load()
+    second = load()
+
+    assert "snapshot_write" in first.load_timings
+    assert "snapshot" in second.load_timings and "spatial" not in second.load_timings
+    assert second.get_parcel_by_id("RAM-001") == first.get_parcel_by_id("RAM-001")
+    assert second.get_statistics() == first.get_statistics()
+
+
+def test_damaged_snapshot_falls_back_to_a_rebuild(load):
+    first = load()
+    path = snapshot_file(first)
+    corrupt(path)
+
+    rebuilt = load()
+    assert "spatial" in rebuilt.load_timings
+    assert rebuilt.get_parcel_by_id("RAM-001") == first.get_parcel_by_id("RAM-001")
+    # The rebuild writes a good snapshot for the next start
+    assert "spatial" not in load().load_timings
+
+
+def test_snapshot_others_could_write_falls_back_to_a_rebuild(load):
+    path = snapshot_file(load())
+    os.chmod(path, 0o666)
+
+    rebuilt = load()
+    assert "spatial" in rebuilt.load_timings
+    assert mode(snapshot_file(rebuilt)) == 0o600
+
+
+def test_changed_sources_are_not_served_from_an_old_snapshot(load, data_dir):
+    load()
+    csv_path = data_dir / "textual" / "land_records.csv"
+    csv_path.write_text(csv_path.read_text().replace("Rajesh Kumar Singh", "Changed Owner"))
+
+    reloaded = load()
+    assert "spatial" in reloaded.load_timings
+    assert reloaded.get_parcel_by_id("RAM-001")["textual_record"]["owner_name"] == "Changed Owner"
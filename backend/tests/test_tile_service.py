@@ -0,0 +1,153 @@
+"""
+TileService: clipping and quantizing parcels into tiles, and dropping
+cached tiles when a parcel changes
+"""
+
+import pytest
+
+from services.spatial_index import SpatialIndex
+from services.tile_service import TileService, _clip_ring, tile_bounds, valid_tile
+
+Z, X, Y = 16, 48298, 28974
+MINX, MINY, MAXX, MAXY = tile_bounds(Z, X, Y)
+WIDTH, HEIGHT = MAXX - MINX, MAXY - MINY
+
+
+def box(x0: float, y0: float, x1: float, y1: float) -> list:
+    """A ring from fractions of the tile: (0, 0) is its south-west corner"""
+    west, east = MINX + x0 * WIDTH, MINX + x1 * WIDTH
+    south, north = MINY + y0 * HEIGHT, MINY + y1 * HEIGHT
+    return [[west, south], [east, south], [east, north], [west, north], [west, south]]
+
+
+def parcel(plot_id: str, *rings) -> dict:
+    return {
+        "type": "Feature",
+        "properties": {"plot_id": plot_id},
+        "geometry": {"type": "Polygon", "coordinates": list(rings)}
+    }
+
+
+@pytest.fixture
+def parcels() -> dict:
+    return {
+        "INSIDE": parcel("INSIDE", box(0.2, 0.2, 0.4, 0.4)),
+        "STRADDLING": parcel("STRADDLING", box(0.8, 0.5, 1.5, 0.7)),
+        "HOLED": parcel("HOLED", box(0.5, 0.05, 0.75, 0.3), box(0.55, 0.1, 0.7, 0.25)),
+        "SPECK": parcel("SPECK", box(0.1, 0.9, 0.1000001, 0.9000001)),
+        "FAR": parcel("FAR", box(5, 5, 6, 6))
+    }
+
+
+@pytest.fixture
+def statuses() -> dict:
+    return {}
+
+
+@pytest.fixture
+def tiles(parcels, statuses) -> TileService:
+    return TileService(
+        SpatialIndex.from_features(parcels.values()),
+        parcels.__getitem__,
+        lambda plot_id: {"status": statuses.get(plot_id, "match")},
+        max_tiles=2
+    )
+
+
+def features_by_id(tile: dict) -> dict:
+    return {feature["properties"]["plot_id"]: feature for feature in tile["features"]}
+
+
+def points(feature: dict) -> list:
+    return [point for ring in feature["geometry"]["coordinates"] for point in ring]
+
+
+def test_tile_holds_only_parcels_it_touches(tiles):
+    assert sorted(features_by_id(tiles.get_tile(Z, X, Y))) == ["HOLED", "INSIDE", "STRADDLING"]
+
+
+def test_coordinates_are_integers_in_tile_space(tiles):
+    inside = features_by_id(tiles.get_tile(Z, X, Y))["INSIDE"]
+    ring = inside["geometry"]["coordinates"][0]
+
+    assert all(isinstance(value, int) for point in ring for value in point)
+    assert ring[0] == ring[-1]
+    xs = [x for x, _ in ring]
+    ys = [y for _, y in ring]
+    # 20% to 40% of the tile, with y counted down from the top
+    assert min(xs) == pytest.approx(0.2 * TileService.EXTENT, abs=2)
+    assert max(xs) == pytest.approx(0.4 * TileService.EXTENT, abs=2)
+    assert min(ys) == pytest.approx(0.6 * TileService.EXTENT, abs=40)
+    assert max(ys) == pytest.approx(0.8 * TileService.EXTENT, abs=40)
+
+
+def test_parcels_are_clipped_to_the_tile_and_its_buffer(tiles):
+    straddling = features_by_id(tiles.get_tile(Z, X, Y))["STRADDLING"]
+    xs = [x for x, _ in points(straddling)]
+
+    assert max(xs) == TileService.EXTENT + TileService.BUFFER
+    assert min(xs) == pytest.approx(0.8 * TileService.EXTENT, abs=2)
+
+
+def test_holes_survive_clipping(tiles):
+    holed = features_by_id(tiles.get_tile(Z, X, Y))["HOLED"]
+
+    assert len(holed["geometry"]["coordinates"]) == 2
+
+
+def test_clip_ring_keeps_points_within_bounds():
+    ring = [(-50.0, 10.0), (150.0, 10.0), (150.0, 90.0), (-50.0, 90.0), (-50.0, 10.0)]
+    clipped = _clip_ring(ring, 0.0, 100.0)
+
+    assert clipped
+    assert all(0.0 <= x <= 100.0 and 0.0 <= y <= 100.0 for x, y in clipped)
+    assert {x for x, _ in clipped} == {0.0, 100.0}
+
+
+def test_low_zooms_are_empty(tiles):
+    z = TileService.MIN_ZOOM - 1
+    shift = 16 - z
+    assert tiles.get_tile(z, X >> shift, Y >> shift)["features"] == []
+
+
+def test_valid_tile():
+    assert valid_tile(0, 0, 0, 22)
+    assert not valid_tile(2, 4, 0, 22)
+    assert not valid_tile(23, 0, 0, 22)
+    assert not valid_tile(3, -1, 0, 22)
+
+
+def test_repeat_requests_are_served_from_the_cache(tiles):
+    first = tiles.get_tile(Z, X, Y)
+
+    assert tiles.get_tile(Z, X, Y) is first
+    assert tiles.stats()["hits"] == 1
+    assert tiles.stats()["misses"] == 1
+
+
+def test_invalidating_a_parcel_drops_its_tiles(tiles, statuses):
+    tiles.get_tile(Z, X, Y)
+    statuses["INSIDE"] = "mismatch"
+
+    assert tiles.invalidate_parcel("INSIDE") == 1
+    rebuilt = tiles.get_tile(Z, X, Y)
+    assert features_by_id(rebuilt)["INSIDE"]["properties"]["status"] == "mismatch"
+    assert tiles.stats()["misses"] == 2
+
+
+def test_invalidating_another_parcel_keeps_the_tile(tiles):
+    first = tiles.get_tile(Z, X, Y)
+
+    assert tiles.invalidate_parcel("FAR") == 0
+    assert tiles.get_tile(Z, X, Y) is first
+
+
+def test_least_recently_used_tiles_are_evicted(tiles):
+    tiles.get_tile(Z, X, Y)
+    tiles.get_tile(Z, X + 1, Y)
+    tiles.get_tile(Z, X, Y)
+    tiles.get_tile(Z, X + 2, Y)
+
+    assert tiles.stats()["cached_tiles"] == 2
+    # The evicted tile no longer counts as holding the straddling parcel
+    assert tiles.invalidate_parcel("STRADDLING") == 1
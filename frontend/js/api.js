@@ -97,6 +97,23 @@ const API = {
         });
     },
 
+    /**
+     * GET a file download (non-JSON body) as a Blob
+     */
+    async download(endpoint) {
+        const headers = {};
+        const token = this.getToken();
+        if (token) {
+            headers['Authorization'] = `Bearer ${token}`;
+        }
+
+        const response = await fetch(`${this.baseURL}${endpoint}`, { headers });
+        if (!response.ok) {
+            throw new Error(`Download failed (${response.status})`);
+        }
+        return response.blob();
+    },
+
     // ========================================
     // Authentication
     // ========================================
@@ -121,12 +138,19 @@ const API = {
     // Search
     // ========================================
 
-    async searchByPlotId(query, limit = 20) {
-        return this.get(`/search/plot?q=${encodeURIComponent(query)}&limit=${limit}`);
+    /**
+     * Append a fields= projection so the server returns only those fields
+     */
+    withFields(url, fields) {
+        return fields ? `${url}&fields=${encodeURIComponent(fields)}` : url;
     },
 
-    async searchByOwnerName(query, limit = 20) {
-        return this.get(`/search/owner?q=${encodeURIComponent(query)}&limit=${limit}`);
+    async searchByPlotId(query, limit = 20, fields = null) {
+        return this.get(this.withFields(`/search/plot?q=${encodeURIComponent(query)}&limit=${limit}`, fields));
+    },
+
+    async searchByOwnerName(query, limit = 20, fields = null) {
+        return this.get(this.withFields(`/search/owner?q=${encodeURIComponent(query)}&limit=${limit}`, fields));
     },
 
     async getParcelByPlotId(plotId) {
@@ -145,11 +169,14 @@ const API = {
     // Parcels
     // ========================================
 
-    async getAllParcels(page = 1, perPage = 50) {
-        return this.get(`/parcels?page=${page}&per_page=${perPage}`);
+    async getAllParcels(page = 1, perPage = 50, fields = null) {
+        return this.get(this.withFields(`/parcels?page=${page}&per_page=${perPage}`, fields));
     },
 
-    async getGeoJSON() {
+    async getGeoJSON(bbox = null) {
+        if (bbox) {
+            return this.get(`/parcels/geojson?bbox=${bbox.join(',')}`);
+        }
         return this.get('/parcels/geojson');
     },
 
@@ -157,14 +184,35 @@ const API = {
         return this.get(`/parcels/geojson/${encodeURIComponent(village)}`);
     },
 
+    async getTile(z, x, y) {
+        return this.get(`/tiles/${z}/${x}/${y}`);
+    },
+
+    async getParcelAt(lon, lat) {
+        return this.get(`/parcels/at?lon=${lon}&lat=${lat}`);
+    },
+
+    async locatePoints(points) {
+        return this.post('/parcels/at', { points });
+    },
+
     async getParcel(plotId) {
         return this.get(`/parcels/${encodeURIComponent(plotId)}`);
     },
 
+    async getParcels(plotIds, fields = null) {
+        const url = fields ? `/parcels/batch?fields=${encodeURIComponent(fields)}` : '/parcels/batch';
+        return this.post(url, { plot_ids: plotIds });
+    },
+
     async updateParcel(plotId, updates) {
         return this.put(`/parcels/${encodeURIComponent(plotId)}`, updates);
     },
 
+    async updateParcels(updates) {
+        return this.put('/parcels/batch', { updates });
+    },
+
     // ========================================
     // Reconciliation
     // ========================================
@@ -197,8 +245,8 @@ const API = {
         return this.get(`/reconciliation/check/${encodeURIComponent(plotId)}`);
     },
 
-    async exportReport() {
-        return this.get('/reconciliation/report/export');
+    async exportReport(format = 'csv') {
+        return this.download(`/reconciliation/report/export?format=${format}`);
     },
 
     // ========================================
@@ -76,7 +76,7 @@ const App = {
             const container = document.getElementById('villageList');
 
             // Get parcel counts per village
-            const parcelsResponse = await API.getAllParcels(1, 500);
+            const parcelsResponse = await API.getAllParcels(1, 500, 'properties.village');
             const villageCounts = {};
             parcelsResponse.parcels.forEach(p => {
                 const village = p.properties?.village;
@@ -5,9 +5,16 @@
 const MapManager = {
     map: null,
     parcelsLayer: null,
+    overviewLayer: null,
+    // Below this zoom parcels are drawn from server tiles instead of interactive features
+    featureZoom: 15,
     selectedLayer: null,
     comparisonData: {},
     onParcelSelect: null,
+    extent: null,
+    selectedPlotId: null,
+    statusFilter: 'all',
+    viewTimer: null,
 
     // Style configuration
     styles: {
@@ -70,9 +77,22 @@ const MapManager = {
         // Initialize parcels layer group
         this.parcelsLayer = L.layerGroup().addTo(this.map);
 
+        // Tile-backed overview for zoom levels with too many parcels to render as features
+        this.overviewLayer = this.createOverviewLayer().addTo(this.map);
+
         // Bind control events
         this.bindEvents();
 
+        // Only the parcels in view are fetched, so reload them as the view moves
+        this.map.on('moveend', () => this.scheduleViewLoad());
+
+        // In the overview, find the clicked parcel on the server
+        this.map.on('click', (e) => {
+            if (this.map.getZoom() < this.featureZoom) {
+                this.selectAt(e.latlng);
+            }
+        });
+
         // Load data
         await this.loadData();
     },
@@ -91,13 +111,10 @@ const MapManager = {
     },
 
     /**
-     * Load parcel data and comparison data
+     * Load comparison data and the parcels in view
      */
     async loadData() {
         try {
-            // Load GeoJSON
-            const geojson = await API.getGeoJSON();
-            
             // Load comparison data
             const comparisons = await API.getComparisons();
             
@@ -107,18 +124,144 @@ const MapManager = {
                 this.comparisonData[c.plot_id] = c;
             });
 
-            // Render parcels
-            this.renderParcels(geojson);
-            
+            // Dataset extent lets us zoom to all parcels without downloading them
+            const stats = await API.getStats();
+            this.extent = stats.extent;
+
             // Zoom to fit all parcels
             this.zoomToAll();
 
+            // Render parcels
+            this.overviewLayer.redraw();
+            await this.loadView();
+
         } catch (error) {
             console.error('Error loading map data:', error);
             App.showToast('Failed to load map data', 'error');
         }
     },
 
+    /**
+     * Debounce view reloads while the user pans and zooms
+     */
+    scheduleViewLoad() {
+        clearTimeout(this.viewTimer);
+        this.viewTimer = setTimeout(() => {
+            this.loadView().catch(error => {
+                console.error('Error loading parcels in view:', error);
+            });
+        }, 150);
+    },
+
+    /**
+     * Canvas grid layer that draws clipped, quantized parcel tiles
+     */
+    createOverviewLayer() {
+        const manager = this;
+        const OverviewLayer = L.GridLayer.extend({
+            createTile(coords, done) {
+                const tile = document.createElement('canvas');
+                const size = this.getTileSize();
+                tile.width = size.x;
+                tile.height = size.y;
+
+                API.getTile(coords.z, coords.x, coords.y)
+                    .then(data => {
+                        manager.drawTile(tile, data);
+                        done(null, tile);
+                    })
+                    .catch(error => done(error, tile));
+
+                return tile;
+            }
+        });
+
+        return new OverviewLayer({ maxZoom: this.featureZoom - 1 });
+    },
+
+    /**
+     * Draw one tile's features, coloured by reconciliation status
+     */
+    drawTile(canvas, data) {
+        const ctx = canvas.getContext('2d');
+        const scale = canvas.width / data.extent;
+
+        data.features.forEach(feature => {
+            const status = feature.properties.status;
+            const style = this.styles[status] || this.styles.default;
+            const dimmed = this.statusFilter !== 'all' && status !== this.statusFilter;
+            const geometry = feature.geometry;
+            const polygons = geometry.type === 'Polygon' ? [geometry.coordinates] : geometry.coordinates;
+
+            ctx.beginPath();
+            polygons.forEach(rings => {
+                rings.forEach(ring => {
+                    ring.forEach(([x, y], i) => {
+                        if (i === 0) ctx.moveTo(x * scale, y * scale);
+                        else ctx.lineTo(x * scale, y * scale);
+                    });
+                    ctx.closePath();
+                });
+            });
+
+            ctx.globalAlpha = dimmed ? 0.05 : style.fillOpacity;
+            ctx.fillStyle = style.fillColor;
+            ctx.fill('evenodd');
+            ctx.globalAlpha = dimmed ? 0.2 : 1;
+            ctx.strokeStyle = style.color;
+            ctx.lineWidth = 1;
+            ctx.stroke();
+        });
+        ctx.globalAlpha = 1;
+    },
+
+    /**
+     * Select whichever parcel contains a clicked point
+     */
+    async selectAt(latlng) {
+        try {
+            const result = await API.getParcelAt(latlng.lng, latlng.lat);
+            if (result.found) {
+                this.selectParcel(result.plot_id);
+            }
+        } catch (error) {
+            console.error('Error finding parcel at point:', error);
+        }
+    },
+
+    /**
+     * Fetch and render only the parcels inside the current map bounds
+     */
+    async loadView() {
+        // Zoomed out, the tile overview is shown instead
+        if (this.map.getZoom() < this.featureZoom) {
+            this.parcelsLayer.clearLayers();
+            return;
+        }
+
+        const bounds = this.map.getBounds();
+        const bbox = [bounds.getWest(), bounds.getSouth(), bounds.getEast(), bounds.getNorth()];
+        const geojson = await API.getGeoJSON(bbox);
+        this.renderParcels(geojson);
+    },
+
+    /**
+     * Find the rendered layer for a plot, if it is in view
+     */
+    findLayer(plotId) {
+        let found = null;
+        this.parcelsLayer.eachLayer(l => {
+            if (l.eachLayer) {
+                l.eachLayer(subLayer => {
+                    if (subLayer.feature?.properties?.plot_id === plotId) {
+                        found = subLayer;
+                    }
+                });
+            }
+        });
+        return found;
+    },
+
     /**
      * Render parcels on the map
      */
@@ -131,6 +274,19 @@ const MapManager = {
         });
 
         this.parcelsLayer.addLayer(layer);
+
+        // Re-apply state that the re-render dropped
+        this.selectedLayer = null;
+        if (this.selectedPlotId) {
+            const selected = this.findLayer(this.selectedPlotId);
+            if (selected) {
+                this.selectedLayer = selected;
+                selected.setStyle(this.styles.selected);
+            }
+        }
+        if (this.statusFilter !== 'all') {
+            this.filterByStatus(this.statusFilter);
+        }
     },
 
     /**
@@ -239,17 +395,12 @@ const MapManager = {
             this.selectedLayer.setStyle(this.getFeatureStyle(prevFeature));
         }
 
+        this.selectedLayer = null;
+        this.selectedPlotId = plotId;
+
         // Find layer if not provided
         if (!layer) {
-            this.parcelsLayer.eachLayer(l => {
-                if (l.eachLayer) {
-                    l.eachLayer(subLayer => {
-                        if (subLayer.feature?.properties?.plot_id === plotId) {
-                            layer = subLayer;
-                        }
-                    });
-                }
-            });
+            layer = this.findLayer(plotId);
         }
 
         if (layer) {
@@ -259,6 +410,14 @@ const MapManager = {
             // Pan to selected parcel
             const bounds = layer.getBounds();
             this.map.fitBounds(bounds, { padding: [50, 50], maxZoom: 16 });
+        } else {
+            // Out of view: pan there and the view reload will highlight it
+            API.getParcel(plotId).then(parcel => {
+                const bounds = L.geoJSON(parcel.geometry).getBounds();
+                this.map.fitBounds(bounds, { padding: [50, 50], maxZoom: 16 });
+            }).catch(error => {
+                console.error('Error locating parcel:', error);
+            });
         }
 
         // Callback to show details
@@ -278,9 +437,9 @@ const MapManager = {
      * Zoom to fit all parcels
      */
     zoomToAll() {
-        if (this.parcelsLayer.getLayers().length > 0) {
-            const bounds = this.parcelsLayer.getBounds();
-            this.map.fitBounds(bounds, { padding: [30, 30] });
+        if (this.extent) {
+            const [minX, minY, maxX, maxY] = this.extent;
+            this.map.fitBounds([[minY, minX], [maxY, maxX]], { padding: [30, 30] });
         }
     },
 
@@ -304,8 +463,10 @@ const MapManager = {
     toggleParcelsVisibility() {
         if (this.map.hasLayer(this.parcelsLayer)) {
             this.map.removeLayer(this.parcelsLayer);
+            this.map.removeLayer(this.overviewLayer);
         } else {
             this.map.addLayer(this.parcelsLayer);
+            this.map.addLayer(this.overviewLayer);
         }
     },
 
@@ -313,6 +474,8 @@ const MapManager = {
      * Filter parcels by status
      */
     filterByStatus(status) {
+        this.statusFilter = status;
+        this.overviewLayer.redraw();
         this.parcelsLayer.eachLayer(l => {
             if (l.eachLayer) {
                 l.eachLayer(subLayer => {
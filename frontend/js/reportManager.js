@@ -182,17 +182,10 @@ const ReportManager = {
      */
     async exportToCSV() {
         try {
-            const data = await API.exportReport();
-            
-            // Create CSV content
-            const headers = data.headers.join(',');
-            const rows = data.rows.map(row => 
-                data.headers.map(h => `"${row[h] || ''}"`).join(',')
-            );
-            const csv = [headers, ...rows].join('\n');
+            // The server streams ready-made CSV
+            const blob = await API.exportReport('csv');
 
             // Download
-            const blob = new Blob([csv], { type: 'text/csv' });
             const url = URL.createObjectURL(blob);
             const a = document.createElement('a');
             a.href = url;
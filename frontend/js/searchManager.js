@@ -90,11 +90,14 @@ const SearchManager = {
         try {
             this.showLoading();
 
+            // The result list only shows the ID, owner and score
+            const fields = 'plot_id,match_score,matched_name,textual_record.owner_name,properties.village';
+
             let response;
             if (this.currentTab === 'plot') {
-                response = await API.searchByPlotId(query);
+                response = await API.searchByPlotId(query, 20, fields);
             } else {
-                response = await API.searchByOwnerName(query);
+                response = await API.searchByOwnerName(query, 20, fields);
             }
 
             this.displayResults(response.results);